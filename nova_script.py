@@ -1,18 +1,18 @@
-import boto3
-import json
 import sys
 import os
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
-from src.audit.audit import AuditLogger
-from src.notifications.notifications import NotificationManager
+# Import through the same module path as the components so they share one ledger writer
+from audit.audit import shared_audit_logger
+from notifications.notifications import NotificationManager
+from nova.client import get_nova_client
 
 def main():
     # Initialize clients
-    nova_client = boto3.client("bedrock-runtime")
-    audit = AuditLogger()
+    nova_client = get_nova_client()
+    audit = shared_audit_logger()
     notifications = NotificationManager()
 
     # Example prompt
@@ -20,15 +20,8 @@ def main():
 
     try:
         # Call Nova
-        response = nova_client.invoke_model(
-            modelId="amazon.nova-pro",
-            body=json.dumps({
-                "inputText": prompt,
-                "parameters": {"temperature": 0.7, "maxTokens": 300}
-            })
-        )
-        result = json.loads(response['body'].read())
-        output = result.get('outputText', 'No response')
+        response = nova_client.invoke(prompt)
+        output = response['outputText'] if response else 'No response'
 
         # Print response
         print("Nova Response:")
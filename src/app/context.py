@@ -0,0 +1,128 @@
+import logging
+import os
+import sys
+import threading
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class AppContext:
+    """
+    Process-wide service registry. Each service (audit, nova, executor, notifications,
+    automation, outbox, engine) is built on first access, with its module imported only then, and
+    reused afterwards. Pass instances as keyword arguments, or call provide(), to inject them.
+    """
+    SERVICES = ('audit', 'nova', 'executor', 'notifications', 'automation', 'outbox', 'engine')
+
+    def __init__(self, **services):
+        unknown = set(services) - set(self.SERVICES)
+        if unknown:
+            raise ValueError(f"Unknown services: {sorted(unknown)}")
+        self._services = dict(services)
+        self._lock = threading.RLock()
+
+    def _get(self, name, factory):
+        service = self._services.get(name)
+        if service is not None:
+            return service
+        with self._lock:
+            if self._services.get(name) is None:
+                self._services[name] = factory()
+                logger.info(f"Initialized {name} service")
+            return self._services[name]
+
+    def provide(self, name, service):
+        """
+        Register (or replace) a service instance.
+        """
+        if name not in self.SERVICES:
+            raise ValueError(f"Unknown service: {name}")
+        with self._lock:
+            self._services[name] = service
+
+    def initialized(self):
+        """
+        Names of the services built or provided so far.
+        """
+        return [name for name in self.SERVICES if self._services.get(name) is not None]
+
+    @property
+    def audit(self):
+        def build():
+            from audit.audit import shared_audit_logger
+            # Summaries are written in the background so approvals never wait on Nova
+            return shared_audit_logger(summary_mode=os.getenv('AUDIT_SUMMARY_MODE', 'async'))
+        return self._get('audit', build)
+
+    @property
+    def nova(self):
+        def build():
+            from nova.client import get_nova_client
+            return get_nova_client()
+        return self._get('nova', build)
+
+    @property
+    def executor(self):
+        def build():
+            from nova.client import get_nova_client
+            from nova.executor import NovaExecutor, get_nova_executor
+            nova = self.nova
+            return get_nova_executor() if nova is get_nova_client() else NovaExecutor(nova)
+        return self._get('executor', build)
+
+    @property
+    def notifications(self):
+        def build():
+            from notifications.notifications import NotificationManager
+            # Injected services are passed through; defaults stay lazy inside the manager
+            return NotificationManager(audit=self._services.get('audit'), nova=self._services.get('nova'))
+        return self._get('notifications', build)
+
+    @property
+    def automation(self):
+        def build():
+            from automation.automation import UIAutomation
+            return UIAutomation(audit=self._services.get('audit'))
+        return self._get('automation', build)
+
+    @property
+    def outbox(self):
+        def build():
+            from app.outbox import Outbox, proposal_consumers
+            outbox = Outbox(os.getenv('PROPOSAL_OUTBOX_FILE', 'proposal_outbox.jsonl'))
+            for name, handler in proposal_consumers(self.audit, self.notifications).items():
+                outbox.subscribe(name, handler)
+            return outbox
+        return self._get('outbox', build)
+
+    @property
+    def engine(self):
+        def build():
+            from reasoning.engine import ReasoningEngine
+            return ReasoningEngine(context=self)
+        return self._get('engine', build)
+
+_context = None
+_context_lock = threading.Lock()
+
+def get_context():
+    """
+    Return the process-wide AppContext, creating an empty one on first call.
+    """
+    global _context
+    with _context_lock:
+        if _context is None:
+            _context = AppContext()
+        return _context
+
+def set_context(context):
+    """
+    Replace the process-wide AppContext (e.g. with pre-built services in tests). Returns the previous one.
+    """
+    global _context
+    with _context_lock:
+        previous, _context = _context, context
+        return previous
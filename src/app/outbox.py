@@ -0,0 +1,273 @@
+import heapq
+import itertools
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from audit.filelock import FileLock
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+PROPOSALS_GENERATED = 'proposals_generated'
+
+class Outbox:
+    """
+    Durable event outbox with at-least-once delivery. publish() appends the event to an fsync'd
+    JSON Lines log and returns; each subscribed consumer receives every event on its own
+    background thread, with jittered exponential backoff between failed attempts. Deliveries
+    are acknowledged in the same log, so events a consumer has not acknowledged are delivered
+    again after a restart. Events that exhaust max_attempts are recorded as dead for that consumer.
+    Once the log has grown by compact_bytes since it was last compacted, the next acknowledgement
+    compacts it (None turns this off).
+    """
+    def __init__(self, path='proposal_outbox.jsonl', max_attempts=5, base_delay=0.5, max_delay=30.0,
+                 compact_bytes=1024 * 1024):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.compact_bytes = compact_bytes
+        self.consumers = {}
+        self._file_lock = FileLock(path + '.lock')
+        self._lock = threading.Condition()
+        self._queues = {}
+        self._threads = {}
+        self._pending = {}
+        self._sequence = itertools.count()
+        self._closed = False
+        self._compacting = False
+        self._compact_at = compact_bytes
+        self._stats = {'published': 0, 'delivered': 0, 'retried': 0, 'dead': 0, 'compactions': 0}
+
+    def _append(self, records):
+        with self._file_lock:
+            with open(self.path, 'a') as f:
+                for record in records:
+                    f.write(json.dumps(record) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def _read(self):
+        events = {}
+        done = {}
+        if not os.path.exists(self.path):
+            return events, done
+        with open(self.path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Torn trailing write; the publisher never got an id back for it
+                    continue
+                if 'event' in record:
+                    events[record['event']['id']] = record['event']
+                else:
+                    done.setdefault(record['id'], set()).add(record['consumer'])
+        return events, done
+
+    def subscribe(self, name, handler):
+        """
+        Register a consumer and start its worker. handler(event) must raise to have the event
+        retried. Events already in the log that this consumer has not finished are redelivered.
+        """
+        with self._lock:
+            if name in self.consumers:
+                raise ValueError(f"Consumer already subscribed: {name}")
+            self.consumers[name] = handler
+            self._queues[name] = []
+        events, done = self._read()
+        backlog = [event for event_id, event in events.items() if name not in done.get(event_id, ())]
+        if backlog:
+            logger.info(f"Redelivering {len(backlog)} outbox events to {name}")
+        for event in backlog:
+            self._schedule(name, event, 1, 0.0)
+        thread = threading.Thread(target=self._run, args=(name,), name=f'outbox-{name}', daemon=True)
+        self._threads[name] = thread
+        thread.start()
+
+    def publish(self, event_type, payload):
+        """
+        Persist one event and queue it for every consumer. Returns the event id.
+        """
+        event = {'id': uuid.uuid4().hex, 'type': event_type, 'payload': payload, 'created_at': time.time()}
+        self._append([{'event': event}])
+        with self._lock:
+            self._stats['published'] += 1
+            consumers = list(self.consumers)
+        for name in consumers:
+            self._schedule(name, event, 1, 0.0)
+        return event['id']
+
+    def _schedule(self, name, event, attempt, delay):
+        with self._lock:
+            heapq.heappush(self._queues[name], (time.monotonic() + delay, next(self._sequence), event, attempt))
+            key = (name, event['id'])
+            self._pending[key] = self._pending.get(key, 0) + 1
+            self._lock.notify_all()
+
+    def _next(self, name):
+        with self._lock:
+            while not self._closed:
+                queue = self._queues[name]
+                if queue and queue[0][0] <= time.monotonic():
+                    _, _, event, attempt = heapq.heappop(queue)
+                    return event, attempt
+                self._lock.wait(queue[0][0] - time.monotonic() if queue else None)
+            return None, None
+
+    def _finish(self, name, event):
+        with self._lock:
+            key = (name, event['id'])
+            self._pending[key] -= 1
+            if not self._pending[key]:
+                del self._pending[key]
+            self._lock.notify_all()
+
+    def _run(self, name):
+        handler = self.consumers[name]
+        while True:
+            event, attempt = self._next(name)
+            if event is None:
+                return
+            try:
+                handler(event)
+            except Exception as e:
+                if attempt >= self.max_attempts:
+                    logger.error(f"Outbox consumer {name} gave up on event {event['id']} after {attempt} attempts: {e}")
+                    self._append([{'id': event['id'], 'consumer': name, 'status': 'dead', 'error': str(e)}])
+                    with self._lock:
+                        self._stats['dead'] += 1
+                else:
+                    delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+                    logger.warning(f"Outbox consumer {name} failed on event {event['id']} (attempt {attempt}), retrying in {delay:.2f}s: {e}")
+                    with self._lock:
+                        self._stats['retried'] += 1
+                    self._schedule(name, event, attempt + 1, delay)
+            else:
+                self._append([{'id': event['id'], 'consumer': name, 'status': 'delivered'}])
+                with self._lock:
+                    self._stats['delivered'] += 1
+            self._maybe_compact()
+            self._finish(name, event)
+
+    def _maybe_compact(self):
+        if self.compact_bytes is None:
+            return
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return
+        with self._lock:
+            if self._compacting or size < self._compact_at:
+                return
+            self._compacting = True
+        try:
+            self.compact()
+        except Exception as e:
+            logger.error(f"Outbox compaction failed: {e}")
+        finally:
+            with self._lock:
+                self._compacting = False
+
+    def wait(self, timeout=None):
+        """
+        Block until every queued delivery has succeeded or been given up on. Returns False on timeout.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        with self._lock:
+            while self._pending:
+                remaining = deadline - time.monotonic() if deadline is not None else None
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._lock.wait(remaining)
+            return True
+
+    def pending(self):
+        """
+        Events in the log not yet delivered to (or given up on by) every subscribed consumer.
+        """
+        events, done = self._read()
+        return [event for event_id, event in events.items() if set(self.consumers) - done.get(event_id, set())]
+
+    def compact(self):
+        """
+        Rewrite the log keeping only events some consumer still has to finish, with their acks.
+        """
+        with self._file_lock:
+            events, done = self._read()
+            records = []
+            for event_id, event in events.items():
+                finished = done.get(event_id, set())
+                if set(self.consumers) - finished:
+                    records.append({'event': event})
+                    records.extend({'id': event_id, 'consumer': name, 'status': 'delivered'} for name in finished)
+            tmp_path = self.path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                for record in records:
+                    f.write(json.dumps(record) + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.path)
+            size = os.path.getsize(self.path)
+        with self._lock:
+            self._stats['compactions'] += 1
+            if self.compact_bytes is not None:
+                # Measured from what survives, so a long backlog does not trigger it on every ack
+                self._compact_at = size + self.compact_bytes
+        logger.info(f"Compacted outbox log to {len(records)} records")
+        return len(records)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['queued'] = sum(self._pending.values())
+        return stats
+
+    def close(self, wait=True, timeout=None):
+        if wait:
+            self.wait(timeout)
+        with self._lock:
+            self._closed = True
+            self._lock.notify_all()
+        for thread in self._threads.values():
+            thread.join()
+
+def proposal_consumers(audit, notifications):
+    """
+    Consumers that carry out the side effects of a proposals_generated event: the audit
+    ledger entries (with their compliance summaries) and the Slack approval request. The
+    audit consumer logs each event under its id, which the ledger writer checks under its
+    file lock, so a redelivery after a crash between commit and ack adds no duplicates.
+    """
+    def log_proposals(event):
+        if event['type'] != PROPOSALS_GENERATED:
+            return
+        payload = event['payload']
+        audit.log_decisions([
+            {
+                "shipment_id": payload['shipment_id'],
+                "rerouting_option": prop['route'],
+                "approval_status": "proposed",
+                "reasoning_trace": {"score": prop['score'], "cost": prop['cost'], "time": prop['time'], "compliance": prop['compliance'],
+                                    "risk_explanation": payload['explanation']}
+            }
+            for prop in payload['proposals']
+        ], event_id=event['id'])
+
+    def send_to_slack(event):
+        if event['type'] != PROPOSALS_GENERATED:
+            return
+        payload = event['payload']
+        if notifications.send_rerouting_proposal(payload['shipment_id'], payload['proposals'], payload['explanation']) is False:
+            raise RuntimeError(f"Slack delivery failed for shipment {payload['shipment_id']}")
+
+    return {'audit': log_proposals, 'slack': send_to_slack}
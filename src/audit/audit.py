@@ -1,116 +1,835 @@
-import hashlib
+import bisect
+import itertools
 import json
 import logging
-import boto3
+import os
+import sys
+import threading
 from datetime import datetime, timezone
 
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from audit.filelock import FileLock
+from audit.index import LedgerIndex
+from audit.merkle import inclusion_proof, merkle_root, sign_root, verify_inclusion, verify_signature
+from audit.segments import LazyLedger, SegmentStore, TieredLedger
+from audit.summaries import SummaryWorker
+from audit.verify import DEFAULT_CHUNK_SIZE, compute_hash, plan_chunks, run_verification
+from nova.client import get_nova_client
+from nova.executor import NovaExecutor, get_nova_executor
+from nova.prompts import audit_summary_prompt
+
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+SUMMARY_UNAVAILABLE = "Summary not available"
+SUMMARY_PENDING = "Summary pending"
+
+ANNOTATION_STATUS = 'annotation'
+
+_shared_loggers = {}
+_shared_lock = threading.Lock()
+
+def _is_annotation(entry):
+    return entry['data'].get('approval_status') == ANNOTATION_STATUS
+
+def shared_audit_logger(storage_file='audit_ledger.json', **options):
+    """
+    Return the process-wide AuditLogger for storage_file, creating it on first use.
+    Options only apply when the logger is first created.
+    """
+    key = os.path.abspath(storage_file)
+    with _shared_lock:
+        if key not in _shared_loggers:
+            _shared_loggers[key] = AuditLogger(storage_file, **options)
+        return _shared_loggers[key]
+
+class _CommitRequest:
+    """
+    A batch of entry data waiting for the next group commit, optionally tagged with the outbox
+    event it records.
+    """
+    def __init__(self, batch, event_id=None):
+        self.batch = batch
+        self.event_id = event_id
+        self.entries = None
+        self.error = None
+
 class AuditLogger:
-    def __init__(self, storage_file='audit_ledger.json'):
+    def __init__(self, storage_file='audit_ledger.json', storage_mode='json', segment_dir=None, segment_size=10000,
+                 checkpoint_interval=None, checkpoint_key=None, summary_mode='inline', summary_workers=2, lazy=False,
+                 nova=None, executor=None):
+        """
+        storage_mode 'json' rewrites a single JSON array file on every save.
+        storage_mode 'segmented' appends fsync'd JSON Lines records to rolling segments in segment_dir
+        (default: storage_file without extension + '_segments'), migrating storage_file once if it exists.
+        checkpoint_interval seals a Merkle checkpoint every N entries, signed with checkpoint_key
+        (default: AUDIT_CHECKPOINT_KEY environment variable); it raises ValueError without a key.
+        summary_mode 'inline' calls Nova before entries are committed (a batch's summaries run
+        concurrently on executor, by default the shared NovaExecutor); 'async' commits immediately
+        and attaches the summary later as a linked annotation entry from a background worker pool.
+        lazy=True (segmented mode only) keeps no entries in memory: startup reads just the manifest and
+        the tail of the active segment, and reads stream from memory-mapped segments.
+        """
+        if storage_mode not in ('json', 'segmented'):
+            raise ValueError(f"Unknown storage mode: {storage_mode}")
+        if summary_mode not in ('inline', 'async'):
+            raise ValueError(f"Unknown summary mode: {summary_mode}")
+        if lazy and storage_mode != 'segmented':
+            raise ValueError("Lazy loading requires storage_mode='segmented'")
+        self.lazy = lazy
         self.storage_file = storage_file
+        self.storage_mode = storage_mode
+        self.store = None
+        if storage_mode == 'segmented':
+            segment_dir = segment_dir or os.path.splitext(storage_file)[0] + '_segments'
+            os.makedirs(segment_dir, exist_ok=True)
+            # Serializes appends across every process sharing this ledger
+            self._file_lock = FileLock(os.path.join(segment_dir, 'ledger.lock'))
+            with self._file_lock:
+                self.store = SegmentStore(segment_dir, segment_size)
+        else:
+            self._file_lock = FileLock(storage_file + '.lock')
+        # Only the append-only segmented mode persists its indexes; json mode rebuilds them on load
+        self.index = LedgerIndex(os.path.join(self.store.directory, 'index.jsonl') if self.store is not None else None)
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoint_key = checkpoint_key or os.getenv('AUDIT_CHECKPOINT_KEY')
+        if checkpoint_interval and not self.checkpoint_key:
+            raise ValueError("checkpoint_interval requires checkpoint_key or AUDIT_CHECKPOINT_KEY")
+        self.checkpoint_file = os.path.splitext(storage_file)[0] + '_checkpoints.jsonl'
+        self.checkpoints = []
+        self._hash_positions = {}
+        self._annotations = {}
+        self._verified_upto = 0
+        self._lock = threading.RLock()
+        # Group commit: callers queue batches under _lock; whichever caller holds _flush_lock
+        # chains and writes everything queued while holding the inter-process file lock
+        self._flush_lock = threading.RLock()
+        self._queue = []
+        self._file_state = None
+        self._checkpoint_size = 0
+        self.summary_mode = summary_mode
+        self.summary_workers = summary_workers
+        self._summary_worker = None
         self.ledger = []
-        self.load_ledger()
-        self.nova = boto3.client("bedrock-runtime")
+        with self._file_lock:
+            self.load_ledger()
+            self.load_checkpoints()
+        self.nova = nova or get_nova_client()
+        self._executor = executor
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = get_nova_executor() if self.nova is get_nova_client() else NovaExecutor(self.nova)
+        return self._executor
 
     def call_nova(self, prompt):
         """
         Call Amazon Nova for generating summaries.
         """
+        return self.nova.invoke(prompt, call_type='audit_summary')
+
+    def load_ledger(self):
+        if self.store is not None:
+            if self.store.is_empty() and not self.store.manifest['migrated_from'] and os.path.exists(self.storage_file):
+                self.store.migrate_from_json(self.storage_file)
+            if self.lazy:
+                self._load_entries(LazyLedger(self.store))
+            elif self.store.archived_count():
+                self._load_entries(TieredLedger(self.store, self.store.load_hot()))
+            else:
+                self._load_entries(self.store.load())
+        else:
+            try:
+                entries = self._read_json_ledger()
+            except FileNotFoundError:
+                entries = []
+                logger.info("Audit ledger initialized")
+            self._load_entries(entries)
+
+    def _read_json_ledger(self):
+        with open(self.storage_file, 'r') as f:
+            entries = json.load(f)
+        self._file_state = self._stat_json_ledger()
+        return entries
+
+    def _stat_json_ledger(self):
         try:
-            response = self.nova.invoke_model(
-                modelId="amazon.nova-pro",
-                body=json.dumps({
-                    "inputText": prompt,
-                    "parameters": {"temperature": 0.7, "maxTokens": 300}
-                })
-            )
-            result = json.loads(response['body'].read())
-            return {
-                'outputText': result.get('outputText', ''),
-                'stopReason': result.get('stopReason'),
-                'usage': result.get('usage', {}),
-                'modelId': "amazon.nova-pro",
-                'region': self.nova.meta.region_name
-            }
-        except Exception as e:
-            logger.error(f"Nova call failed: {e}")
+            stat = os.stat(self.storage_file)
+        except FileNotFoundError:
             return None
+        return (stat.st_mtime_ns, stat.st_size)
 
-    def load_ledger(self):
+    def _load_entries(self, entries):
+        self.ledger = entries
+        self._verified_upto = 0
+        if self.lazy:
+            # Lookups stream the ledger instead of holding tables that grow with history
+            self._hash_positions = None
+            self._annotations = None
+            return
+        # With archives only the hot window is tabled; archived lookups stream the archives
+        base = self._archived_base()
+        hot = self.ledger.hot if base else self.ledger
+        self._hash_positions = {entry['hash']: base + i for i, entry in enumerate(hot)}
+        self._annotations = {entry['data']['annotates']: base + i for i, entry in enumerate(hot)
+                             if 'annotates' in entry['data']}
+        self.index.load(self.ledger)
+
+    def _archived_base(self):
+        return getattr(self.ledger, 'base', 0)
+
+    def load_checkpoints(self):
+        self.checkpoints = []
+        self._checkpoint_size = 0
         try:
-            with open(self.storage_file, 'r') as f:
-                self.ledger = json.load(f)
+            with open(self.checkpoint_file, 'r') as f:
+                self.checkpoints = [json.loads(line) for line in f if line.strip()]
+            self._checkpoint_size = os.path.getsize(self.checkpoint_file)
         except FileNotFoundError:
-            self.ledger = []
-            logger.info("Audit ledger initialized")
+            pass
 
     def save_ledger(self):
+        if self.store is not None:
+            # Segmented entries are persisted as they are appended
+            return
+        with self._lock:
+            snapshot = list(self.ledger)
         with open(self.storage_file, 'w') as f:
-            json.dump(self.ledger, f, indent=4)
+            json.dump(snapshot, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        self._file_state = self._stat_json_ledger()
+
+    def _persist(self, entries):
+        if self.store is not None:
+            self.store.append(entries)
+        else:
+            self.save_ledger()
+
+    def _register(self, entries, persist_index=True):
+        """
+        Add chained entries to the in-memory view and its lookup tables. Caller must hold self._lock.
+        """
+        base = len(self.ledger)
+        self.ledger.extend(entries)
+        if self.lazy:
+            return
+        for offset, entry in enumerate(entries):
+            self._hash_positions[entry['hash']] = base + offset
+            if 'annotates' in entry['data']:
+                self._annotations[entry['data']['annotates']] = base + offset
+        self.index.add(entries, base, persist=persist_index)
+
+    def _sync(self):
+        """
+        Pick up entries and checkpoints committed by other processes. Caller must hold the file lock.
+        """
+        if self.store is not None:
+            new_entries = self.store.refresh()
+        elif self._stat_json_ledger() == self._file_state:
+            new_entries = []
+        else:
+            try:
+                on_disk = self._read_json_ledger()
+            except FileNotFoundError:
+                on_disk = []
+            known = len(self.ledger)
+            if len(on_disk) < known or (known and on_disk[known - 1]['hash'] != self.ledger[-1]['hash']):
+                logger.warning("Audit ledger was rewritten outside the shared writer, reloading")
+                with self._lock:
+                    self._load_entries(on_disk)
+                new_entries = []
+            else:
+                new_entries = on_disk[known:]
+        if new_entries:
+            with self._lock:
+                self._register(new_entries, persist_index=False)
+            logger.info(f"Picked up {len(new_entries)} audit entries written by another process")
+        try:
+            checkpoint_size = os.path.getsize(self.checkpoint_file)
+        except FileNotFoundError:
+            checkpoint_size = 0
+        if checkpoint_size != self._checkpoint_size:
+            self.load_checkpoints()
+
+    def refresh(self):
+        """
+        Bring this process's view of the ledger up to date with other writers.
+        """
+        with self._flush_lock, self._file_lock:
+            self._sync()
+
+    def _iter_entries(self, start=0):
+        if isinstance(self.ledger, list):
+            return itertools.islice(self.ledger, start, None)
+        # Lazy and tiered views skip straight to start without reading what comes before
+        return self.ledger.iter_from(start)
+
+    def _position_of(self, entry_hash):
+        if not self.lazy:
+            position = self._hash_positions.get(entry_hash)
+            if position is not None or not self._archived_base():
+                return position
+        stop = None if self.lazy else self._archived_base()
+        for position, entry in enumerate(self.ledger.iter_from(0, stop)):
+            if entry['hash'] == entry_hash:
+                return position
+        return None
+
+    def _annotation_of(self, entry_hash):
+        if not self.lazy:
+            position = self._annotations.get(entry_hash)
+            if position is not None:
+                return self.ledger[position]
+            # Annotations follow their target, so only an archived target can have an untabled one
+            target = self._position_of(entry_hash)
+            if target is None or target >= self._archived_base():
+                return None
+        annotation = None
+        for entry in self._iter_entries():
+            if entry['data'].get('annotates') == entry_hash:
+                annotation = entry
+        return annotation
 
     def _compute_hash(self, data):
-        return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+        return compute_hash(data)
 
-    def log_decision(self, shipment_id, rerouting_option, approval_status, reasoning_trace=None):
+    def _commit(self, batch, event_id=None):
         """
-        Log a rerouting decision immutably.
+        Chain, hash and durably persist a batch of entry data as one group.
+        Concurrent callers queue their batches; the first to take the flush lock commits every
+        queued batch with a single write, the rest find theirs already committed. A batch for an
+        event_id the ledger already holds is dropped and comes back with no entries.
         """
-        previous_hash = self.ledger[-1]['hash'] if self.ledger else '0' * 64
-        timestamp = datetime.now(timezone.utc).isoformat()
-        data = {
+        request = _CommitRequest(batch, event_id)
+        with self._lock:
+            self._queue.append(request)
+        with self._flush_lock:
+            if request.entries is None and request.error is None:
+                self._write_queued()
+        if request.error is not None:
+            raise request.error
+        return request.entries
+
+    def _write_queued(self):
+        with self._lock:
+            requests, self._queue = self._queue, []
+        if not requests:
+            return
+        try:
+            with self._file_lock:
+                # Chain onto whatever other processes appended, so the hash chain stays linear
+                self._sync()
+                with self._lock:
+                    previous_hash = self.ledger[-1]['hash'] if self.ledger else '0' * 64
+                    entries = []
+                    committed_events = set()
+                    for request in requests:
+                        # Checked under the file lock, so concurrent redeliveries in any process log once
+                        if request.event_id is not None:
+                            if request.event_id in committed_events or self._holds_event(request.event_id):
+                                logger.info(f"Audit entries for outbox event {request.event_id} already logged, skipping")
+                                request.entries = []
+                                continue
+                            committed_events.add(request.event_id)
+                        request_entries = []
+                        for data in request.batch:
+                            data['timestamp'] = datetime.now(timezone.utc).isoformat()
+                            data['previous_hash'] = previous_hash
+                            entry = {
+                                'data': data,
+                                'hash': self._compute_hash(data)
+                            }
+                            request_entries.append(entry)
+                            previous_hash = entry['hash']
+                        request.entries = request_entries
+                        entries.extend(request_entries)
+                    if not entries:
+                        return
+                    self._register(entries)
+                try:
+                    self._persist(entries)
+                except Exception:
+                    # Drop the unwritten entries from memory by reloading what is on disk
+                    with self._lock:
+                        if self.store is not None:
+                            self.store.load_manifest()
+                        self.load_ledger()
+                    raise
+                if self.checkpoint_interval:
+                    sealed = self.checkpoints[-1]['end'] if self.checkpoints else 0
+                    if len(self.ledger) - sealed >= self.checkpoint_interval:
+                        self._seal_checkpoint()
+        except Exception as e:
+            logger.error(f"Audit commit failed: {e}")
+            for request in requests:
+                request.entries = None
+                request.error = e
+
+    def _summary_prompt(self, data):
+        return audit_summary_prompt(data)
+
+    def _attach_summary(self, data, compliance_summary):
+        data['compliance_summary'] = compliance_summary['outputText']
+        data['modelId'] = compliance_summary['modelId']
+        data['region'] = compliance_summary['region']
+        data['stopReason'] = compliance_summary['stopReason']
+        data['usage'] = compliance_summary['usage']
+
+    @property
+    def summaries(self):
+        if self._summary_worker is None:
+            self._summary_worker = SummaryWorker(self, self.summary_workers)
+        return self._summary_worker
+
+    def _decision_data(self, shipment_id, rerouting_option, approval_status, reasoning_trace=None):
+        return {
             'shipment_id': shipment_id,
             'rerouting_option': rerouting_option,
             'approval_status': approval_status,
-            'reasoning_trace': reasoning_trace,
-            'timestamp': timestamp,
-            'previous_hash': previous_hash
+            'reasoning_trace': reasoning_trace
         }
-        # Generate Nova-powered compliance summary
-        prompt = f"Generate a compliance-ready summary for this audit log entry: {data}"
-        compliance_summary = self.call_nova(prompt)
-        if compliance_summary:
-            data['compliance_summary'] = compliance_summary['outputText']
-            data['modelId'] = compliance_summary['modelId']
-            data['region'] = compliance_summary['region']
-            data['stopReason'] = compliance_summary['stopReason']
-            data['usage'] = compliance_summary['usage']
+
+    def _summarize(self, batch):
+        """
+        Fill in compliance_summary for entry data about to be committed. In inline mode a batch's
+        Nova calls run concurrently on the executor, so it waits for the slowest call rather
+        than for each call in turn; async mode marks them pending for the summary worker.
+        """
+        if self.summary_mode != 'inline':
+            for data in batch:
+                data['compliance_summary'] = SUMMARY_PENDING
+            return batch
+        # Generate Nova-powered compliance summaries
+        prompts = [self._summary_prompt(data) for data in batch]
+        if len(prompts) == 1:
+            summaries = [self.call_nova(prompts[0])]
         else:
-            data['compliance_summary'] = "Summary not available"
-        current_hash = self._compute_hash(data)
-        entry = {
-            'data': data,
-            'hash': current_hash
-        }
-        self.ledger.append(entry)
-        self.save_ledger()
+            summaries = self.executor.map(prompts, call_type='audit_summary')
+        for data, compliance_summary in zip(batch, summaries):
+            if compliance_summary:
+                self._attach_summary(data, compliance_summary)
+            else:
+                data['compliance_summary'] = SUMMARY_UNAVAILABLE
+        return batch
+
+    def log_decision(self, shipment_id, rerouting_option, approval_status, reasoning_trace=None):
+        """
+        Log a rerouting decision immutably.
+        """
+        entry = self._commit(self._summarize([self._decision_data(shipment_id, rerouting_option, approval_status, reasoning_trace)]))[0]
+        if self.summary_mode == 'async':
+            self.summaries.submit(entry)
         logger.info(f"Logged decision for shipment {shipment_id}: {approval_status}")
-        return current_hash
+        return entry['hash']
+
+    def log_decisions(self, batch, event_id=None):
+        """
+        Log several decisions as one hash-chained group with a single durable write.
+        batch is a list of dicts with shipment_id, rerouting_option, approval_status and optional reasoning_trace.
+        event_id marks the batch as the side effects of an outbox event: it is recorded in each
+        reasoning trace, and a batch for an event already in the ledger is not written again.
+        Returns the entry hashes in order (empty for such a duplicate).
+        """
+        if not batch:
+            return []
+        if event_id is not None:
+            with self._lock:
+                if self._holds_event(event_id):
+                    return []
+            batch = [dict(decision, reasoning_trace=dict(decision.get('reasoning_trace') or {}, event_id=event_id))
+                     for decision in batch]
+        entries = self._commit(self._summarize([self._decision_data(**decision) for decision in batch]), event_id)
+        if self.summary_mode == 'async':
+            for entry in entries:
+                self.summaries.submit(entry)
+        logger.info(f"Logged {len(entries)} decisions in one commit")
+        return [entry['hash'] for entry in entries]
+
+    def has_event(self, event_id):
+        """
+        True if the ledger (including entries other processes committed) already holds entries
+        for outbox event event_id, i.e. a redelivered event has been logged before.
+        """
+        self.refresh()
+        with self._lock:
+            return self._holds_event(event_id)
+
+    def _holds_event(self, event_id):
+        """
+        Whether the loaded ledger has entries for event_id. Caller must hold self._lock.
+        """
+        if self.lazy:
+            for entry in self._iter_entries():
+                trace = entry['data'].get('reasoning_trace')
+                if isinstance(trace, dict) and trace.get('event_id') == event_id:
+                    return True
+            return False
+        return event_id in self.index.events
+
+    def log_annotation(self, entry_hash, compliance_summary):
+        """
+        Attach a compliance summary to an earlier entry as a new, hash-chained annotation entry.
+        """
+        position = self._position_of(entry_hash)
+        if position is None:
+            raise KeyError(f"Unknown entry hash: {entry_hash}")
+        target = self.ledger[position]['data']
+        data = {
+            'shipment_id': target['shipment_id'],
+            'rerouting_option': target['rerouting_option'],
+            'approval_status': ANNOTATION_STATUS,
+            'reasoning_trace': None,
+            'annotates': entry_hash
+        }
+        self._attach_summary(data, compliance_summary)
+        entry = self._commit([data])[0]
+        logger.info(f"Attached compliance summary to entry {entry_hash}")
+        return entry['hash']
+
+    def get_summary(self, entry_hash):
+        """
+        Return the compliance summary for an entry, preferring a linked annotation.
+        """
+        annotation = self._annotation_of(entry_hash)
+        if annotation is not None:
+            return annotation['data']['compliance_summary']
+        position = self._position_of(entry_hash)
+        if position is None:
+            raise KeyError(f"Unknown entry hash: {entry_hash}")
+        return self.ledger[position]['data']['compliance_summary']
+
+    def backfill_summaries(self):
+        """
+        Queue summary generation for entries without one (failed or interrupted) and no annotation yet.
+        Returns the number of entries submitted.
+        """
+        submitted = 0
+        if self.lazy:
+            annotated = {entry['data']['annotates'] for entry in self._iter_entries() if 'annotates' in entry['data']}
+            entries = self.ledger.iter_from(0, len(self.ledger))
+        else:
+            annotated = set(self._annotations)
+            entries = list(self.ledger)
+        for entry in entries:
+            data = entry['data']
+            if 'annotates' in data or entry['hash'] in annotated:
+                continue
+            if data.get('compliance_summary') in (SUMMARY_UNAVAILABLE, SUMMARY_PENDING):
+                self.summaries.submit(entry)
+                submitted += 1
+        logger.info(f"Queued {submitted} entries for compliance summary backfill")
+        return submitted
+
+    def close(self):
+        if self._summary_worker is not None:
+            self._summary_worker.shutdown()
 
-    def get_logs(self, shipment_id=None):
+    def get_logs(self, shipment_id=None, include_annotations=False):
         """
         Retrieve logs, optionally filtered by shipment_id.
+        Summary annotation entries are left out unless include_annotations is True.
+        In lazy mode the result is an iterator that streams matching entries from disk.
         """
+        if self.lazy:
+            return self.iter_logs(shipment_id, include_annotations)
         if shipment_id:
-            return [entry for entry in self.ledger if entry['data']['shipment_id'] == shipment_id]
-        return self.ledger
+            entries = (self.ledger[position] for position in self.index.positions(shipment_id=shipment_id))
+        elif include_annotations:
+            return self.ledger
+        else:
+            entries = self.ledger
+        return [entry for entry in entries if include_annotations or not _is_annotation(entry)]
 
-    def verify_integrity(self):
+    def iter_logs(self, shipment_id=None, include_annotations=False):
+        """
+        Iterate over logs without materializing them, optionally filtered by shipment_id.
+        """
+        for entry in self._iter_entries():
+            if shipment_id and entry['data']['shipment_id'] != shipment_id:
+                continue
+            if include_annotations or not _is_annotation(entry):
+                yield entry
+
+    def query_logs(self, shipment_id=None, status=None, start=None, end=None, limit=100, cursor=None, descending=False,
+                   include_annotations=False):
+        """
+        Query logs through the secondary indexes.
+        start/end bound the timestamp (start inclusive, end exclusive) and accept ISO strings or datetimes.
+        Annotation entries are only returned with include_annotations=True or status='annotation'.
+        Returns {'entries': [...], 'next_cursor': str or None}; pass next_cursor back to fetch the next page.
+        """
+        include_annotations = include_annotations or status == ANNOTATION_STATUS
+        if isinstance(start, datetime):
+            start = start.isoformat()
+        if isinstance(end, datetime):
+            end = end.isoformat()
+        if self.lazy:
+            # No in-memory index: stream forward from the cursor
+            if descending:
+                raise ValueError("Descending queries are not supported in lazy mode")
+            first = int(cursor) + 1 if cursor is not None else 0
+            candidates = enumerate(self._iter_entries(first), first)
+        else:
+            positions = self.index.positions(shipment_id, status, start, end)
+            if cursor is not None:
+                after = int(cursor)
+                if descending:
+                    positions = positions[:bisect.bisect_left(positions, after)]
+                else:
+                    positions = positions[bisect.bisect_right(positions, after):]
+            if descending:
+                positions = reversed(positions)
+            candidates = ((position, self.ledger[position]) for position in positions)
+
+        entries = []
+        last_position = None
+        for position, entry in candidates:
+            data = entry['data']
+            if shipment_id is not None and data.get('shipment_id') != shipment_id:
+                continue
+            if status is not None and data.get('approval_status') != status:
+                continue
+            if not include_annotations and _is_annotation(entry):
+                continue
+            timestamp = data.get('timestamp', '')
+            if (start is not None and timestamp < start) or (end is not None and timestamp >= end):
+                continue
+            if len(entries) == limit:
+                break
+            entries.append(entry)
+            last_position = position
+        else:
+            last_position = None
+        return {'entries': entries, 'next_cursor': str(last_position) if last_position is not None else None}
+
+    def verify_integrity(self, incremental=False, parallel=False, workers=None, hot_only=False):
         """
         Verify the immutability of the ledger by checking hash chain.
+        With incremental=True only entries and checkpoints added since the last successful
+        verification are re-checked. A fresh process anchors on the last signed checkpoint: its
+        root, signature and last_hash are checked against the stored entry hashes and only the
+        entries after it are re-hashed. parallel=True runs a full verify_report
+        across a process pool instead. hot_only=True checks archives by digest and anchor hash
+        without decompressing them, then re-hashes only the hot window.
         """
-        for i, entry in enumerate(self.ledger):
+        if parallel:
+            report = self.verify_report(workers=workers)
+            if report['valid']:
+                self._verified_upto = report['checked']
+            return report['valid']
+        start = self._verified_upto if incremental and self._verified_upto <= len(self.ledger) else 0
+        total = len(self.ledger)
+        previous_hash = None
+        if incremental:
+            anchor = next((checkpoint for checkpoint in reversed(self.checkpoints)
+                           if checkpoint['end'] <= total and checkpoint.get('signature')), None)
+            if anchor is not None and anchor['end'] > start:
+                if not self._verify_checkpoint(anchor) or self.ledger[anchor['end'] - 1]['hash'] != anchor['last_hash']:
+                    logger.error(f"Checkpoint {anchor['block']} does not match the ledger")
+                    return False
+                start, previous_hash = anchor['end'], anchor['last_hash']
+        if hot_only and self.store is not None:
+            failures, archived_hash = self.store.verify_archives()
+            if failures:
+                logger.error(f"Archive segments failed verification: {failures}")
+                return False
+            base = self.store.archived_count()
+            if start <= base:
+                start, previous_hash = base, archived_hash
+        if start > 0 and previous_hash is None:
+            previous_hash = self.ledger[start - 1]['hash']
+        checked = 0
+        for i, entry in enumerate(itertools.islice(self._iter_entries(start), total - start), start):
+            checked += 1
             expected_hash = self._compute_hash(entry['data'])
             if entry['hash'] != expected_hash:
                 logger.error(f"Integrity check failed at entry {i}")
                 return False
-            if i > 0 and entry['data']['previous_hash'] != self.ledger[i-1]['hash']:
+            if i > 0 and entry['data']['previous_hash'] != previous_hash:
                 logger.error(f"Chain broken at entry {i}")
                 return False
+            previous_hash = entry['hash']
+        if checked < total - start:
+            logger.error(f"Ledger ended after {start + checked} of {total} entries")
+            return False
+        for checkpoint in self.checkpoints:
+            if checkpoint['end'] <= start:
+                continue
+            if not self._verify_checkpoint(checkpoint):
+                logger.error(f"Checkpoint {checkpoint['block']} does not match the ledger")
+                return False
+        self._verified_upto = total
         logger.info("Ledger integrity verified")
         return True
 
+    def archive(self, keep_recent=10000):
+        """
+        Seal segments older than the keep_recent newest entries into compressed, read-only archive
+        segments and drop them from memory. Archived entries stay reachable through get_logs,
+        query_logs and verify_integrity, which decompress them only when a read needs them.
+        Returns the number of entries archived.
+        """
+        if self.store is None:
+            raise ValueError("Archival requires storage_mode='segmented'")
+        with self._flush_lock, self._file_lock:
+            self._sync()
+            archived = self.store.archive_segments(len(self.ledger) - keep_recent)
+            if archived and not self.lazy:
+                with self._lock:
+                    base = self.store.archived_count()
+                    self.ledger = TieredLedger(self.store, list(self.ledger[base:]))
+                    self._hash_positions = {h: p for h, p in self._hash_positions.items() if p >= base}
+                    self._annotations = {h: p for h, p in self._annotations.items() if p >= base}
+        logger.info(f"Archived {archived} audit entries")
+        return archived
+
+    def verify_report(self, workers=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Full parallel audit. The ledger is split into chunks that a process pool re-hashes and
+        chain-checks independently (segmented ledgers are read from disk by each worker), then the
+        chunk boundaries are stitched together. Unlike verify_integrity it does not stop at the
+        first problem: every broken index and failing checkpoint is reported.
+        """
+        total = len(self.ledger)
+        checkpoints = [checkpoint for checkpoint in self.checkpoints if checkpoint['end'] <= total]
+        tasks = []
+        for start, stop, blocks in plan_chunks(total, checkpoints, chunk_size):
+            source = self.store.directory if self.store is not None else self.ledger[start:stop]
+            tasks.append((start, stop, source, blocks))
+        hash_mismatches, chain_breaks, roots = run_verification(tasks, workers)
+
+        checkpoint_failures = []
+        unsigned_checkpoints = []
+        for checkpoint in self.checkpoints:
+            if not checkpoint.get('signature'):
+                # A matching root without a signature proves nothing about who sealed it
+                if self._checkpoint_root(checkpoint, roots) == checkpoint['root']:
+                    unsigned_checkpoints.append(checkpoint['block'])
+                else:
+                    checkpoint_failures.append(checkpoint['block'])
+                continue
+            if checkpoint['block'] in roots:
+                valid = (roots[checkpoint['block']] == checkpoint['root'] and
+                         verify_signature(self._checkpoint_message(checkpoint), checkpoint['signature'], self.checkpoint_key))
+            else:
+                # Blocks that straddle a chunk boundary are re-rooted here
+                valid = self._verify_checkpoint(checkpoint)
+            if not valid:
+                checkpoint_failures.append(checkpoint['block'])
+
+        for i in hash_mismatches:
+            logger.error(f"Integrity check failed at entry {i}")
+        for i in chain_breaks:
+            logger.error(f"Chain broken at entry {i}")
+        for block in checkpoint_failures:
+            logger.error(f"Checkpoint {block} does not match the ledger")
+        for block in unsigned_checkpoints:
+            logger.warning(f"Checkpoint {block} is unsigned")
+        report = {
+            'valid': not (hash_mismatches or chain_breaks or checkpoint_failures or unsigned_checkpoints),
+            'checked': total,
+            'chunks': len(tasks),
+            'hash_mismatches': hash_mismatches,
+            'chain_breaks': chain_breaks,
+            'checkpoint_failures': checkpoint_failures,
+            'unsigned_checkpoints': unsigned_checkpoints,
+            'broken_indices': sorted(set(hash_mismatches) | set(chain_breaks))
+        }
+        if report['valid']:
+            logger.info(f"Ledger integrity verified across {len(tasks)} chunks")
+        return report
+
+    def _checkpoint_message(self, checkpoint):
+        return f"{checkpoint['start']}:{checkpoint['end']}:{checkpoint['root']}"
+
+    def _checkpoint_root(self, checkpoint, roots):
+        if checkpoint['block'] in roots:
+            return roots[checkpoint['block']]
+        if checkpoint['end'] > len(self.ledger):
+            return None
+        return merkle_root([entry['hash'] for entry in self.ledger[checkpoint['start']:checkpoint['end']]])
+
+    def _verify_checkpoint(self, checkpoint):
+        if self._checkpoint_root(checkpoint, {}) != checkpoint['root']:
+            return False
+        return verify_signature(self._checkpoint_message(checkpoint), checkpoint['signature'], self.checkpoint_key)
+
+    def checkpoint(self):
+        """
+        Seal every entry since the last checkpoint under a signed Merkle root.
+        Returns the new checkpoint, or None if there is nothing to seal. Raises ValueError
+        when no checkpoint key is configured.
+        """
+        if not self.checkpoint_key:
+            raise ValueError("checkpoint() requires checkpoint_key or AUDIT_CHECKPOINT_KEY")
+        with self._flush_lock, self._file_lock:
+            self._sync()
+            return self._seal_checkpoint()
+
+    def _seal_checkpoint(self):
+        start = self.checkpoints[-1]['end'] if self.checkpoints else 0
+        end = len(self.ledger)
+        if end <= start:
+            return None
+        hashes = [entry['hash'] for entry in self.ledger[start:end]]
+        checkpoint = {
+            'block': len(self.checkpoints),
+            'start': start,
+            'end': end,
+            'root': merkle_root(hashes),
+            'last_hash': hashes[-1],
+            'created_at': datetime.now(timezone.utc).isoformat()
+        }
+        checkpoint['signature'] = sign_root(self._checkpoint_message(checkpoint), self.checkpoint_key)
+        with open(self.checkpoint_file, 'a') as f:
+            f.write(json.dumps(checkpoint) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        self._checkpoint_size = os.path.getsize(self.checkpoint_file)
+        self.checkpoints.append(checkpoint)
+        logger.info(f"Sealed audit checkpoint {checkpoint['block']} over entries {start}-{end - 1}")
+        return checkpoint
+
+    def get_inclusion_proof(self, entry_hash):
+        """
+        Return a Merkle inclusion proof tying one entry hash to its signed checkpoint root.
+        """
+        index = self._position_of(entry_hash)
+        if index is None:
+            raise KeyError(f"Unknown entry hash: {entry_hash}")
+        block = bisect.bisect_right([checkpoint['end'] for checkpoint in self.checkpoints], index)
+        if block >= len(self.checkpoints):
+            raise ValueError(f"Entry {index} is not covered by a checkpoint yet")
+        checkpoint = self.checkpoints[block]
+        hashes = [entry['hash'] for entry in self.ledger[checkpoint['start']:checkpoint['end']]]
+        return {
+            'entry_hash': entry_hash,
+            'index': index,
+            'block': block,
+            'start': checkpoint['start'],
+            'end': checkpoint['end'],
+            'root': checkpoint['root'],
+            'signature': checkpoint['signature'],
+            'path': inclusion_proof(hashes, index - checkpoint['start'])
+        }
+
+    def verify_inclusion_proof(self, proof):
+        """
+        Verify an inclusion proof in O(log n) hashes against the stored, signed checkpoint.
+        """
+        if not 0 <= proof['block'] < len(self.checkpoints):
+            return False
+        checkpoint = self.checkpoints[proof['block']]
+        if checkpoint['root'] != proof['root']:
+            return False
+        if not verify_signature(self._checkpoint_message(checkpoint), checkpoint['signature'], self.checkpoint_key):
+            return False
+        return verify_inclusion(proof['entry_hash'], proof['path'], proof['root'])
+
 def main():
     audit = AuditLogger()
     # Example usage
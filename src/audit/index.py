@@ -0,0 +1,110 @@
+import bisect
+import json
+import logging
+import os
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class LedgerIndex:
+    """
+    Secondary indexes over ledger positions by shipment_id, approval_status and timestamp, plus
+    the set of outbox event ids recorded in reasoning traces.
+    When index_file is set, one record per entry is appended to a JSON Lines file so the
+    index survives restarts; it is rebuilt from the ledger if it falls out of step.
+    """
+    def __init__(self, index_file=None):
+        self.index_file = index_file
+        self.reset()
+
+    def reset(self):
+        self.by_shipment = {}
+        self.by_status = {}
+        self.events = set()
+        self.timestamps = []
+        # Timestamps normally arrive in ledger order, which lets time ranges map to position ranges
+        self.monotonic = True
+        self.count = 0
+
+    def _add(self, position, shipment_id, status, timestamp, event_id=None):
+        self.by_shipment.setdefault(shipment_id, []).append(position)
+        self.by_status.setdefault(status, []).append(position)
+        if event_id is not None:
+            self.events.add(event_id)
+        if self.timestamps and timestamp < self.timestamps[-1]:
+            self.monotonic = False
+        self.timestamps.append(timestamp)
+        self.count = position + 1
+
+    @staticmethod
+    def _record(position, entry):
+        data = entry['data']
+        trace = data.get('reasoning_trace')
+        event_id = trace.get('event_id') if isinstance(trace, dict) else None
+        return [position, data.get('shipment_id'), data.get('approval_status'), data.get('timestamp', ''), event_id]
+
+    def load(self, entries):
+        """
+        Load the persisted index and catch up with any entries it has not seen.
+        """
+        self.reset()
+        damaged = False
+        if self.index_file and os.path.exists(self.index_file):
+            with open(self.index_file, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        record = None
+                    # Records written before event ids were indexed have four fields
+                    if record is None or len(record) < 5 or record[0] != self.count:
+                        damaged = True
+                        break
+                    self._add(*record)
+        if damaged or self.count > len(entries):
+            logger.warning("Audit index is out of step with the ledger, rebuilding")
+            self.rebuild(entries)
+        elif self.count < len(entries):
+            self.add(entries[self.count:], self.count)
+
+    def rebuild(self, entries):
+        self.reset()
+        if self.index_file and os.path.exists(self.index_file):
+            os.remove(self.index_file)
+        self.add(entries, 0)
+
+    def add(self, entries, start, persist=True):
+        """
+        Index entries starting at ledger position start. persist=False skips the index file,
+        for entries another process has already indexed.
+        """
+        records = [self._record(start + offset, entry) for offset, entry in enumerate(entries)]
+        for record in records:
+            self._add(*record)
+        if self.index_file and records and persist:
+            with open(self.index_file, 'a') as f:
+                f.write(''.join(json.dumps(record) + '\n' for record in records))
+
+    def positions(self, shipment_id=None, status=None, start=None, end=None):
+        """
+        Return candidate positions (ascending) for the most selective filter given.
+        Positions may still need checking against the remaining filters.
+        """
+        candidates = []
+        if shipment_id is not None:
+            candidates.append(self.by_shipment.get(shipment_id, []))
+        if status is not None:
+            candidates.append(self.by_status.get(status, []))
+        if start is not None or end is not None:
+            candidates.append(self._time_positions(start, end))
+        if not candidates:
+            return range(self.count)
+        return min(candidates, key=len)
+
+    def _time_positions(self, start, end):
+        if self.monotonic:
+            lo = bisect.bisect_left(self.timestamps, start) if start is not None else 0
+            hi = bisect.bisect_left(self.timestamps, end) if end is not None else self.count
+            return range(lo, hi)
+        return [i for i, ts in enumerate(self.timestamps)
+                if (start is None or ts >= start) and (end is None or ts < end)]
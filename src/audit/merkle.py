@@ -0,0 +1,76 @@
+import hashlib
+import hmac
+
+# Domain separation prefixes keep a leaf from ever being confused with an interior node
+LEAF_PREFIX = b'\x00'
+NODE_PREFIX = b'\x01'
+
+def _leaf(entry_hash):
+    return hashlib.sha256(LEAF_PREFIX + bytes.fromhex(entry_hash)).digest()
+
+def _node(left, right):
+    return hashlib.sha256(NODE_PREFIX + left + right).digest()
+
+def _next_level(level):
+    # An odd trailing node is promoted unchanged to the next level
+    parents = [_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+    if len(level) % 2:
+        parents.append(level[-1])
+    return parents
+
+def merkle_root(entry_hashes):
+    """
+    Compute the Merkle root (hex) over a block of ledger entry hashes.
+    """
+    if not entry_hashes:
+        raise ValueError("Cannot compute a Merkle root over an empty block")
+    level = [_leaf(h) for h in entry_hashes]
+    while len(level) > 1:
+        level = _next_level(level)
+    return level[0].hex()
+
+def inclusion_proof(entry_hashes, index):
+    """
+    Return the audit path for entry_hashes[index] as a list of (sibling_hex, side) pairs,
+    where side is 'left' or 'right' relative to the running hash.
+    """
+    if not 0 <= index < len(entry_hashes):
+        raise IndexError(f"Entry {index} is outside the block")
+    path = []
+    level = [_leaf(h) for h in entry_hashes]
+    while len(level) > 1:
+        sibling = index ^ 1
+        if sibling < len(level):
+            path.append((level[sibling].hex(), 'left' if sibling < index else 'right'))
+        level = _next_level(level)
+        index //= 2
+    return path
+
+def verify_inclusion(entry_hash, path, root):
+    """
+    Check an audit path in O(log n) hashes.
+    """
+    running = _leaf(entry_hash)
+    for sibling_hex, side in path:
+        sibling = bytes.fromhex(sibling_hex)
+        running = _node(sibling, running) if side == 'left' else _node(running, sibling)
+    return hmac.compare_digest(running.hex(), root)
+
+def sign_root(message, key):
+    """
+    HMAC-SHA256 signature over a checkpoint message (block range and root).
+    Raises ValueError when no key is configured: checkpoints are never sealed unsigned.
+    """
+    if not key:
+        raise ValueError("Signing a checkpoint requires a checkpoint key")
+    if isinstance(key, str):
+        key = key.encode()
+    return hmac.new(key, message.encode(), hashlib.sha256).hexdigest()
+
+def verify_signature(message, signature, key):
+    """
+    An unsigned checkpoint, or one checked without a key, never verifies.
+    """
+    if not key or not signature:
+        return False
+    return hmac.compare_digest(sign_root(message, key), signature)
@@ -0,0 +1,466 @@
+import gzip
+import hashlib
+import json
+import logging
+import mmap
+import os
+from collections import OrderedDict
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'manifest.json'
+
+ARCHIVE_SUFFIX = '.gz'
+
+def mapped_lines(path):
+    """
+    Yield raw record lines from a segment through a read-only memory map.
+    Archived (gzip) segments are decompressed as a stream instead. A missing segment raises
+    FileNotFoundError rather than reading as empty.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Audit segment {path} is missing")
+    if os.path.getsize(path) == 0:
+        return
+    if path.endswith(ARCHIVE_SUFFIX):
+        with gzip.open(path, 'rb') as f:
+            for line in f:
+                if line.strip():
+                    yield line
+        return
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for line in iter(mapped.readline, b''):
+                if line.strip():
+                    yield line
+
+def read_range(directory, start, stop):
+    """
+    Read-only streaming of entries [start, stop) straight from a segment directory,
+    for readers (such as verification workers) that do not own a SegmentStore.
+    """
+    with open(os.path.join(directory, MANIFEST_NAME), 'r') as f:
+        segments = json.load(f)['segments']
+    position = 0
+    for i, segment in enumerate(segments):
+        # The active segment's count is not tracked in the manifest
+        if i < len(segments) - 1 and position + segment['count'] <= start:
+            position += segment['count']
+            continue
+        path = os.path.join(directory, segment['name'])
+        # The active segment file is only created by its first append
+        if i == len(segments) - 1 and not os.path.exists(path):
+            return
+        for line in mapped_lines(path):
+            if position >= stop:
+                return
+            if position >= start:
+                yield json.loads(line)
+            position += 1
+
+class SegmentStore:
+    """
+    Append-only ledger storage split into rolling JSON Lines segment files.
+    Each entry is written as one line and fsync'd; a manifest lists the segments in order.
+    """
+    def __init__(self, directory, segment_size=10000):
+        self.directory = directory
+        self.segment_size = segment_size
+        self.manifest = None
+        self._active_count = 0
+        self._active_size = 0
+        os.makedirs(self.directory, exist_ok=True)
+        self.load_manifest()
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, MANIFEST_NAME)
+
+    def _segment_path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _segment_name(self, number):
+        return f"segment-{number:06d}.jsonl"
+
+    def load_manifest(self):
+        try:
+            with open(self.manifest_path, 'r') as f:
+                self.manifest = json.load(f)
+        except FileNotFoundError:
+            self.manifest = {
+                'version': 1,
+                'segment_size': self.segment_size,
+                'segments': [{'name': self._segment_name(0), 'count': 0}],
+                'migrated_from': None
+            }
+            self._write_manifest()
+            logger.info(f"Segmented audit ledger initialized in {self.directory}")
+        self.segment_size = self.manifest.get('segment_size', self.segment_size)
+        self._active_count, self._active_size = self._recover_active_segment()
+
+    def _write_manifest(self):
+        tmp_path = self.manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.manifest, f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.manifest_path)
+
+    def _recover_active_segment(self):
+        """
+        Count entries in the active segment, truncating a torn trailing record left by a crash.
+        """
+        path = self._segment_path(self.manifest['segments'][-1]['name'])
+        if not os.path.exists(path):
+            return 0, 0
+        count = 0
+        valid_size = 0
+        with open(path, 'rb') as f:
+            for line in f:
+                try:
+                    json.loads(line)
+                except ValueError:
+                    break
+                if not line.endswith(b'\n'):
+                    break
+                count += 1
+                valid_size += len(line)
+        if valid_size != os.path.getsize(path):
+            logger.warning(f"Truncating torn record at end of {path}")
+            with open(path, 'r+b') as f:
+                f.truncate(valid_size)
+        return count, valid_size
+
+    def __len__(self):
+        sealed = sum(segment['count'] for segment in self.manifest['segments'][:-1])
+        return sealed + self._active_count
+
+    def is_empty(self):
+        return len(self) == 0
+
+    def append(self, entries):
+        """
+        Append entries as JSON Lines records, rolling to a new segment when the active one is full.
+        Each segment file touched is fsync'd once.
+        """
+        pending = list(entries)
+        while pending:
+            room = self.segment_size - self._active_count
+            if room <= 0:
+                self._roll_segment()
+                continue
+            chunk, pending = pending[:room], pending[room:]
+            path = self._segment_path(self.manifest['segments'][-1]['name'])
+            payload = ''.join(json.dumps(entry, separators=(',', ':')) + '\n' for entry in chunk).encode()
+            with open(path, 'ab') as f:
+                f.write(payload)
+                f.flush()
+                os.fsync(f.fileno())
+            self._active_count += len(chunk)
+            self._active_size += len(payload)
+
+    def _roll_segment(self):
+        segments = self.manifest['segments']
+        segments[-1]['count'] = self._active_count
+        segments.append({'name': self._segment_name(len(segments)), 'count': 0})
+        self._write_manifest()
+        self._active_count = 0
+        self._active_size = 0
+        logger.info(f"Rolled audit ledger to segment {segments[-1]['name']}")
+
+    def refresh(self):
+        """
+        Pick up entries appended by other processes since this store last read or wrote.
+        Returns the new entries in ledger order.
+        """
+        active_index = len(self.manifest['segments']) - 1
+        offset = self._active_size
+        with open(self.manifest_path, 'r') as f:
+            self.manifest = json.load(f)
+        segments = self.manifest['segments']
+        new_entries = []
+        for i in range(active_index, len(segments)):
+            path = self._segment_path(segments[i]['name'])
+            data = b''
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    f.seek(offset)
+                    data = f.read()
+            # Only complete records; a writer holding the ledger lock never leaves partial ones
+            data = data[:data.rfind(b'\n') + 1]
+            records = [json.loads(line) for line in data.splitlines() if line.strip()]
+            new_entries.extend(records)
+            if i == active_index:
+                self._active_count += len(records)
+                self._active_size = offset + len(data)
+            else:
+                self._active_count = len(records)
+                self._active_size = len(data)
+            offset = 0
+        return new_entries
+
+    def _segment_count(self, i):
+        segments = self.manifest['segments']
+        return self._active_count if i == len(segments) - 1 else segments[i]['count']
+
+    def iter_entries(self, start=0, stop=None):
+        """
+        Yield entries in ledger order from position start (up to stop), skipping whole
+        segments by their manifest counts so nothing before start is parsed.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        position = 0
+        for i in range(len(self.manifest['segments'])):
+            count = self._segment_count(i)
+            if position + count <= start:
+                position += count
+                continue
+            for line in mapped_lines(self._locate_segment(i)):
+                if position >= stop:
+                    return
+                if position >= start:
+                    yield json.loads(line)
+                position += 1
+            if position >= stop:
+                return
+
+    def _locate_segment(self, i):
+        """
+        Path of segment i. A hot segment that another process has archived since this store
+        read the manifest is found again under its archive name; positions do not change.
+        """
+        path = self._segment_path(self.manifest['segments'][i]['name'])
+        if os.path.exists(path):
+            return path
+        with open(self.manifest_path, 'r') as f:
+            current = json.load(f)['segments']
+        for j, segment in enumerate(current[:len(self.manifest['segments']) - 1]):
+            if segment.get('archived'):
+                self.manifest['segments'][j] = segment
+        return self._segment_path(self.manifest['segments'][i]['name'])
+
+    def tail(self):
+        """
+        Return the last entry by reading backwards from the end of the newest non-empty segment.
+        """
+        for segment in reversed(self.manifest['segments']):
+            path = self._segment_path(segment['name'])
+            if not os.path.exists(path) or os.path.getsize(path) == 0:
+                continue
+            with open(path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    end = mapped.rfind(b'\n', 0, len(mapped) - 1)
+                    return json.loads(mapped[end + 1:])
+        return None
+
+    def load(self):
+        return list(self.iter_entries())
+
+    def archived_count(self):
+        """
+        Number of entries held in archived segments, which always form a prefix of the ledger.
+        """
+        count = 0
+        for segment in self.manifest['segments']:
+            if not segment.get('archived'):
+                break
+            count += segment['count']
+        return count
+
+    def load_hot(self):
+        """
+        Load only the entries in segments that have not been archived.
+        """
+        return list(self.iter_entries(self.archived_count()))
+
+    def archive_segments(self, upto):
+        """
+        Compress every sealed segment lying entirely before position upto into a read-only gzip
+        archive. Each archive records its anchor hash (the previous_hash of its first entry), its
+        last hash and a digest of the compressed file, so the chain can be checked across archives.
+        Returns the number of entries archived.
+        """
+        segments = self.manifest['segments']
+        position = 0
+        archived = 0
+        for segment in segments[:-1]:
+            count = segment['count']
+            if segment.get('archived'):
+                position += count
+                continue
+            if position + count > upto:
+                break
+            path = self._segment_path(segment['name'])
+            with open(path, 'rb') as f:
+                raw = f.read()
+            lines = raw.splitlines()
+            first, last = json.loads(lines[0]), json.loads(lines[-1])
+            archive_name = segment['name'] + ARCHIVE_SUFFIX
+            archive_path = self._segment_path(archive_name)
+            tmp_path = archive_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                with gzip.GzipFile(fileobj=f, mode='wb', mtime=0) as compressed:
+                    compressed.write(raw)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, archive_path)
+            os.chmod(archive_path, 0o444)
+            segment.update({
+                'name': archive_name,
+                'archived': True,
+                'first_position': position,
+                'anchor_hash': first['data']['previous_hash'],
+                'last_hash': last['hash'],
+                'sha256': self._file_digest(archive_path)
+            })
+            # The manifest points at the archive before the hot copy is removed
+            self._write_manifest()
+            os.remove(path)
+            logger.info(f"Archived audit segment {archive_name} ({count} entries)")
+            position += count
+            archived += count
+        return archived
+
+    def _file_digest(self, path):
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def verify_archives(self):
+        """
+        Check archive digests and that each archive's anchor hash links to the archive before it,
+        without decompressing anything. Returns (failing segment names, last archived hash).
+        """
+        failures = []
+        previous_hash = None
+        for segment in self.manifest['segments']:
+            if not segment.get('archived'):
+                break
+            path = self._segment_path(segment['name'])
+            if not os.path.exists(path) or self._file_digest(path) != segment['sha256']:
+                failures.append(segment['name'])
+            elif previous_hash is not None and segment['anchor_hash'] != previous_hash:
+                failures.append(segment['name'])
+            previous_hash = segment['last_hash']
+        return failures, previous_hash
+
+    def migrate_from_json(self, json_path):
+        """
+        One-time import of a legacy JSON array ledger. The source file is left untouched.
+        """
+        if not self.is_empty():
+            raise ValueError("Segmented ledger already contains entries, refusing to migrate")
+        with open(json_path, 'r') as f:
+            entries = json.load(f)
+        self.append(entries)
+        self.manifest['migrated_from'] = os.path.abspath(json_path)
+        self.manifest['segments'][-1]['count'] = self._active_count
+        self._write_manifest()
+        logger.info(f"Migrated {len(entries)} audit entries from {json_path}")
+        return len(entries)
+
+class LazyLedger:
+    """
+    Read-only, list-like view over a SegmentStore that keeps no entries in memory except the tail.
+    Iteration and slices stream from memory-mapped segments; single-index access scans one segment.
+    """
+    def __init__(self, store):
+        self.store = store
+        self._count = len(store)
+        self._tail = store.tail() if self._count else None
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return self._count > 0
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def iter_from(self, start=0, stop=None):
+        stop = self._count if stop is None else min(stop, self._count)
+        return self.store.iter_entries(start, stop)
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self._count)
+            entries = list(self.iter_from(start, stop))
+            return entries[::step] if step != 1 else entries
+        if key < 0:
+            key += self._count
+        if not 0 <= key < self._count:
+            raise IndexError("ledger index out of range")
+        if key == self._count - 1:
+            return self._tail
+        return next(self.iter_from(key, key + 1))
+
+    def extend(self, entries):
+        """
+        Account for newly committed entries; the store itself persists them.
+        """
+        entries = list(entries)
+        if entries:
+            self._count += len(entries)
+            self._tail = entries[-1]
+
+class TieredLedger:
+    """
+    List-like ledger whose older entries live in compressed archive segments.
+    Recent (hot) entries are kept in memory; archived entries are decompressed on demand,
+    one segment at a time, only when a read reaches them.
+    """
+    def __init__(self, store, hot, cache_size=4):
+        self.store = store
+        self.hot = hot
+        self.base = store.archived_count()
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return self.base + len(self.hot)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __iter__(self):
+        return self.iter_from(0)
+
+    def iter_from(self, start=0, stop=None):
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start < self.base:
+            yield from self.store.iter_entries(start, min(stop, self.base))
+        for position in range(max(start, self.base), stop):
+            yield self.hot[position - self.base]
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            entries = list(self.iter_from(start, stop))
+            return entries[::step] if step != 1 else entries
+        if key < 0:
+            key += len(self)
+        if not 0 <= key < len(self):
+            raise IndexError("ledger index out of range")
+        if key >= self.base:
+            return self.hot[key - self.base]
+        return self._archived_entry(key)
+
+    def _archived_entry(self, position):
+        for segment in self.store.manifest['segments']:
+            first = segment['first_position']
+            if first <= position < first + segment['count']:
+                name = segment['name']
+                if name not in self._cache:
+                    self._cache[name] = list(self.store.iter_entries(first, first + segment['count']))
+                    if len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+                self._cache.move_to_end(name)
+                return self._cache[name][position - first]
+        raise IndexError("ledger index out of range")
+
+    def extend(self, entries):
+        self.hot.extend(entries)
@@ -0,0 +1,54 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class SummaryWorker:
+    """
+    Background pool that generates Nova compliance summaries for committed ledger entries
+    and attaches them as linked annotation entries.
+    """
+    def __init__(self, audit, max_workers=2):
+        self.audit = audit
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='audit-summary')
+        self._pending = {}
+        self._in_flight = set()
+        self._lock = threading.Lock()
+
+    def submit(self, entry):
+        """
+        Queue an entry for summarization. Returns None if it is already queued.
+        """
+        with self._lock:
+            if entry['hash'] in self._in_flight:
+                return None
+            future = self.executor.submit(self._summarize, entry)
+            self._pending[future] = entry['hash']
+            self._in_flight.add(entry['hash'])
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future):
+        with self._lock:
+            self._in_flight.discard(self._pending.pop(future, None))
+
+    def _summarize(self, entry):
+        summary = self.audit.call_nova(self.audit._summary_prompt(entry['data']))
+        if not summary:
+            logger.warning(f"Compliance summary failed for entry {entry['hash']}, leaving it for backfill")
+            return None
+        return self.audit.log_annotation(entry['hash'], summary)
+
+    def wait(self, timeout=None):
+        """
+        Block until every submitted summary has been attached (or timeout expires).
+        """
+        with self._lock:
+            pending = list(self._pending)
+        done, not_done = wait(pending, timeout=timeout)
+        return len(not_done) == 0
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
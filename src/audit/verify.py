@@ -0,0 +1,100 @@
+import bisect
+import hashlib
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from audit.merkle import merkle_root
+from audit.segments import read_range
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 50000
+
+def compute_hash(data):
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+def verify_chunk(task):
+    """
+    Re-hash one chunk of the ledger and check the chain links inside it.
+    task is (start, stop, source, blocks) where source is either a list of entries or a
+    segment directory to read [start, stop) from, and blocks are (block, start, end)
+    checkpoint ranges lying inside the chunk whose Merkle roots should be recomputed.
+    Module-level so it can be pickled into a process pool.
+    """
+    start, stop, source, blocks = task
+    entries = read_range(source, start, stop) if isinstance(source, str) else source
+    hash_mismatches = []
+    chain_breaks = []
+    first_previous_hash = None
+    previous_hash = None
+    hashes = []
+    position = start
+    for position, entry in enumerate(entries, start):
+        if position == start:
+            first_previous_hash = entry['data'].get('previous_hash')
+        elif entry['data'].get('previous_hash') != previous_hash:
+            chain_breaks.append(position)
+        if entry['hash'] != compute_hash(entry['data']):
+            hash_mismatches.append(position)
+        previous_hash = entry['hash']
+        if blocks:
+            hashes.append(entry['hash'])
+    roots = {block: merkle_root(hashes[block_start - start:block_end - start])
+             for block, block_start, block_end in blocks if block_end - start <= len(hashes)}
+    return {
+        'start': start,
+        'stop': stop,
+        'first_previous_hash': first_previous_hash,
+        'last_hash': previous_hash,
+        'hash_mismatches': hash_mismatches,
+        'chain_breaks': chain_breaks,
+        'roots': roots
+    }
+
+def plan_chunks(total, checkpoints, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Split [0, total) into chunks of roughly chunk_size, cutting on checkpoint boundaries where
+    possible so each checkpoint block can be re-rooted by a single worker.
+    Returns a list of (start, stop, blocks).
+    """
+    ends = [checkpoint['end'] for checkpoint in checkpoints]
+    chunks = []
+    start = 0
+    while start < total:
+        target = start + chunk_size
+        i = bisect.bisect_left(ends, target)
+        stop = ends[i] if i < len(ends) and ends[i] < target + chunk_size else target
+        stop = min(stop, total)
+        blocks = [(c['block'], c['start'], c['end']) for c in checkpoints if c['start'] >= start and c['end'] <= stop]
+        chunks.append((start, stop, blocks))
+        start = stop
+    return chunks
+
+def run_verification(tasks, workers=None):
+    """
+    Run verify_chunk over the tasks, in a process pool when there is more than one chunk,
+    and stitch the chunk boundaries together.
+    """
+    if len(tasks) > 1 and workers != 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(verify_chunk, tasks))
+    else:
+        results = [verify_chunk(task) for task in tasks]
+
+    hash_mismatches = []
+    chain_breaks = []
+    roots = {}
+    for i, result in enumerate(results):
+        hash_mismatches.extend(result['hash_mismatches'])
+        if i > 0 and result['start'] < result['stop'] and result['first_previous_hash'] != results[i - 1]['last_hash']:
+            chain_breaks.append(result['start'])
+        chain_breaks.extend(result['chain_breaks'])
+        roots.update(result['roots'])
+    return hash_mismatches, sorted(chain_breaks), roots
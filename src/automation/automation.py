@@ -6,7 +6,7 @@ import os
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from audit.audit import AuditLogger
+from audit.audit import shared_audit_logger
 
 try:
     from selenium import webdriver
@@ -26,9 +26,9 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class UIAutomation:
-    def __init__(self, driver_path=None, max_retries=3):
+    def __init__(self, driver_path=None, max_retries=3, audit=None):
         self.max_retries = max_retries
-        self.audit = AuditLogger()
+        self._audit = audit
         try:
             from selenium import webdriver
             options = webdriver.ChromeOptions()
@@ -39,6 +39,13 @@ class UIAutomation:
             logger.error(f"Failed to initialize driver: {e}")
             self.driver = None
 
+    @property
+    def audit(self):
+        # Resolved on first use so building the driver does not load the ledger
+        if self._audit is None:
+            self._audit = shared_audit_logger()
+        return self._audit
+
     def _retry_action(self, action, *args, **kwargs):
         for attempt in range(self.max_retries):
             try:
@@ -0,0 +1,135 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Where each feed keeps its records and which fields identify a record
+RECORD_LISTS = {'shipments': 'shipments', 'weather': 'alerts', 'strikes': 'strikes'}
+RECORD_IDS = ('id', 'shipment_id', 'alert_id', 'strike_id')
+
+def records(payload, kind=None):
+    """
+    The record list inside a feed payload: the payload itself if it is a list, else its
+    RECORD_LISTS[kind] list, else its first list value.
+    """
+    if isinstance(payload, list):
+        return payload
+    if not isinstance(payload, dict):
+        return []
+    if kind in RECORD_LISTS and isinstance(payload.get(RECORD_LISTS[kind]), list):
+        return payload[RECORD_LISTS[kind]]
+    return next((value for value in payload.values() if isinstance(value, list)), [])
+
+def record_key(record):
+    if isinstance(record, dict):
+        for field in RECORD_IDS:
+            if record.get(field) is not None:
+                return f"{field}:{record[field]}"
+    return 'hash:' + hashlib.sha256(json.dumps(record, sort_keys=True, default=str).encode()).hexdigest()
+
+def compute_delta(previous, current, kind=None):
+    """
+    Record-level difference between two payloads of the same feed. Records match on their id
+    field (see RECORD_IDS) or, without one, on their content. Returns lists of added, changed
+    (new version) and removed records.
+    """
+    before = {record_key(r): r for r in records(previous, kind)} if previous is not None else {}
+    after = {record_key(r): r for r in records(current, kind)} if current is not None else {}
+    return {
+        'added': [r for key, r in after.items() if key not in before],
+        'changed': [r for key, r in after.items() if key in before and before[key] != r],
+        'removed': [r for key, r in before.items() if key not in after]
+    }
+
+class FeedCache:
+    """
+    Per-URL ETag/Last-Modified validators and payload snapshots for conditional polling.
+    A 304 is answered from the snapshot; otherwise the new payload replaces it and the record
+    delta against the previous cycle is kept for downstream stages. With snapshot_dir the
+    snapshots survive restarts.
+    """
+    def __init__(self, snapshot_dir=None):
+        self.snapshot_dir = snapshot_dir
+        self._entries = {}
+        self._deltas = {}
+        self._lock = threading.Lock()
+        self._stats = {'requests': 0, 'not_modified': 0, 'modified': 0}
+        if snapshot_dir:
+            os.makedirs(snapshot_dir, exist_ok=True)
+
+    def _path(self, url):
+        return os.path.join(self.snapshot_dir, hashlib.sha256(url.encode()).hexdigest() + '.json')
+
+    def _entry(self, url):
+        with self._lock:
+            if url in self._entries:
+                return self._entries[url]
+        entry = None
+        if self.snapshot_dir:
+            try:
+                with open(self._path(url), 'r') as f:
+                    entry = json.load(f)
+            except (FileNotFoundError, ValueError):
+                entry = None
+        with self._lock:
+            self._entries.setdefault(url, entry)
+            return self._entries[url]
+
+    def _store(self, url, entry):
+        with self._lock:
+            self._entries[url] = entry
+        if self.snapshot_dir:
+            tmp_path = self._path(url) + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(url))
+
+    def get(self, http, url, timeout=10, kind=None):
+        """
+        Conditional GET of url through http (a requests Session or the requests module).
+        Returns {'data', 'modified', 'delta'}; raises requests exceptions like requests.get.
+        """
+        entry = self._entry(url)
+        headers = {}
+        if entry and entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry and entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        response = http.get(url, timeout=timeout, headers=headers)
+        with self._lock:
+            self._stats['requests'] += 1
+        if response.status_code == 304 and entry is not None:
+            delta = {'added': [], 'changed': [], 'removed': []}
+            with self._lock:
+                self._stats['not_modified'] += 1
+                self._deltas[url] = delta
+            logger.info(f"{url} not modified, using snapshot")
+            return {'data': entry['data'], 'modified': False, 'delta': delta}
+        response.raise_for_status()
+        data = response.json()
+        delta = compute_delta(entry['data'] if entry else None, data, kind)
+        self._store(url, {
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'data': data
+        })
+        with self._lock:
+            self._stats['modified'] += 1
+            self._deltas[url] = delta
+        logger.info(f"{url} delta: {len(delta['added'])} added, {len(delta['changed'])} changed, {len(delta['removed'])} removed")
+        return {'data': data, 'modified': True, 'delta': delta}
+
+    def delta(self, url):
+        """
+        Delta from the most recent fetch of url (None if it was never fetched).
+        """
+        with self._lock:
+            return self._deltas.get(url)
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
@@ -1,60 +1,112 @@
 import requests
 import logging
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from requests.adapters import HTTPAdapter
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def fetch_shipment_data(api_url):
-    try:
-        logger.info(f"Fetching shipment data from {api_url}")
-        response = requests.get(api_url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        logger.info("Shipment data fetched successfully")
-        return data
-    except requests.RequestException as e:
-        logger.error(f"Error fetching shipment data: {e}")
-        return None
+# Default cap on concurrent feed requests per fetch_all call
+MAX_FETCH_WORKERS = 32
+
+def create_session(pool_size=10):
+    """
+    requests.Session with a keep-alive connection pool of pool_size per host, so repeated
+    polls and concurrent fetches reuse TCP/TLS connections.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
 
-def fetch_weather_alerts(api_url):
+def _fetch(description, api_url, session=None, timeout=10, cache=None, kind=None):
+    http = session or requests
     try:
-        logger.info(f"Fetching weather alerts from {api_url}")
-        response = requests.get(api_url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        logger.info("Weather alerts fetched successfully")
+        logger.info(f"Fetching {description} from {api_url}")
+        if cache is not None:
+            # Conditional request; a 304 is served from the cache's snapshot
+            data = cache.get(http, api_url, timeout, kind)['data']
+        else:
+            response = http.get(api_url, timeout=timeout)
+            response.raise_for_status()
+            data = response.json()
+        logger.info(f"{description[0].upper()}{description[1:]} fetched successfully")
         return data
     except requests.RequestException as e:
-        logger.error(f"Error fetching weather alerts: {e}")
+        logger.error(f"Error fetching {description}: {e}")
         return None
 
-def fetch_strike_news(api_url):
+def fetch_shipment_data(api_url, session=None, cache=None):
+    return _fetch("shipment data", api_url, session, cache=cache, kind='shipments')
+
+def fetch_weather_alerts(api_url, session=None, cache=None):
+    return _fetch("weather alerts", api_url, session, cache=cache, kind='weather')
+
+def fetch_strike_news(api_url, session=None, cache=None):
+    return _fetch("strike news", api_url, session, cache=cache, kind='strikes')
+
+FEED_FETCHERS = {
+    'shipments': fetch_shipment_data,
+    'weather': fetch_weather_alerts,
+    'strikes': fetch_strike_news
+}
+
+def fetch_all(feeds, session=None, max_workers=None, cache=None):
+    """
+    Fetch every feed concurrently over one pooled session, so a cycle takes as long as the
+    slowest feed. feeds maps a name to a URL, or to a dict of URLs (e.g. one per carrier) whose
+    results come back under the same keys. Known names ('shipments', 'weather', 'strikes') use
+    their fetch_* function. Failed feeds come back as None. With a FeedCache, requests are
+    conditional and cache.delta(url) gives each feed's record-level changes. At most
+    max_workers (default MAX_FETCH_WORKERS) requests run at once; a session created here is
+    pooled to match.
+    """
+    jobs = []
+    for name, target in feeds.items():
+        urls = target.items() if isinstance(target, dict) else [(None, target)]
+        jobs.extend((name, key, url) for key, url in urls)
+    if not jobs:
+        return {}
+    workers = min(len(jobs), max_workers or MAX_FETCH_WORKERS)
+    owned = session is None
+    session = session or create_session(pool_size=workers)
+    results = {name: {} if isinstance(target, dict) else None for name, target in feeds.items()}
     try:
-        logger.info(f"Fetching strike news from {api_url}")
-        response = requests.get(api_url, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        logger.info("Strike news fetched successfully")
-        return data
-    except requests.RequestException as e:
-        logger.error(f"Error fetching strike news: {e}")
-        return None
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='ingest') as executor:
+            futures = [
+                (name, key, executor.submit(FEED_FETCHERS.get(name, partial(_fetch, f"{name} feed", kind=name)), url, session, cache=cache))
+                for name, key, url in jobs
+            ]
+            for name, key, future in futures:
+                if key is None:
+                    results[name] = future.result()
+                else:
+                    results[name][key] = future.result()
+    finally:
+        if owned:
+            session.close()
+    return results
 
-def main():
+def main(carrier_urls=None):
     # Example URLs (replace with actual)
     shipment_url = "https://api.example.com/shipments"
     weather_url = "https://api.weather.com/alerts"
     strike_url = "https://api.news.com/strikes"
 
-    shipment_data = fetch_shipment_data(shipment_url)
-    weather_data = fetch_weather_alerts(weather_url)
-    strike_data = fetch_strike_news(strike_url)
+    # Per-carrier shipment endpoints are fetched alongside the signal feeds
+    data = fetch_all({
+        "shipments": carrier_urls or shipment_url,
+        "weather": weather_url,
+        "strikes": strike_url
+    })
 
     return {
-        "shipments": shipment_data,
-        "weather": weather_data,
-        "strikes": strike_data
+        "shipments": data["shipments"],
+        "weather": data["weather"],
+        "strikes": data["strikes"]
     }
 
 if __name__ == "__main__":
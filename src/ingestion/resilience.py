@@ -0,0 +1,236 @@
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+import requests
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Statuses that count as the endpoint failing rather than rejecting the request
+FAILURE_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+class CircuitOpenError(requests.RequestException):
+    """
+    Raised without contacting an endpoint whose breaker is open and which has no snapshot.
+    """
+
+class CircuitBreaker:
+    """
+    Classic three-state breaker. After failure_threshold consecutive failures it opens and
+    rejects calls for reset_timeout seconds, then lets a single trial call through (half-open):
+    success closes it, failure opens it again.
+    """
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = 'closed'
+        self.failures = 0
+        self._opened_at = 0.0
+        self._trial = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self.state == 'open' and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = 'half_open'
+                self._trial = False
+            if self.state == 'half_open':
+                if self._trial:
+                    return False
+                self._trial = True
+                return True
+            return self.state == 'closed'
+
+    def record_success(self):
+        with self._lock:
+            self.state = 'closed'
+            self.failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self.state == 'half_open' or self.failures >= self.failure_threshold:
+                if self.state != 'open':
+                    logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+                self.state = 'open'
+                self._opened_at = time.monotonic()
+
+class LatencyTracker:
+    """
+    Latencies of the last window successful calls, for percentile-based hedging.
+    """
+    def __init__(self, window=200):
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self):
+        return len(self._samples)
+
+    def percentile(self, p):
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * p / 100))]
+
+class _Endpoint:
+    def __init__(self, failure_threshold, reset_timeout, window):
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self.latency = LatencyTracker(window)
+        self.snapshot = None
+        self.stats = {'requests': 0, 'failures': 0, 'hedged': 0, 'hedge_wins': 0, 'hedges_skipped': 0,
+                      'short_circuited': 0, 'stale_served': 0}
+
+class ResilientSession:
+    """
+    Drop-in for the session argument of the fetch_* functions, fetch_all and FeedCache.get that
+    adds per-endpoint (per-URL) resilience on top of session (a requests Session or the requests
+    module):
+    - a circuit breaker that fails fast while an endpoint keeps failing;
+    - a hedged duplicate request once the first has been running longer than the endpoint's
+      hedge_percentile latency (after hedge_min_samples calls), first response wins; at most
+      max_hedges duplicates are in flight, beyond that requests simply wait for the first;
+    - the last good response served while the breaker is open.
+    Failures are exceptions and FAILURE_STATUSES responses. Streaming requests are passed
+    through unhedged.
+    """
+    def __init__(self, session=None, failure_threshold=5, reset_timeout=30.0, hedge_percentile=95,
+                 hedge_min_samples=20, window=200, max_hedges=4):
+        self.session = session or requests
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_samples = hedge_min_samples
+        self.window = window
+        self._endpoints = {}
+        self._lock = threading.Lock()
+        # Hedges only run when a slot is free, so they never queue behind each other
+        self._hedge_slots = threading.BoundedSemaphore(max_hedges)
+        self._pool = ThreadPoolExecutor(max_workers=max_hedges, thread_name_prefix='hedge')
+
+    def _endpoint(self, url):
+        with self._lock:
+            if url not in self._endpoints:
+                self._endpoints[url] = _Endpoint(self.failure_threshold, self.reset_timeout, self.window)
+            return self._endpoints[url]
+
+    def _count(self, endpoint, key):
+        with self._lock:
+            endpoint.stats[key] += 1
+
+    def _attempt(self, url, kwargs, started=None):
+        if started is not None:
+            started.set()
+        began = time.monotonic()
+        response = self.session.get(url, **kwargs)
+        return response, time.monotonic() - began
+
+    def _start_primary(self, url, kwargs):
+        """
+        Run the first request on its own thread, so it starts at once instead of waiting for a
+        pool worker, and return its future and an event set when it actually starts.
+        """
+        future = Future()
+        started = threading.Event()
+        def run():
+            try:
+                future.set_result(self._attempt(url, kwargs, started))
+            except Exception as e:
+                future.set_exception(e)
+        threading.Thread(target=run, name='resilient-get', daemon=True).start()
+        return future, started
+
+    def _hedge(self, url, kwargs):
+        if not self._hedge_slots.acquire(blocking=False):
+            return None
+        future = self._pool.submit(self._attempt, url, kwargs)
+        future.add_done_callback(lambda _: self._hedge_slots.release())
+        return future
+
+    def _hedged(self, endpoint, url, kwargs):
+        threshold = endpoint.latency.percentile(self.hedge_percentile) if len(endpoint.latency) >= self.hedge_min_samples else None
+        if threshold is None or kwargs.get('stream'):
+            # Nothing to hedge: stay on the calling thread
+            return self._attempt(url, kwargs), False
+        primary, started = self._start_primary(url, kwargs)
+        # The hedge delay counts from when the request really went out
+        started.wait()
+        done, _ = wait([primary], timeout=threshold)
+        if done:
+            return primary.result(), False
+        hedge = self._hedge(url, kwargs)
+        if hedge is None:
+            self._count(endpoint, 'hedges_skipped')
+            return primary.result(), False
+        self._count(endpoint, 'hedged')
+        logger.info(f"{url} slower than p{self.hedge_percentile} ({threshold:.3f}s), sending hedged request")
+        pending = {primary, hedge}
+        error = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    result = future.result()
+                except Exception as e:
+                    error = e
+                    continue
+                return result, future is hedge
+        raise error
+
+    def get(self, url, **kwargs):
+        endpoint = self._endpoint(url)
+        self._count(endpoint, 'requests')
+        if not endpoint.breaker.allow():
+            self._count(endpoint, 'short_circuited')
+            if endpoint.snapshot is not None:
+                self._count(endpoint, 'stale_served')
+                logger.warning(f"Circuit open for {url}, serving last good snapshot")
+                return endpoint.snapshot
+            raise CircuitOpenError(f"Circuit open for {url}")
+        try:
+            (response, elapsed), hedge_won = self._hedged(endpoint, url, kwargs)
+        except Exception:
+            self._count(endpoint, 'failures')
+            endpoint.breaker.record_failure()
+            raise
+        if hedge_won:
+            self._count(endpoint, 'hedge_wins')
+        if response.status_code in FAILURE_STATUSES:
+            self._count(endpoint, 'failures')
+            endpoint.breaker.record_failure()
+            return response
+        endpoint.breaker.record_success()
+        endpoint.latency.record(elapsed)
+        if response.status_code == 200 and not kwargs.get('stream'):
+            endpoint.snapshot = response
+        return response
+
+    def stats(self):
+        """
+        Per-URL breaker state, consecutive failures, latency percentiles and hedging counts.
+        """
+        with self._lock:
+            endpoints = dict(self._endpoints)
+        stats = {}
+        for url, endpoint in endpoints.items():
+            with self._lock:
+                entry = dict(endpoint.stats)
+            entry['state'] = endpoint.breaker.state
+            entry['consecutive_failures'] = endpoint.breaker.failures
+            entry['latency'] = {f'p{p}': endpoint.latency.percentile(p) for p in (50, 95, 99)}
+            entry['latency']['samples'] = len(endpoint.latency)
+            stats[url] = entry
+        return stats
+
+    def close(self):
+        """
+        Stop the hedging pool. The wrapped session belongs to the caller and stays open.
+        """
+        self._pool.shutdown(wait=False)
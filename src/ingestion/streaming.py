@@ -0,0 +1,189 @@
+import codecs
+import json
+import logging
+import queue
+import re
+import threading
+
+import requests
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Top-level text kept around the record array to read metadata such as pagination links
+MAX_ENVELOPE_CHARS = 64 * 1024
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r'[\s,]*')
+# Characters that can continue a JSON number
+_NUMBER_CHARS = frozenset('0123456789.eE+-')
+
+def iter_json_records(chunks, records_key=None, envelope=None):
+    """
+    Yield the elements of a JSON array one at a time while the document is still arriving as
+    chunks (bytes or str). records_key names the array inside a top-level object
+    (e.g. 'shipments'); None means the document is the array. Only the record being decoded
+    is buffered. If envelope is a dict it receives the rest of the top-level object (e.g. a
+    'next' link) once the stream ends.
+    """
+    decode = codecs.getincrementaldecoder('utf-8')()
+    start = re.compile(r'\[' if records_key is None else r'"' + re.escape(records_key) + r'"\s*:\s*\[')
+    chunks = iter(chunks)
+    buffer = ''
+    prefix = ''
+    exhausted = False
+
+    def more():
+        nonlocal buffer, exhausted
+        for chunk in chunks:
+            text = decode.decode(chunk) if isinstance(chunk, bytes) else chunk
+            if text:
+                buffer += text
+                return True
+        buffer += decode.decode(b'', final=True)
+        exhausted = True
+        return False
+
+    # Find the start of the record array, keeping the envelope text before it if asked to
+    while True:
+        match = start.search(buffer)
+        if match:
+            prefix += buffer[:match.end() - 1]
+            buffer = buffer[match.end():]
+            break
+        # Keep a tail in case the key is split across chunks
+        keep = len(records_key or '') + 16
+        if len(buffer) > keep:
+            prefix += buffer[:-keep]
+            buffer = buffer[-keep:]
+        if envelope is None or len(prefix) > MAX_ENVELOPE_CHARS:
+            prefix = ''
+            envelope = None
+        if not more():
+            logger.warning(f"No {records_key or 'top-level'} array found in feed")
+            return
+
+    position = 0
+    while True:
+        position = _WHITESPACE.match(buffer, position).end()
+        if position >= len(buffer):
+            buffer, position = '', 0
+            if not more():
+                raise ValueError("Feed ended inside the record array")
+            continue
+        if buffer[position] == ']':
+            buffer = buffer[position + 1:]
+            break
+        try:
+            record, end = _decoder.raw_decode(buffer, position)
+        except ValueError:
+            if exhausted:
+                raise
+            # Record incomplete: drop what was consumed and read more
+            buffer, position = buffer[position:], 0
+            more()
+            continue
+        # A number cut off by the chunk boundary decodes as a shorter number ('1' of '1.5')
+        if (not exhausted and isinstance(record, (int, float)) and not isinstance(record, bool)
+                and (end == len(buffer) or buffer[end] in _NUMBER_CHARS)):
+            buffer, position = buffer[position:], 0
+            more()
+            continue
+        position = end
+        yield record
+
+    if envelope is not None and records_key is not None:
+        while more():
+            if len(buffer) > MAX_ENVELOPE_CHARS:
+                logger.warning("Feed envelope too large, ignoring it")
+                return
+        try:
+            envelope.update(json.loads(prefix + '[]' + buffer))
+        except ValueError:
+            logger.warning("Could not parse the feed envelope around the record array")
+
+def stream_records(api_url, session=None, records_key='shipments', next_key='next', chunk_size=DEFAULT_CHUNK_SIZE,
+                   max_pages=None, timeout=10):
+    """
+    Generator over the records of a paginated JSON feed, read in chunks with stream=True so
+    memory stays flat regardless of feed size. The next page comes from the Link header
+    (rel="next") or the envelope's next_key field.
+    """
+    http = session or requests
+    url = api_url
+    pages = 0
+    while url and (max_pages is None or pages < max_pages):
+        logger.info(f"Streaming {records_key or 'records'} from {url}")
+        response = http.get(url, timeout=timeout, stream=True)
+        try:
+            response.raise_for_status()
+            envelope = {} if records_key is not None else None
+            count = 0
+            for record in iter_json_records(response.iter_content(chunk_size), records_key, envelope):
+                count += 1
+                yield record
+            logger.info(f"Streamed {count} records from {url}")
+            link = (getattr(response, 'links', None) or {}).get('next', {}).get('url')
+            url = link or (envelope or {}).get(next_key)
+        finally:
+            response.close()
+        pages += 1
+
+class BoundedBuffer:
+    """
+    Runs a record generator on a background thread and hands records over through a queue of
+    at most maxsize items, so ingestion can run ahead of risk scoring by a bounded amount.
+    Iterating yields the records; an exception in the producer is re-raised in the consumer.
+    """
+    _DONE = object()
+
+    def __init__(self, records, maxsize=1000):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._produce, args=(records,), name='ingest-buffer', daemon=True)
+        self._thread.start()
+
+    def _put(self, item):
+        while not self._stop.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _produce(self, records):
+        try:
+            for record in records:
+                if not self._put(record):
+                    return
+            self._put(self._DONE)
+        except Exception as e:
+            self._put(e)
+
+    def __iter__(self):
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                return
+            if isinstance(item, Exception):
+                raise item
+            yield item
+
+    def batches(self, size):
+        """
+        Yield lists of up to size records, e.g. for ReasoningEngine.score_fleet.
+        """
+        batch = []
+        for record in self:
+            batch.append(record)
+            if len(batch) == size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
@@ -0,0 +1,313 @@
+import logging
+import os
+import queue
+import random
+import signal
+import sys
+import threading
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.context import get_context
+from ingestion.conditional import record_key, records
+from reasoning.incremental import IncrementalEvaluator
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKERS = {'risk': 4, 'proposal': 2, 'notify': 2}
+
+_STOP = object()
+
+def shipment_id(shipment):
+    if shipment.get('shipment_id') is not None:
+        return shipment['shipment_id']
+    if shipment.get('id') is not None:
+        return shipment['id']
+    return record_key(shipment)
+
+class Stage:
+    """
+    One pipeline stage: a pool of worker threads draining a bounded queue. handler(item)
+    returns the items for the next stage (or None); putting them blocks while the next
+    stage's queue is full, which slows this stage down instead of buffering without limit.
+    """
+    def __init__(self, name, handler, workers, maxsize, downstream=None):
+        self.name = name
+        self.handler = handler
+        self.downstream = downstream
+        self.queue = queue.Queue(maxsize=maxsize)
+        self._threads = [threading.Thread(target=self._run, name=f'{name}-{i}', daemon=True) for i in range(workers)]
+        self._lock = threading.Lock()
+        self._stats = {'processed': 0, 'errors': 0}
+
+    def start(self):
+        for thread in self._threads:
+            thread.start()
+
+    def put(self, item):
+        self.queue.put(item)
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            if item is _STOP:
+                return
+            try:
+                outputs = self.handler(item) or ()
+            except Exception as e:
+                logger.error(f"{self.name} stage failed: {e}")
+                with self._lock:
+                    self._stats['errors'] += 1
+                continue
+            for output in outputs:
+                self.downstream.put(output)
+            with self._lock:
+                self._stats['processed'] += 1
+
+    def stop(self):
+        """
+        Let the workers finish everything already queued, then join them.
+        """
+        for _ in self._threads:
+            self.queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['queued'] = self.queue.qsize()
+        return stats
+
+class MonitoringAgent:
+    """
+    Long-running monitoring loop: a scheduler polls the feeds and hands new or changed
+    shipments to a pipeline of risk evaluation, proposal ranking and notification stages, each
+    with its own worker pool and bounded queue. An IncrementalEvaluator tracks which shipments
+    a signal change affects, so only shipments at the places a signal appeared, changed or
+    expired are re-evaluated, each against the signals its SignalIndex holds for it. Results
+    carry their poll cycle and never replace a result from a later cycle. The poll interval
+    halves after a cycle with changes and grows by backoff after a quiet one, within
+    [min_interval, max_interval]. fetch() returns a dict with 'shipments', 'weather' and
+    'strikes' payloads (see ingestion.ingest.fetch_all); a feed that comes back None keeps its
+    previous payload. index_options are passed to the SignalIndex.
+    """
+    def __init__(self, fetch, engine=None, context=None, min_interval=5.0, max_interval=300.0, backoff=1.5,
+                 workers=None, queue_size=100, risk_threshold=0.5, index_options=None):
+        self.fetch = fetch
+        self._engine = engine
+        self._context = context
+        self._evaluator = None
+        self.index_options = index_options or {}
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self.interval = min_interval
+        self.risk_threshold = risk_threshold
+        self.results = {}
+        self._signals = {}
+        self._cycle = 0
+        # Latest cycle each tracked shipment was queued in, and the cycle of its stored result
+        self._queued_cycles = {}
+        self._result_cycles = {}
+        self._stop = threading.Event()
+        self._scheduler = None
+        self._lock = threading.Lock()
+        self._stats = {'cycles': 0, 'changed_cycles': 0, 'enqueued': 0, 'fetch_errors': 0, 'stale_results': 0}
+        workers = dict(DEFAULT_WORKERS, **(workers or {}))
+        self.notify_stage = Stage('notify', self._notify, workers['notify'], queue_size)
+        self.proposal_stage = Stage('proposal', self._propose, workers['proposal'], queue_size, self.notify_stage)
+        self.risk_stage = Stage('risk', self._evaluate, workers['risk'], queue_size, self.proposal_stage)
+        self.stages = (self.risk_stage, self.proposal_stage, self.notify_stage)
+
+    @property
+    def engine(self):
+        if self._engine is None:
+            self._engine = (self._context or get_context()).engine
+        return self._engine
+
+    @property
+    def evaluator(self):
+        if self._evaluator is None:
+            self._evaluator = IncrementalEvaluator(self.engine, **self.index_options)
+        return self._evaluator
+
+    def _evaluate(self, item):
+        shipment, signal_index, at, cycle = item
+        result = self.engine.evaluate_shipment(shipment, signal_index, at)
+        key = shipment_id(shipment)
+        with self._lock:
+            # Skip shipments dropped from the feed while queued, and results a later cycle already replaced
+            if key not in self._queued_cycles or cycle < self._result_cycles.get(key, 0):
+                self._stats['stale_results'] += 1
+                return None
+            self.results[key] = result
+            self._result_cycles[key] = cycle
+        if result['score'] >= self.risk_threshold:
+            return [(shipment, result)]
+
+    def _propose(self, item):
+        shipment, result = item
+        proposals = self.engine.rank_proposals(shipment_id(shipment), shipment.get('route', 'current_route'), result)
+        if proposals:
+            return [(shipment_id(shipment), proposals, result['explanation'])]
+
+    def _notify(self, item):
+        self.engine.publish_proposals(*item)
+
+    def poll_once(self):
+        """
+        Run one ingestion cycle, queue the shipments that need evaluating and adapt the poll
+        interval. Returns the number of shipments queued.
+        """
+        data = self.fetch() or {}
+        at = time.time()
+        evaluator = self.evaluator
+        self._cycle += 1
+
+        payload = data.get('shipments')
+        changes = 0
+        if payload is not None:
+            current = {shipment_id(s): s for s in records(payload, 'shipments')}
+            removed = [key for key in evaluator.shipments if key not in current]
+            with self._lock:
+                for key in removed:
+                    self._queued_cycles.pop(key, None)
+                    self._result_cycles.pop(key, None)
+                    self.results.pop(key, None)
+            for key in removed:
+                evaluator.remove_shipment(key)
+            for key, shipment in current.items():
+                if evaluator.shipments.get(key) != shipment:
+                    evaluator.upsert_shipment(key, shipment)
+                    changes += 1
+            changes += len(removed)
+
+        signals_changed = False
+        for name in ('weather', 'strikes'):
+            if data.get(name) is not None and data[name] != self._signals.get(name):
+                self._signals[name] = data[name]
+                signals_changed = True
+        if signals_changed:
+            # Marks only the shipments at the places of signals that appeared, changed or went away
+            evaluator.apply_signals(self._signals.get('weather'), self._signals.get('strikes'), now=at)
+
+        targets = [evaluator.shipments[key] for key in evaluator.claim(at)]
+        with self._lock:
+            for shipment in targets:
+                self._queued_cycles[shipment_id(shipment)] = self._cycle
+        # The index is rebuilt, not mutated, on signal changes, so queued items keep a consistent snapshot
+        signal_index = evaluator.index
+        for shipment in targets:
+            self.risk_stage.put((shipment, signal_index, at, self._cycle))
+
+        changed = bool(changes) or signals_changed
+        if changed:
+            self.interval = max(self.min_interval, self.interval / 2)
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        with self._lock:
+            self._stats['cycles'] += 1
+            self._stats['changed_cycles'] += changed
+            self._stats['enqueued'] += len(targets)
+        logger.info(f"Poll cycle: {changes} shipment changes, signals {'changed' if signals_changed else 'unchanged'}, "
+                    f"{len(targets)} queued, next poll in {self.interval:.1f}s")
+        return len(targets)
+
+    def _schedule(self):
+        while not self._stop.is_set():
+            try:
+                self.poll_once()
+            except Exception as e:
+                logger.error(f"Poll cycle failed: {e}")
+                with self._lock:
+                    self._stats['fetch_errors'] += 1
+            self._stop.wait(self.interval)
+
+    def start(self):
+        """
+        Start the stage workers and the polling scheduler.
+        """
+        for stage in self.stages:
+            stage.start()
+        self._scheduler = threading.Thread(target=self._schedule, name='monitor-scheduler', daemon=True)
+        self._scheduler.start()
+        logger.info("Monitoring agent started")
+        return self
+
+    def stop(self):
+        """
+        Graceful shutdown: stop polling, then drain each stage in pipeline order so every
+        shipment already queued is evaluated, proposed and notified before returning.
+        """
+        self._stop.set()
+        if self._scheduler is not None:
+            self._scheduler.join()
+        for stage in self.stages:
+            stage.stop()
+        logger.info(f"Monitoring agent stopped: {self.stats()}")
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+        stats['interval'] = self.interval
+        stats['stages'] = {stage.name: stage.stats() for stage in self.stages}
+        return stats
+
+class StubFeeds:
+    """
+    Local stand-in for the shipment, weather and strike APIs. Each call returns the current
+    payloads; with probability change_rate a shipment moves or the signals shift first.
+    """
+    LOCATIONS = ('risky_area1', 'risky_area2', 'SHA', 'SIN', 'RTM', 'LAX')
+
+    def __init__(self, shipments=20, change_rate=0.3, seed=None):
+        self.change_rate = change_rate
+        self.random = random.Random(seed)
+        self.shipments = [{'shipment_id': str(i), 'location': self.random.choice(self.LOCATIONS)} for i in range(shipments)]
+        self.alerts = [{'id': 'w1', 'severity': 3, 'region': self.random.choice(self.LOCATIONS)}]
+        self.strikes = []
+
+    def __call__(self):
+        if self.random.random() < self.change_rate:
+            shipment = self.random.choice(self.shipments)
+            shipment['location'] = self.random.choice(self.LOCATIONS)
+        if self.random.random() < self.change_rate / 3:
+            self.alerts = [{'id': 'w1', 'severity': self.random.randint(1, 10), 'region': self.random.choice(self.LOCATIONS)}]
+            self.strikes = [{'id': 's1', 'impact': 'high', 'region': self.random.choice(self.LOCATIONS)}] if self.random.random() < 0.5 else []
+        return {
+            'shipments': {'shipments': [dict(s) for s in self.shipments]},
+            'weather': {'alerts': list(self.alerts)},
+            'strikes': {'strikes': list(self.strikes)}
+        }
+
+def main(duration=None):
+    """
+    Run the agent against stub feeds until duration seconds pass, Ctrl-C or SIGTERM.
+    """
+    from reasoning.engine import ReasoningEngine
+    stopping = threading.Event()
+    if threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGTERM, lambda *_: stopping.set())
+    agent = MonitoringAgent(StubFeeds(), engine=ReasoningEngine(risk_mode='tiered'), min_interval=1.0, max_interval=10.0)
+    agent.start()
+    try:
+        stopping.wait(duration)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        agent.stop()
+    return agent.stats()
+
+if __name__ == "__main__":
+    stats = main()
+    print(stats)
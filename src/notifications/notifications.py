@@ -3,13 +3,14 @@ import requests
 import json
 import sys
 import os
-import boto3
 from flask import Flask, request
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from audit.audit import AuditLogger
+from audit.audit import shared_audit_logger
+from nova.client import get_nova_client
+from nova.prompts import proposal_summary_prompt
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -33,45 +34,41 @@ def slack_interactive():
     return '', 200
 
 class NotificationManager:
-    def __init__(self, slack_webhook_url=None):
+    def __init__(self, slack_webhook_url=None, audit=None, nova=None):
         self.slack_webhook_url = slack_webhook_url or os.getenv('SLACK_WEBHOOK_URL')
-        self.audit = AuditLogger()
-        self.nova = boto3.client("bedrock-runtime")
+        self._audit = audit
+        self._nova = nova
+
+    @property
+    def audit(self):
+        # Resolved on first use so building a manager does not load the ledger
+        if self._audit is None:
+            self._audit = shared_audit_logger()
+        return self._audit
+
+    @property
+    def nova(self):
+        if self._nova is None:
+            self._nova = get_nova_client()
+        return self._nova
 
     def call_nova(self, prompt):
         """
         Call Amazon Nova for generating summaries.
         """
-        try:
-            response = self.nova.invoke_model(
-                modelId="amazon.nova-pro",
-                body=json.dumps({
-                    "inputText": prompt,
-                    "parameters": {"temperature": 0.7, "maxTokens": 300}
-                })
-            )
-            result = json.loads(response['body'].read())
-            return {
-                'outputText': result.get('outputText', ''),
-                'stopReason': result.get('stopReason'),
-                'usage': result.get('usage', {}),
-                'modelId': "amazon.nova-pro",
-                'region': self.nova.meta.region_name
-            }
-        except Exception as e:
-            logger.error(f"Nova call failed: {e}")
-            return None
+        return self.nova.invoke(prompt, call_type='proposal_summary')
 
     def send_rerouting_proposal(self, shipment_id, proposals, explanation=""):
         """
         Send rerouting proposal to Slack with approval buttons.
+        Returns True once Slack accepts it, False if delivery failed and None if Slack is not configured.
         """
         if not self.slack_webhook_url:
             logger.warning("Slack webhook URL not set, skipping notification")
             return
 
         # Use Nova to generate human-friendly summary
-        prompt = f"Summarize the rerouting proposals for shipment {shipment_id}. Risk explanation: {explanation}. Proposals: {proposals}. Provide a concise, human-friendly message for Slack."
+        prompt = proposal_summary_prompt(shipment_id, proposals, explanation)
         nova_summary = self.call_nova(prompt)
         if nova_summary:
             proposal_text = nova_summary['outputText']
@@ -128,10 +125,11 @@ class NotificationManager:
             response = requests.post(self.slack_webhook_url, json=payload, timeout=10)
             if response.status_code == 200:
                 logger.info(f"Sent rerouting proposal for shipment {shipment_id} to Slack")
-            else:
-                logger.error(f"Failed to send Slack message: {response.status_code} - {response.text}")
+                return True
+            logger.error(f"Failed to send Slack message: {response.status_code} - {response.text}")
         except Exception as e:
             logger.error(f"Error sending Slack notification: {e}")
+        return False
 
     def send_message(self, text):
         """
@@ -0,0 +1,248 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL_ID = "amazon.nova-pro"
+DEFAULT_POOL_CONNECTIONS = 16
+
+class ResponseCache:
+    """
+    Content-addressed cache for Nova responses: an in-memory LRU in front of an optional
+    on-disk tier with a TTL and a total size limit.
+    """
+    def __init__(self, max_entries=1024, cache_dir=None, ttl=3600, max_disk_bytes=50 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.cache_dir = cache_dir
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'memory_hits': 0, 'disk_hits': 0, 'evictions': 0, 'expired': 0}
+        self._disk_bytes = 0
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+            self._disk_bytes = sum(os.path.getsize(path) for path in self._disk_files())
+
+    @staticmethod
+    def make_key(model_id, prompt, parameters):
+        payload = json.dumps({'model': model_id, 'prompt': prompt, 'parameters': parameters}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _disk_path(self, key):
+        return os.path.join(self.cache_dir, f"{key}.json")
+
+    def _disk_files(self):
+        return [os.path.join(self.cache_dir, name) for name in os.listdir(self.cache_dir) if name.endswith('.json')]
+
+    def _expired(self, stored_at):
+        return self.ttl is not None and time.time() - stored_at > self.ttl
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                stored_at, value = self._memory[key]
+                if not self._expired(stored_at):
+                    self._memory.move_to_end(key)
+                    self._stats['hits'] += 1
+                    self._stats['memory_hits'] += 1
+                    return value
+                del self._memory[key]
+                self._stats['expired'] += 1
+            value = self._disk_get(key)
+            if value is not None:
+                self._stats['hits'] += 1
+                self._stats['disk_hits'] += 1
+                return value
+            self._stats['misses'] += 1
+            return None
+
+    def _disk_get(self, key):
+        if not self.cache_dir:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, 'r') as f:
+                record = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        if self._expired(record['stored_at']):
+            self._remove_disk_file(path)
+            self._stats['expired'] += 1
+            return None
+        self._memory_put(key, record['stored_at'], record['response'])
+        return record['response']
+
+    def put(self, key, value):
+        stored_at = time.time()
+        with self._lock:
+            self._memory_put(key, stored_at, value)
+            if self.cache_dir:
+                self._disk_put(key, stored_at, value)
+
+    def _memory_put(self, key, stored_at, value):
+        self._memory[key] = (stored_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self._stats['evictions'] += 1
+
+    def _disk_put(self, key, stored_at, value):
+        path = self._disk_path(key)
+        if os.path.exists(path):
+            self._remove_disk_file(path)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'stored_at': stored_at, 'response': value}, f)
+        os.replace(tmp_path, path)
+        self._disk_bytes += os.path.getsize(path)
+        if self._disk_bytes > self.max_disk_bytes:
+            # Evict least recently written files until back under the limit
+            for old_path in sorted(self._disk_files(), key=os.path.getmtime):
+                if self._disk_bytes <= self.max_disk_bytes:
+                    break
+                self._remove_disk_file(old_path)
+                self._stats['evictions'] += 1
+
+    def _remove_disk_file(self, path):
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+            self._disk_bytes -= size
+        except FileNotFoundError:
+            pass
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['memory_entries'] = len(self._memory)
+            stats['disk_bytes'] = self._disk_bytes
+        lookups = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self.cache_dir:
+                for path in self._disk_files():
+                    self._remove_disk_file(path)
+
+class NovaClient:
+    """
+    Shared Amazon Nova (Bedrock) client. The boto3 client is created on first use and
+    identical requests are served from the response cache. max_pool_connections sizes the
+    HTTP connection pool so concurrent callers reuse keep-alive connections.
+    """
+    def __init__(self, model_id=DEFAULT_MODEL_ID, cache=None, client=None, max_pool_connections=DEFAULT_POOL_CONNECTIONS):
+        self.model_id = model_id
+        self.max_pool_connections = max_pool_connections
+        self.cache = cache if cache is not None else ResponseCache()
+        self._client = client
+        self._client_lock = threading.Lock()
+        self._usage = {}
+        self._usage_lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._client_lock:
+                if self._client is None:
+                    import boto3
+                    from botocore.config import Config
+                    # Retries belong to NovaExecutor, so botocore makes a single attempt
+                    self._client = boto3.client(
+                        "bedrock-runtime",
+                        config=Config(max_pool_connections=self.max_pool_connections, tcp_keepalive=True,
+                                      retries={'max_attempts': 1, 'mode': 'standard'})
+                    )
+        return self._client
+
+    def invoke(self, prompt, temperature=0.7, max_tokens=300, use_cache=True, raise_errors=False, call_type=None):
+        """
+        Call Amazon Nova. Returns a dict with outputText, stopReason, usage, modelId and region,
+        or None if the call failed (re-raised instead with raise_errors=True). Failures are never cached.
+        Token usage of model calls is recorded under call_type (see usage_stats).
+        """
+        parameters = {"temperature": temperature, "maxTokens": max_tokens}
+        key = ResponseCache.make_key(self.model_id, prompt, parameters)
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return dict(cached, cached=True)
+        try:
+            response = self.client.invoke_model(
+                modelId=self.model_id,
+                body=json.dumps({
+                    "inputText": prompt,
+                    "parameters": parameters
+                })
+            )
+            result = json.loads(response['body'].read())
+            output = {
+                'outputText': result.get('outputText', ''),
+                'stopReason': result.get('stopReason'),
+                'usage': result.get('usage', {}),
+                'modelId': self.model_id,
+                'region': self.client.meta.region_name
+            }
+        except Exception as e:
+            if raise_errors:
+                raise
+            logger.error(f"Nova call failed: {e}")
+            return None
+        self._record_usage(call_type or 'other', prompt, output['usage'])
+        if use_cache:
+            self.cache.put(key, output)
+        return output
+
+    def _record_usage(self, call_type, prompt, usage):
+        with self._usage_lock:
+            totals = self._usage.setdefault(call_type, {'calls': 0, 'input_tokens': 0, 'output_tokens': 0, 'prompt_chars': 0})
+            totals['calls'] += 1
+            totals['input_tokens'] += usage.get('inputTokens', 0)
+            totals['output_tokens'] += usage.get('outputTokens', 0)
+            totals['prompt_chars'] += len(prompt)
+
+    def usage_stats(self):
+        """
+        Per call type: model calls, summed input/output tokens as reported in usage, and the
+        average input tokens per call. Cache hits are not counted.
+        """
+        with self._usage_lock:
+            stats = {call_type: dict(totals) for call_type, totals in self._usage.items()}
+        for totals in stats.values():
+            totals['avg_input_tokens'] = totals['input_tokens'] / totals['calls']
+        return stats
+
+    def stats(self):
+        return self.cache.stats()
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+def get_nova_client():
+    """
+    Return the process-wide NovaClient. The disk cache tier is enabled by NOVA_CACHE_DIR,
+    with NOVA_CACHE_TTL (seconds) and NOVA_CACHE_MAX_BYTES tuning it; NOVA_MAX_POOL_CONNECTIONS
+    sizes the HTTP connection pool.
+    """
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            cache = ResponseCache(
+                cache_dir=os.getenv('NOVA_CACHE_DIR'),
+                ttl=float(os.getenv('NOVA_CACHE_TTL', 3600)),
+                max_disk_bytes=int(os.getenv('NOVA_CACHE_MAX_BYTES', 50 * 1024 * 1024))
+            )
+            _shared_client = NovaClient(
+                cache=cache,
+                max_pool_connections=int(os.getenv('NOVA_MAX_POOL_CONNECTIONS', DEFAULT_POOL_CONNECTIONS))
+            )
+        return _shared_client
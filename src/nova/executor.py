@@ -0,0 +1,156 @@
+import asyncio
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from nova.client import get_nova_client
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+THROTTLE_CODES = {'ThrottlingException', 'TooManyRequestsException', 'ServiceUnavailableException'}
+
+def is_throttle(error):
+    """
+    True if error is a Bedrock throttling/overload error worth retrying.
+    """
+    # Some botocore errors (e.g. ReadTimeoutError) carry response=None
+    response = getattr(error, 'response', None) or {}
+    details = response.get('Error') if isinstance(response, dict) else None
+    code = details.get('Code') if isinstance(details, dict) else None
+    return code in THROTTLE_CODES or type(error).__name__ in THROTTLE_CODES
+
+class TokenBucket:
+    """
+    Thread-safe token bucket: rate tokens per second, holding at most capacity tokens.
+    """
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take one token, sleeping until one is available. Returns the time spent waiting.
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+class NovaExecutor:
+    """
+    Runs Nova calls on a bounded thread pool. At most max_concurrency calls are in flight,
+    starts are paced by an optional token bucket (rate calls per second, burst capacity), and
+    throttled calls are retried with full-jitter exponential backoff.
+    """
+    def __init__(self, nova=None, max_concurrency=8, rate=None, burst=None,
+                 max_retries=4, base_delay=0.5, max_delay=8.0):
+        self.nova = nova or get_nova_client()
+        self.max_concurrency = max_concurrency
+        self.limiter = TokenBucket(rate, burst) if rate else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='nova')
+        self._lock = threading.Lock()
+        self._stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'throttled': 0, 'retries': 0, 'in_flight': 0, 'rate_wait': 0.0}
+
+    def _count(self, key, amount=1):
+        with self._lock:
+            self._stats[key] += amount
+
+    def _backoff(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _call(self, prompt, kwargs):
+        self._count('in_flight')
+        try:
+            for attempt in range(self.max_retries + 1):
+                if self.limiter:
+                    self._count('rate_wait', self.limiter.acquire())
+                try:
+                    result = self.nova.invoke(prompt, raise_errors=True, **kwargs)
+                    self._count('completed')
+                    return result
+                except Exception as e:
+                    if not is_throttle(e):
+                        logger.error(f"Nova call failed: {e}")
+                        break
+                    self._count('throttled')
+                    if attempt == self.max_retries:
+                        logger.error(f"Nova call still throttled after {self.max_retries} retries")
+                        break
+                    delay = self._backoff(attempt)
+                    logger.warning(f"Nova call throttled, retrying in {delay:.2f}s")
+                    self._count('retries')
+                    time.sleep(delay)
+            self._count('failed')
+            return None
+        finally:
+            self._count('in_flight', -1)
+
+    def submit(self, prompt, **kwargs):
+        """
+        Queue a Nova call. Returns a concurrent.futures.Future resolving to the same
+        result NovaClient.invoke would return (None on failure).
+        """
+        self._count('submitted')
+        return self.executor.submit(self._call, prompt, kwargs)
+
+    async def invoke_async(self, prompt, **kwargs):
+        """
+        Awaitable form of submit for asyncio callers.
+        """
+        return await asyncio.wrap_future(self.submit(prompt, **kwargs))
+
+    def map(self, prompts, **kwargs):
+        """
+        Run prompts concurrently and return their results in order.
+        """
+        futures = [self.submit(prompt, **kwargs) for prompt in prompts]
+        return [future.result() for future in futures]
+
+    def stats(self):
+        with self._lock:
+            return dict(self._stats)
+
+    def shutdown(self, wait=True):
+        self.executor.shutdown(wait=wait)
+
+_shared_executor = None
+_shared_lock = threading.Lock()
+
+def get_nova_executor():
+    """
+    Return the process-wide NovaExecutor over the shared NovaClient, configured by
+    NOVA_MAX_CONCURRENCY, NOVA_RATE_LIMIT (calls per second, unlimited when unset) and NOVA_RATE_BURST.
+    """
+    global _shared_executor
+    with _shared_lock:
+        if _shared_executor is None:
+            rate = os.getenv('NOVA_RATE_LIMIT')
+            burst = os.getenv('NOVA_RATE_BURST')
+            _shared_executor = NovaExecutor(
+                max_concurrency=int(os.getenv('NOVA_MAX_CONCURRENCY', 8)),
+                rate=float(rate) if rate else None,
+                burst=float(burst) if burst else None
+            )
+        return _shared_executor
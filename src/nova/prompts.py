@@ -0,0 +1,105 @@
+import json
+import logging
+import math
+import os
+import sys
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from reasoning.signals import SignalIndex
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Input-token budget per call type
+TOKEN_BUDGETS = {
+    'risk': 400,
+    'proposal_summary': 500,
+    'audit_summary': 400
+}
+CHARS_PER_TOKEN = 4
+MAX_FIELD_CHARS = 200
+
+SIGNAL_FIELDS = ('type', 'severity', 'impact', 'region', 'description', 'valid_until')
+AUDIT_FIELDS = ('shipment_id', 'rerouting_option', 'approval_status', 'reasoning_trace', 'timestamp')
+
+def estimate_tokens(text):
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+def _trim(value):
+    if isinstance(value, str) and len(value) > MAX_FIELD_CHARS:
+        return value[:MAX_FIELD_CHARS] + '...'
+    if isinstance(value, dict):
+        return {k: _trim(v) for k, v in value.items() if v not in (None, '', [], {})}
+    if isinstance(value, list):
+        return [_trim(v) for v in value]
+    if isinstance(value, float):
+        return round(value, 3)
+    return value
+
+def compact(value):
+    """
+    Minimal JSON: no whitespace, empty fields dropped, long strings cut, floats rounded.
+    """
+    return json.dumps(_trim(value), separators=(',', ':'), default=str)
+
+def _fit(template, items, budget):
+    """
+    Fill the {items} slot of template with as many compact items as fit in budget tokens, in
+    order, noting how many were left out. Stops serializing at the first item that does not fit.
+    """
+    kept = []
+    used = len(template) - len('{items}') + 2
+    # Room for the omission note whenever more items would follow
+    note = len(f' (+{len(items)} more omitted)')
+    for i, item in enumerate(items):
+        text = compact(item)
+        extra = len(text) + (1 if kept else 0) + (note if i < len(items) - 1 else 0)
+        if kept and math.ceil((used + extra) / CHARS_PER_TOKEN) > budget:
+            return template.replace('{items}', '[' + ','.join(kept) + f'] (+{len(items) - i} more omitted)')
+        kept.append(text)
+        used += len(text) + (1 if len(kept) > 1 else 0)
+    return template.replace('{items}', '[' + ','.join(kept) + ']')
+
+IMPACT_RANK = {'high': 10, 'medium': 5}
+
+def relevant_signals(shipment, weather_data, strike_data, at=None):
+    """
+    Alerts and strikes worth showing the model for this shipment, most severe first, with only
+    the fields the model needs. Relevance is SignalIndex.lookup's (region, radius and validity
+    window at time at), so the model sees the signals the rule-based score counts.
+    """
+    index = SignalIndex()
+    for kind, data in (('alerts', weather_data), ('strikes', strike_data)):
+        for signal in (data or {}).get(kind, []):
+            index.add(kind, signal)
+    weather_data, strike_data = index.lookup(shipment, at)
+    signals = []
+    for kind, items in (('weather', weather_data['alerts']), ('strike', strike_data['strikes'])):
+        for item in items:
+            rank = item.get('severity', 0) if kind == 'weather' else IMPACT_RANK.get(item.get('impact'), 0)
+            signals.append((rank, dict({k: item[k] for k in SIGNAL_FIELDS if k in item}, kind=kind)))
+    signals.sort(key=lambda pair: pair[0], reverse=True)
+    return [signal for _, signal in signals]
+
+def risk_prompt(shipment, weather_data, strike_data, budget=None, at=None):
+    location = (shipment or {}).get('location', 'unknown')
+    template = (f"Evaluate the risk for shipment at location {location}. Signals: {{items}}. "
+                "Provide a risk score from 0 to 1 and a brief explanation.")
+    return _fit(template, relevant_signals(shipment, weather_data, strike_data, at), budget or TOKEN_BUDGETS['risk'])
+
+def proposal_summary_prompt(shipment_id, proposals, explanation, budget=None):
+    rows = [{k: p[k] for k in ('route', 'cost', 'time', 'compliance', 'score') if k in p} for p in proposals]
+    template = (f"Summarize the rerouting proposals for shipment {shipment_id}. Risk explanation: {_trim(explanation)}. "
+                "Proposals (best first): {items}. Provide a concise, human-friendly message for Slack.")
+    return _fit(template, rows, budget or TOKEN_BUDGETS['proposal_summary'])
+
+def audit_summary_prompt(data, budget=None):
+    budget = budget or TOKEN_BUDGETS['audit_summary']
+    entry = compact({k: data[k] for k in AUDIT_FIELDS if k in data})
+    prompt = f"Generate a compliance-ready summary for this audit log entry: {entry}"
+    limit = budget * CHARS_PER_TOKEN
+    if len(prompt) > limit:
+        prompt = prompt[:limit - 3] + '...'
+    return prompt
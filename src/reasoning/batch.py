@@ -0,0 +1,80 @@
+import logging
+import os
+import sys
+
+import numpy as np
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from reasoning.signals import RISKY_LOCATIONS
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (rule, weight, explanation) in feature-matrix column order; mirrors ReasoningEngine._rule_based_risk
+RULES = (
+    ('weather', 0.3, "High weather risk detected. "),
+    ('strike', 0.4, "High strike risk detected. "),
+    ('location', 0.3, "Shipment in risky area. ")
+)
+RULE_WEIGHTS = np.array([weight for _, weight, _ in RULES])
+
+def _flatten(signals, n, list_key, field, default, dtype):
+    """
+    Flatten per-shipment signal lists into (owner row, value) arrays. signals is either one
+    signal dict shared by the whole fleet or a list of dicts aligned with the shipments.
+    Returns (owners, values, shared).
+    """
+    if signals is None or isinstance(signals, dict):
+        values = [item.get(field, default) for item in (signals or {}).get(list_key, [])]
+        return None, np.array(values, dtype=dtype), True
+    owners = []
+    values = []
+    for row, signal in enumerate(signals):
+        items = (signal or {}).get(list_key, [])
+        owners.extend([row] * len(items))
+        values.extend(item.get(field, default) for item in items)
+    return np.array(owners, dtype=np.intp), np.array(values, dtype=dtype), False
+
+def _any_per_row(n, owners, hits, shared):
+    if shared:
+        return np.full(n, bool(hits.any()))
+    column = np.zeros(n, dtype=bool)
+    column[owners[hits]] = True
+    return column
+
+def rule_features(shipments, weather_data, strike_data, risky_locations=RISKY_LOCATIONS):
+    """
+    Boolean feature matrix of shape (len(shipments), len(RULES)): one column per rule,
+    True where the rule fires for that shipment.
+    """
+    n = len(shipments)
+    features = np.zeros((n, len(RULES)), dtype=bool)
+    if n == 0:
+        return features
+
+    owners, severities, shared = _flatten(weather_data, n, 'alerts', 'severity', 0, float)
+    features[:, 0] = _any_per_row(n, owners, severities > 5, shared)
+
+    owners, impacts, shared = _flatten(strike_data, n, 'strikes', 'impact', 'low', object)
+    features[:, 1] = _any_per_row(n, owners, impacts == 'high', shared)
+
+    locations = np.array([(shipment or {}).get('location') or '' for shipment in shipments])
+    features[:, 2] = np.isin(locations, list(risky_locations))
+    return features
+
+def score_fleet(shipments, weather_data, strike_data, threshold=0.5, risky_locations=RISKY_LOCATIONS):
+    """
+    Rule-based risk for a whole fleet in one vectorized pass. weather_data and strike_data are
+    either shared by every shipment or lists aligned with shipments. Returns one
+    {'score', 'explanation'} dict per shipment; explanations are only built for scores at or
+    above threshold and are empty otherwise.
+    """
+    features = rule_features(shipments, weather_data, strike_data, risky_locations)
+    scores = np.minimum(features @ RULE_WEIGHTS, 1.0)
+    explanations = [''] * len(shipments)
+    for row in np.flatnonzero(scores >= threshold):
+        explanations[row] = ''.join(text for fired, (_, _, text) in zip(features[row], RULES) if fired)
+    logger.info(f"Scored {len(shipments)} shipments, {int((scores >= threshold).sum())} at or above {threshold}")
+    return [{'score': float(score), 'explanation': explanation} for score, explanation in zip(scores, explanations)]
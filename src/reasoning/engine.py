@@ -1,56 +1,87 @@
 import logging
 import sys
 import os
-import boto3
-import json
+import threading
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from audit.audit import AuditLogger
-from notifications.notifications import NotificationManager
+from app.context import get_context
+from nova.executor import NovaExecutor
+from nova.prompts import risk_prompt
+from reasoning.signals import RISKY_LOCATIONS
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ReasoningEngine:
-    def __init__(self, cost_weight=0.4, time_weight=0.4, compliance_weight=0.2):
+    def __init__(self, cost_weight=0.4, time_weight=0.4, compliance_weight=0.2, audit=None, nova=None,
+                 executor=None, risk_mode='always', uncertainty_band=(0.2, 0.8),
+                 risky_locations=RISKY_LOCATIONS, route_graph=None, max_proposals=3,
+                 notifications=None, context=None, outbox=None):
+        """
+        risk_mode='tiered' only asks Nova when the rule-based score falls strictly inside
+        uncertainty_band (low, high); clear-cut scores are returned without a model call.
+        risky_locations are the shipment locations that add location risk.
+        With a RouteGraph, proposals for hub-list routes come from a k-best path search.
+        audit, nova, notifications and executor default to the services of context (the
+        process-wide AppContext by default) and are only resolved on first use. With an outbox, proposal
+        side effects (audit entries, Slack) are published as one event for its consumers.
+        """
+        if risk_mode not in ('always', 'tiered'):
+            raise ValueError(f"Unknown risk_mode: {risk_mode}")
         self.cost_weight = cost_weight
         self.time_weight = time_weight
         self.compliance_weight = compliance_weight
-        self.audit = AuditLogger()
-        self.nova = boto3.client("bedrock-runtime")
+        self._audit = audit
+        self._nova = nova
+        self._notifications = notifications
+        self._context = context
+        self.outbox = outbox
+        self._executor = executor
+        self.risk_mode = risk_mode
+        self.uncertainty_band = uncertainty_band
+        self.risky_locations = frozenset(risky_locations)
+        self.route_graph = route_graph
+        self.max_proposals = max_proposals
+        self._tier_counts = {'rules': 0, 'nova': 0, 'fallback': 0}
+        self._tier_lock = threading.Lock()
+
+    @property
+    def audit(self):
+        if self._audit is None:
+            self._audit = (self._context or get_context()).audit
+        return self._audit
+
+    @property
+    def nova(self):
+        if self._nova is None:
+            self._nova = (self._context or get_context()).nova
+        return self._nova
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            # Custom Nova clients get their own executor so batch calls go through the same client
+            self._executor = NovaExecutor(self._nova) if self._nova else (self._context or get_context()).executor
+        return self._executor
+
+    @property
+    def notifications(self):
+        if self._notifications is None:
+            self._notifications = (self._context or get_context()).notifications
+        return self._notifications
 
     def call_nova(self, prompt):
         """
         Call Amazon Nova for AI predictions.
         """
-        try:
-            response = self.nova.invoke_model(
-                modelId="amazon.nova-pro",
-                body=json.dumps({
-                    "inputText": prompt,
-                    "parameters": {"temperature": 0.7, "maxTokens": 300}
-                })
-            )
-            result = json.loads(response['body'].read())
-            return {
-                'outputText': result.get('outputText', ''),
-                'stopReason': result.get('stopReason'),
-                'usage': result.get('usage', {}),
-                'modelId': "amazon.nova-pro",
-                'region': self.nova.meta.region_name
-            }
-        except Exception as e:
-            logger.error(f"Nova call failed: {e}")
-            return None
+        return self.nova.invoke(prompt, call_type='risk')
 
-    def evaluate_risk(self, shipment_data, weather_data, strike_data):
+    def _rule_based_risk(self, shipment_data, weather_data, strike_data):
         """
-        Evaluate risk based on external signals using Nova for predictive scoring.
-        Returns a dict with 'score' (0-1, higher means higher risk) and 'explanation'.
+        Deterministic fallback score. Returns (score, explanation).
         """
-        # Fallback manual calculation
         risk_score = 0.0
         explanation = ""
 
@@ -62,15 +93,36 @@ class ReasoningEngine:
             risk_score += 0.4
             explanation += "High strike risk detected. "
 
-        if shipment_data and shipment_data.get('location') in ['risky_area1', 'risky_area2']:
+        if shipment_data and shipment_data.get('location') in self.risky_locations:
             risk_score += 0.3
             explanation += "Shipment in risky area. "
 
-        risk_score = min(risk_score, 1.0)
+        return min(risk_score, 1.0), explanation
 
-        # Use Nova for predictive risk
-        prompt = f"Evaluate the risk for shipment at location {shipment_data.get('location', 'unknown')} with weather alerts {weather_data} and strike data {strike_data}. Provide a risk score from 0 to 1 and a brief explanation."
-        nova_response = self.call_nova(prompt)
+    def _risk_prompt(self, shipment_data, weather_data, strike_data, at=None):
+        return risk_prompt(shipment_data, weather_data, strike_data, at=at)
+
+    def _needs_nova(self, risk_score):
+        if self.risk_mode == 'always':
+            return True
+        low, high = self.uncertainty_band
+        return low < risk_score < high
+
+    def _record_tier(self, result):
+        with self._tier_lock:
+            self._tier_counts[result['tier']] += 1
+        return result
+
+    def _rules_result(self, risk_score, explanation):
+        logger.info(f"Overall risk score: {risk_score} (rules only), Explanation: {explanation}")
+        return self._record_tier({'score': risk_score, 'explanation': explanation, 'tier': 'rules'})
+
+    def _apply_nova_response(self, nova_response, risk_score, explanation):
+        """
+        Override the fallback score/explanation with Nova's answer where it parses.
+        tier is 'nova' when the answer was used and 'fallback' when the call failed.
+        """
+        tier = 'fallback'
         if nova_response:
             # Parse Nova response, assume format "Risk score: X. Explanation: Y."
             try:
@@ -82,28 +134,110 @@ class ReasoningEngine:
                 exp_line = [l for l in lines if 'Explanation' in l]
                 if exp_line:
                     explanation = exp_line[0].split(':', 1)[1].strip()
+                tier = 'nova'
             except:
                 logger.warning("Failed to parse Nova response, using fallback")
 
         logger.info(f"Overall risk score: {risk_score}, Explanation: {explanation}")
-        return {'score': risk_score, 'explanation': explanation}
+        return self._record_tier({'score': risk_score, 'explanation': explanation, 'tier': tier})
 
-    def generate_rerouting_proposals(self, shipment_id, current_route, risk_data):
+    def evaluate_risk(self, shipment_data, weather_data, strike_data, at=None):
         """
-        Generate rerouting options if risk > threshold.
-        risk_data is dict with 'score' and 'explanation'.
+        Evaluate risk based on external signals using Nova for predictive scoring.
+        Returns a dict with 'score' (0-1, higher means higher risk), 'explanation' and
+        'tier' ('rules', 'nova' or 'fallback'). The prompt shows the signals relevant to the
+        shipment at time at (default now).
+        """
+        # Fallback manual calculation
+        risk_score, explanation = self._rule_based_risk(shipment_data, weather_data, strike_data)
+        if not self._needs_nova(risk_score):
+            return self._rules_result(risk_score, explanation)
+
+        # Use Nova for predictive risk
+        nova_response = self.call_nova(self._risk_prompt(shipment_data, weather_data, strike_data, at))
+        return self._apply_nova_response(nova_response, risk_score, explanation)
+
+    def evaluate_shipment(self, shipment_data, signal_index, at=None):
+        """
+        Evaluate risk using only the signals a SignalIndex holds for the shipment's location
+        and route at time at (default now).
         """
-        risk_score = risk_data['score']
-        explanation = risk_data['explanation']
-        if risk_score < 0.5:
+        weather_data, strike_data = signal_index.lookup(shipment_data, at)
+        return self.evaluate_risk(shipment_data, weather_data, strike_data, at)
+
+    def evaluate_risks(self, cases):
+        """
+        Evaluate many (shipment_data, weather_data, strike_data) cases at once. The Nova calls
+        run concurrently on the shared rate-limited executor; results come back in input order.
+        """
+        executor = self.executor
+        fallbacks = [self._rule_based_risk(*case) for case in cases]
+        futures = [executor.submit(self._risk_prompt(*case), call_type='risk') if self._needs_nova(score) else None
+                   for case, (score, _) in zip(cases, fallbacks)]
+        return [self._apply_nova_response(future.result(), score, explanation) if future
+                else self._rules_result(score, explanation)
+                for future, (score, explanation) in zip(futures, fallbacks)]
+
+    def score_fleet(self, shipments, weather_data=None, strike_data=None, threshold=0.5, signal_index=None, at=None):
+        """
+        Rule-based risk for a whole fleet in one NumPy pass (no Nova calls). weather_data and
+        strike_data are shared by every shipment or lists aligned with shipments; with a
+        signal_index each shipment gets the signals indexed for its location and route instead.
+        """
+        from reasoning.batch import score_fleet
+        if signal_index is not None:
+            weather_data, strike_data = signal_index.lookup_fleet(shipments, at)
+        return score_fleet(shipments, weather_data, strike_data, threshold, self.risky_locations)
+
+    def sweep_weights(self, fleet_candidates, weights=None, k=3):
+        """
+        Scenario analysis: rank each shipment's candidate proposals under many weight settings
+        (default: a grid over the simplex) and report how stable the ranking is against the
+        engine's own weights. See reasoning.scenarios.sweep.
+        """
+        from reasoning.scenarios import sweep, weight_grid
+        weights = weight_grid() if weights is None else weights
+        return sweep(fleet_candidates, weights, k, baseline=(self.cost_weight, self.time_weight, self.compliance_weight))
+
+    def risk_stats(self):
+        """
+        Counts of risk evaluations per tier and the share answered without calling Nova.
+        """
+        with self._tier_lock:
+            stats = dict(self._tier_counts)
+        total = sum(stats.values())
+        stats['total'] = total
+        stats['skip_rate'] = stats['rules'] / total if total else 0.0
+        return stats
+
+    def _route_proposals(self, current_route, disruptions):
+        if self.route_graph is None or not isinstance(current_route, (list, tuple)) or len(current_route) < 2:
+            return [
+                {"route": "Alternative Route A", "cost": 1.1, "time": 1.05, "compliance": 0.9},
+                {"route": "Alternative Route B", "cost": 1.2, "time": 0.95, "compliance": 1.0},
+                {"route": "Alternative Route C", "cost": 0.9, "time": 1.2, "compliance": 0.8}
+            ]
+        return self.route_graph.k_best(
+            current_route[0], current_route[-1], self.max_proposals,
+            weights=(self.cost_weight, self.time_weight, self.compliance_weight),
+            blocked_hubs=disruptions, baseline=current_route
+        )
+
+    def rank_proposals(self, shipment_id, current_route, risk_data, disruptions=()):
+        """
+        Rerouting options for a shipment whose risk is at or above 0.5, scored with the engine's
+        weights and sorted best first, without logging or notifying anyone. When the engine
+        has a route_graph and current_route is a list of hubs, alternatives avoid the
+        disrupted hubs (see RouteGraph.disruptions); otherwise the fixed alternatives are proposed.
+        """
+        if risk_data['score'] < 0.5:
             logger.info("No rerouting needed, risk is low")
             return []
 
-        proposals = [
-            {"route": "Alternative Route A", "cost": 1.1, "time": 1.05, "compliance": 0.9},
-            {"route": "Alternative Route B", "cost": 1.2, "time": 0.95, "compliance": 1.0},
-            {"route": "Alternative Route C", "cost": 0.9, "time": 1.2, "compliance": 0.8}
-        ]
+        proposals = self._route_proposals(current_route, disruptions)
+        if not proposals:
+            logger.warning(f"No alternative route found for shipment {shipment_id}")
+            return []
 
         scored_proposals = []
         for prop in proposals:
@@ -116,15 +250,41 @@ class ReasoningEngine:
         # Sort by score (lower is better)
         scored_proposals.sort(key=lambda x: x['score'])
         logger.info(f"Generated {len(scored_proposals)} rerouting proposals")
+        return scored_proposals
+
+    def publish_proposals(self, shipment_id, scored_proposals, explanation):
+        """
+        Record ranked proposals in the audit ledger and send them to Slack for approval, or
+        publish them as one event when the engine has an outbox.
+        """
+        if self.outbox is not None:
+            from app.outbox import PROPOSALS_GENERATED
+            self.outbox.publish(PROPOSALS_GENERATED, {"shipment_id": shipment_id, "proposals": scored_proposals, "explanation": explanation})
+            return
 
-        # Log proposals in audit ledger
-        for prop in scored_proposals:
-            self.audit.log_decision(shipment_id, prop['route'], "proposed", {"score": prop['score'], "cost": prop['cost'], "time": prop['time'], "compliance": prop['compliance'], "risk_explanation": explanation})
+        # Log proposals in audit ledger as one group commit
+        self.audit.log_decisions([
+            {
+                "shipment_id": shipment_id,
+                "rerouting_option": prop['route'],
+                "approval_status": "proposed",
+                "reasoning_trace": {"score": prop['score'], "cost": prop['cost'], "time": prop['time'], "compliance": prop['compliance'], "risk_explanation": explanation}
+            }
+            for prop in scored_proposals
+        ])
 
         # Send notification to Slack
-        notifications = NotificationManager()
-        notifications.send_rerouting_proposal(shipment_id, scored_proposals, explanation)
+        self.notifications.send_rerouting_proposal(shipment_id, scored_proposals, explanation)
 
+    def generate_rerouting_proposals(self, shipment_id, current_route, risk_data, disruptions=()):
+        """
+        Generate rerouting options if risk > threshold.
+        risk_data is dict with 'score' and 'explanation'. Proposals are ranked with
+        rank_proposals and then logged and sent with publish_proposals.
+        """
+        scored_proposals = self.rank_proposals(shipment_id, current_route, risk_data, disruptions)
+        if scored_proposals:
+            self.publish_proposals(shipment_id, scored_proposals, risk_data['explanation'])
         return scored_proposals
 
 def main():
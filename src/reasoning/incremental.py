@@ -0,0 +1,146 @@
+import json
+import logging
+import os
+import sys
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from reasoning.signals import SignalIndex, to_epoch
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def signal_key(kind, signal):
+    """
+    Stable identity for a signal across ingestion cycles: its 'id' if it has one, else its content.
+    """
+    if signal.get('id') is not None:
+        return (kind, signal['id'])
+    return (kind, json.dumps(signal, sort_keys=True, default=str))
+
+class IncrementalEvaluator:
+    """
+    Keeps the last risk result per shipment and re-scores only shipments whose inputs changed:
+    a signal added, removed or crossing its validity window at one of the places (location,
+    route waypoints, grid cells) the shipment depends on, or the shipment itself being updated.
+    """
+    def __init__(self, engine, propose=False, **index_options):
+        self.engine = engine
+        self.propose = propose
+        self.index_options = index_options
+        self.index = SignalIndex(**index_options)
+        self.shipments = {}
+        self.results = {}
+        self.signals = {}
+        self.dependents = {}
+        self._places = {}
+        self._dirty = set()
+        self._evaluated_at = None
+        self._stats = {'evaluations': 0, 'reused': 0, 'cycles': 0}
+
+    def _mark(self, places):
+        for place in places:
+            if place == ('global',):
+                self._dirty.update(self.shipments)
+                return
+            self._dirty.update(self.dependents.get(place, ()))
+
+    def upsert_shipment(self, shipment_id, shipment):
+        """
+        Add or update a shipment; it is re-scored on the next evaluate().
+        """
+        self.remove_shipment(shipment_id)
+        self.shipments[shipment_id] = shipment
+        places = set(self.index.shipment_places(shipment))
+        self._places[shipment_id] = places
+        for place in places:
+            self.dependents.setdefault(place, set()).add(shipment_id)
+        self._dirty.add(shipment_id)
+
+    def remove_shipment(self, shipment_id):
+        for place in self._places.pop(shipment_id, ()):
+            self.dependents[place].discard(shipment_id)
+            if not self.dependents[place]:
+                del self.dependents[place]
+        self.shipments.pop(shipment_id, None)
+        self.results.pop(shipment_id, None)
+        self._dirty.discard(shipment_id)
+
+    def apply_signals(self, weather_data, strike_data, now=None):
+        """
+        Replace the current signal set with a new ingestion snapshot and mark the shipments
+        near any signal that appeared or disappeared. A signal whose id stays the same but whose
+        content changed counts as removed and re-added, so the places it left and the places
+        it now covers are both marked. Returns (added, removed) counts.
+        """
+        current = {}
+        for kind, signals in (('alerts', (weather_data or {}).get('alerts', [])),
+                              ('strikes', (strike_data or {}).get('strikes', []))):
+            for signal in signals:
+                current[signal_key(kind, signal)] = (kind, signal)
+        changed = {key for key in current.keys() & self.signals.keys() if current[key] != self.signals[key]}
+        added = (current.keys() - self.signals.keys()) | changed
+        removed = (self.signals.keys() - current.keys()) | changed
+        for key in added:
+            self._mark(self.index.signal_places(current[key][1]))
+        for key in removed:
+            self._mark(self.index.signal_places(self.signals[key][1]))
+        self.signals = current
+        self.index = SignalIndex.build(weather_data, strike_data, now=now, **self.index_options)
+        logger.info(f"Signal delta: {len(added)} added, {len(removed)} removed ({len(changed)} updated), "
+                    f"{len(self._dirty)} shipments to re-score")
+        return len(added), len(removed)
+
+    def _mark_window_crossings(self, at):
+        """
+        Signals whose validity window opened or closed since the last evaluation count as changed.
+        """
+        if self._evaluated_at is None:
+            return
+        for kind, signal in self.signals.values():
+            for bound in (to_epoch(signal.get('valid_from')), to_epoch(signal.get('valid_until'))):
+                if bound is not None and self._evaluated_at < bound <= at:
+                    self._mark(self.index.signal_places(signal))
+                    break
+
+    def claim(self, at=None):
+        """
+        Take the ids of the shipments that need re-scoring at time at (default now) and reset
+        the change tracking, for callers that score them elsewhere (e.g. on a worker pool)
+        with engine.evaluate_shipment(shipment, self.index, at).
+        """
+        at = at if at is not None else time.time()
+        self._mark_window_crossings(at)
+        dirty, self._dirty = self._dirty, set()
+        self._evaluated_at = at
+        return dirty
+
+    def evaluate(self, at=None):
+        """
+        Re-score the affected shipments. Returns {'updated': {shipment_id: result},
+        'unchanged': [shipment_id, ...]} where unchanged shipments keep their cached result.
+        """
+        at = at if at is not None else time.time()
+        dirty = self.claim(at)
+        updated = {}
+        for shipment_id in dirty:
+            shipment = self.shipments[shipment_id]
+            weather_data, strike_data = self.index.lookup(shipment, at)
+            result = self.engine.evaluate_risk(shipment, weather_data, strike_data, at)
+            self.results[shipment_id] = updated[shipment_id] = result
+            if self.propose and result['score'] >= 0.5:
+                self.engine.generate_rerouting_proposals(shipment_id, shipment.get('route', 'current_route'), result)
+        unchanged = [shipment_id for shipment_id in self.shipments if shipment_id not in updated]
+        self._stats['evaluations'] += len(updated)
+        self._stats['reused'] += len(unchanged)
+        self._stats['cycles'] += 1
+        logger.info(f"Incremental evaluation: {len(updated)} re-scored, {len(unchanged)} unchanged")
+        return {'updated': updated, 'unchanged': unchanged}
+
+    def stats(self):
+        stats = dict(self._stats)
+        total = stats['evaluations'] + stats['reused']
+        stats['reuse_rate'] = stats['reused'] / total if total else 0.0
+        return stats
@@ -0,0 +1,175 @@
+import heapq
+import logging
+import threading
+from collections import OrderedDict
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+class RouteGraph:
+    """
+    In-memory network of hubs and lanes. Each lane carries cost, time and compliance (0-1,
+    higher is better). Searches run a multi-objective label-setting search over (total cost,
+    total time, weakest-lane compliance) and rank paths by a weighted score; results are cached
+    per (origin, destination, k, weights, disruptions) until the graph changes.
+    """
+    def __init__(self, max_hops=8, max_labels=16, cache_size=4096):
+        self.max_hops = max_hops
+        self.max_labels = max_labels
+        self.cache_size = cache_size
+        self.hubs = {}
+        self.lanes = {}
+        self.adjacency = {}
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0}
+
+    @classmethod
+    def from_dict(cls, data, **options):
+        """
+        Build from {'hubs': [{'name', 'region'?, 'lat'?, 'lon'?}], 'lanes': [{'from', 'to', 'cost',
+        'time', 'compliance', 'bidirectional'?}]}.
+        """
+        graph = cls(**options)
+        for hub in data.get('hubs', []):
+            graph.add_hub(hub['name'], **{k: v for k, v in hub.items() if k != 'name'})
+        for lane in data.get('lanes', []):
+            graph.add_lane(lane['from'], lane['to'], lane['cost'], lane['time'], lane.get('compliance', 1.0),
+                           bidirectional=lane.get('bidirectional', False))
+        return graph
+
+    def _invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+    def add_hub(self, name, **attributes):
+        self.hubs.setdefault(name, {}).update(attributes)
+        self.adjacency.setdefault(name, [])
+        self._invalidate()
+
+    def add_lane(self, origin, destination, cost, time, compliance=1.0, bidirectional=False):
+        for a, b in ((origin, destination), (destination, origin)) if bidirectional else ((origin, destination),):
+            for hub in (a, b):
+                if hub not in self.hubs:
+                    self.add_hub(hub)
+            if (a, b) not in self.lanes:
+                self.adjacency[a].append(b)
+            self.lanes[(a, b)] = {'cost': cost, 'time': time, 'compliance': compliance}
+        self._invalidate()
+
+    def path_totals(self, path):
+        """
+        (cost, time, compliance) of a hub path, or None if a lane is missing.
+        """
+        cost = time = 0.0
+        compliance = 1.0
+        for lane in zip(path, path[1:]):
+            attributes = self.lanes.get(lane)
+            if attributes is None:
+                return None
+            cost += attributes['cost']
+            time += attributes['time']
+            compliance = min(compliance, attributes['compliance'])
+        return cost, time, compliance
+
+    def disruptions(self, signal_index, at=None, severity=5):
+        """
+        Hubs hit by a severe weather alert (severity above severity) or a high-impact strike,
+        looked up in a SignalIndex by each hub's region name and/or lat/lon.
+        """
+        blocked = set()
+        for name, hub in self.hubs.items():
+            place = {'location': hub.get('region', name), 'lat': hub.get('lat'), 'lon': hub.get('lon')}
+            weather, strikes = signal_index.lookup(place, at)
+            if (any(alert.get('severity', 0) > severity for alert in weather['alerts']) or
+                    any(strike.get('impact') == 'high' for strike in strikes['strikes'])):
+                blocked.add(name)
+        return frozenset(blocked)
+
+    def ranked_paths(self, origin, destination, k=3, weights=(1.0, 1.0, 1.0), blocked_hubs=(), blocked_lanes=()):
+        """
+        Loop-free paths from origin to destination avoiding blocked hubs and lanes, best first by
+        weights[0] * cost + weights[1] * time + weights[2] / compliance. A partial path is pruned
+        once k others dominate it, so the k best paths and the Pareto frontier both survive.
+        Returns a list of (path, cost, time, compliance, pareto).
+        """
+        key = (origin, destination, k, tuple(weights), frozenset(blocked_hubs), frozenset(blocked_lanes))
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self._stats['hits'] += 1
+                return self._cache[key]
+            self._stats['misses'] += 1
+        result = self._search(origin, destination, k, weights, key[4], key[5])
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return result
+
+    @staticmethod
+    def _dominates(a, b):
+        return a != b and a[0] <= b[0] and a[1] <= b[1] and a[2] >= b[2]
+
+    def _search(self, origin, destination, k, weights, blocked_hubs, blocked_lanes):
+        if origin not in self.hubs or destination not in self.hubs or origin in blocked_hubs or destination in blocked_hubs:
+            return []
+        cost_weight, time_weight, compliance_weight = weights
+
+        def priority(cost, time, compliance):
+            return cost_weight * cost + time_weight * time + compliance_weight / compliance
+
+        labels = {origin: [(0.0, 0.0, 1.0)]}
+        heap = [(priority(0.0, 0.0, 1.0), 0.0, 0.0, 1.0, (origin,))]
+        found = []
+        while heap:
+            _, cost, time, compliance, path = heapq.heappop(heap)
+            if path[-1] == destination:
+                found.append((path, cost, time, compliance))
+                continue
+            if len(path) > self.max_hops:
+                continue
+            hub = path[-1]
+            for nxt in self.adjacency[hub]:
+                if nxt in blocked_hubs or (hub, nxt) in blocked_lanes or nxt in path:
+                    continue
+                lane = self.lanes[(hub, nxt)]
+                label = (cost + lane['cost'], time + lane['time'], min(compliance, lane['compliance']))
+                if label[2] <= 0:
+                    continue
+                existing = labels.setdefault(nxt, [])
+                if len(existing) >= self.max_labels or sum(self._dominates(other, label) for other in existing) >= k:
+                    continue
+                existing.append(label)
+                heapq.heappush(heap, (priority(*label), *label, path + (nxt,)))
+        totals = [entry[1:] for entry in found]
+        ranked = [(list(path), cost, time, compliance, not any(self._dominates(other, (cost, time, compliance)) for other in totals))
+                  for path, cost, time, compliance in found]
+        ranked.sort(key=lambda entry: priority(*entry[1:4]))
+        return ranked
+
+    def k_best(self, origin, destination, k=3, weights=(1.0, 1.0, 1.0), blocked_hubs=(), blocked_lanes=(), baseline=None):
+        """
+        Up to k rerouting proposals, best first. cost and time are relative to the baseline
+        path (when it exists in the graph) so they compare with the current route; 'pareto'
+        marks proposals no other path beats on every objective.
+        """
+        ranked = self.ranked_paths(origin, destination, k + 1 if baseline else k, weights, blocked_hubs, blocked_lanes)
+        reference = self.path_totals(baseline) if baseline else None
+        proposals = []
+        for path, cost, time, compliance, pareto in ranked:
+            if baseline and path == list(baseline):
+                continue
+            if reference and reference[0] and reference[1]:
+                cost, time = cost / reference[0], time / reference[1]
+            proposals.append({'route': ' -> '.join(path), 'path': path, 'cost': cost, 'time': time,
+                              'compliance': compliance, 'pareto': pareto})
+            if len(proposals) == k:
+                break
+        return proposals
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats['cached_searches'] = len(self._cache)
+        return stats
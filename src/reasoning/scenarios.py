@@ -0,0 +1,87 @@
+import logging
+from collections import Counter
+
+import numpy as np
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def weight_grid(steps=11):
+    """
+    Every (cost, time, compliance) weight triple on the simplex with spacing 1 / (steps - 1).
+    Returns an array of shape (n, 3).
+    """
+    ticks = np.linspace(0.0, 1.0, steps)
+    cost, time = np.meshgrid(ticks, ticks, indexing='ij')
+    compliance = 1.0 - cost - time
+    valid = compliance >= -1e-9
+    return np.column_stack([cost[valid], time[valid], np.clip(compliance[valid], 0.0, 1.0)])
+
+def candidate_matrix(fleet_candidates):
+    """
+    Stack per-shipment proposal lists into a (shipments, max_candidates, 3) array of
+    (cost, time, 1 / compliance) plus a mask of real entries; ragged lists are padded.
+    """
+    width = max((len(candidates) for candidates in fleet_candidates), default=0)
+    features = np.zeros((len(fleet_candidates), width, 3))
+    mask = np.zeros((len(fleet_candidates), width), dtype=bool)
+    for row, candidates in enumerate(fleet_candidates):
+        for col, candidate in enumerate(candidates):
+            features[row, col] = (candidate['cost'], candidate['time'], 1 / candidate['compliance'])
+            mask[row, col] = True
+    return features, mask
+
+def top_k(scores, k):
+    """
+    Indices of the k lowest scores along the last axis, best first, using a partial selection
+    (argpartition) and sorting only the k selected.
+    """
+    k = min(k, scores.shape[-1])
+    if k == 0:
+        return np.zeros(scores.shape[:-1] + (0,), dtype=np.intp)
+    part = np.argpartition(scores, k - 1, axis=-1)[..., :k]
+    order = np.argsort(np.take_along_axis(scores, part, axis=-1), axis=-1, kind='stable')
+    return np.take_along_axis(part, order, axis=-1)
+
+def sweep(fleet_candidates, weights, k=3, baseline=None):
+    """
+    Score every shipment's candidates under every weight vector at once (lower is better, as in
+    ReasoningEngine). weights is (n, 3); baseline is the reference weight triple. Returns per
+    shipment: 'top_k' (n, k) candidate indices, 'winner_counts', 'stability' (share of weight
+    settings picking the most common winner), 'distinct_winners', and with a baseline the
+    'baseline_ranking', 'baseline_agreement' (share of settings with the baseline winner) and
+    'top_k_overlap' (mean share of the baseline top k kept).
+    """
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    features, mask = candidate_matrix(fleet_candidates)
+    # (shipments, weights, candidates)
+    scores = np.einsum('scf,wf->swc', features, weights)
+    scores = np.where(mask[:, None, :], scores, np.inf)
+    ranked = top_k(scores, k)
+
+    if baseline is not None:
+        baseline_scores = np.where(mask, features @ np.asarray(baseline, dtype=float), np.inf)
+        baseline_ranked = top_k(baseline_scores, k)
+
+    results = []
+    for row, candidates in enumerate(fleet_candidates):
+        depth = min(k, len(candidates))
+        shipment_top = ranked[row, :, :depth]
+        result = {'top_k': shipment_top}
+        if depth == 0:
+            result.update({'winner_counts': {}, 'stability': 0.0, 'distinct_winners': 0})
+            results.append(result)
+            continue
+        winners = Counter(shipment_top[:, 0].tolist())
+        result['winner_counts'] = dict(winners)
+        result['stability'] = winners.most_common(1)[0][1] / len(weights)
+        result['distinct_winners'] = len(winners)
+        if baseline is not None:
+            reference = baseline_ranked[row, :depth]
+            result['baseline_ranking'] = reference.tolist()
+            result['baseline_agreement'] = float(np.mean(shipment_top[:, 0] == reference[0]))
+            overlap = np.isin(shipment_top, reference).sum(axis=1) / depth
+            result['top_k_overlap'] = float(overlap.mean())
+        results.append(result)
+    logger.info(f"Swept {len(weights)} weight settings over {len(fleet_candidates)} shipments")
+    return results
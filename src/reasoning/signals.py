@@ -0,0 +1,137 @@
+import logging
+import math
+import time
+from datetime import datetime
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+KM_PER_DEGREE = 111.0
+
+# Default shipment locations that add location risk; override with ReasoningEngine(risky_locations=...)
+RISKY_LOCATIONS = ('risky_area1', 'risky_area2')
+
+def to_epoch(value):
+    """
+    Accept epoch seconds or an ISO 8601 string (a trailing 'Z' is allowed); None stays None.
+    """
+    if value is None or isinstance(value, (int, float)):
+        return value
+    return datetime.fromisoformat(value.replace('Z', '+00:00')).timestamp()
+
+class SignalIndex:
+    """
+    Weather alerts and strikes indexed by where they apply, built once per ingestion cycle.
+
+    A signal may name a region ('region', matched against shipment and route locations) or
+    carry 'lat'/'lon' with an optional 'radius_km', in which case it is registered in every
+    grid cell of cell_size degrees the radius touches. Signals with neither apply everywhere.
+    'valid_from'/'valid_until' (epoch seconds or ISO 8601) bound when a signal counts.
+    """
+    def __init__(self, cell_size=1.0, default_radius_km=50.0):
+        self.cell_size = cell_size
+        self.default_radius_km = default_radius_km
+        self.regions = {}
+        self.cells = {}
+        self.global_signals = {'alerts': [], 'strikes': []}
+        self.built_at = None
+
+    @classmethod
+    def build(cls, weather_data, strike_data, now=None, **options):
+        index = cls(**options)
+        now = now if now is not None else time.time()
+        for kind, signals in (('alerts', (weather_data or {}).get('alerts', [])),
+                              ('strikes', (strike_data or {}).get('strikes', []))):
+            for signal in signals:
+                index.add(kind, signal, now)
+        index.built_at = now
+        logger.info(f"Signal index built: {len(index.regions)} regions, {len(index.cells)} cells, "
+                    f"{sum(len(v) for v in index.global_signals.values())} global signals")
+        return index
+
+    def cell(self, lat, lon):
+        return (math.floor(lat / self.cell_size), math.floor(lon / self.cell_size))
+
+    def _cells_within(self, lat, lon, radius_km):
+        lat_span = radius_km / KM_PER_DEGREE
+        lon_span = radius_km / (KM_PER_DEGREE * max(math.cos(math.radians(lat)), 0.01))
+        south, west = self.cell(lat - lat_span, lon - lon_span)
+        north, east = self.cell(lat + lat_span, lon + lon_span)
+        return [(i, j) for i in range(south, north + 1) for j in range(west, east + 1)]
+
+    def signal_places(self, signal):
+        """
+        Place keys a signal applies to: ('region', name), ('cell', (row, col)) or ('global',).
+        """
+        if signal.get('region'):
+            return [('region', signal['region'])]
+        if signal.get('lat') is not None and signal.get('lon') is not None:
+            radius = signal.get('radius_km', self.default_radius_km)
+            return [('cell', key) for key in self._cells_within(signal['lat'], signal['lon'], radius)]
+        return [('global',)]
+
+    def shipment_places(self, shipment):
+        """
+        Place keys covering a shipment: its location and every route waypoint, each given as a
+        region name or a {'lat', 'lon'} point. Global signals apply to every shipment.
+        """
+        points = [shipment]
+        points.extend(shipment.get('route') or [])
+        places = [('global',)]
+        for point in points:
+            if isinstance(point, str):
+                point = {'location': point}
+            if point.get('location'):
+                places.append(('region', point['location']))
+            if point.get('lat') is not None and point.get('lon') is not None:
+                places.append(('cell', self.cell(point['lat'], point['lon'])))
+        return places
+
+    def _bucket(self, place, create=False):
+        if place[0] == 'global':
+            return self.global_signals
+        buckets = self.regions if place[0] == 'region' else self.cells
+        if create:
+            return buckets.setdefault(place[1], {'alerts': [], 'strikes': []})
+        return buckets.get(place[1])
+
+    def add(self, kind, signal, now=None):
+        """
+        Register one signal ('alerts' or 'strikes'). Signals already expired at now are dropped.
+        """
+        valid_until = to_epoch(signal.get('valid_until'))
+        if now is not None and valid_until is not None and valid_until < now:
+            return
+        entry = (to_epoch(signal.get('valid_from')), valid_until, signal)
+        for place in self.signal_places(signal):
+            self._bucket(place, create=True)[kind].append(entry)
+
+    def lookup(self, shipment, at=None):
+        """
+        Signals relevant to one shipment at time at (default now), as the
+        (weather_data, strike_data) pair evaluate_risk takes.
+        """
+        at = at if at is not None else time.time()
+        found = {'alerts': [], 'strikes': []}
+        seen = set()
+        for place in self.shipment_places(shipment or {}):
+            bucket = self._bucket(place)
+            if not bucket:
+                continue
+            for kind in ('alerts', 'strikes'):
+                for valid_from, valid_until, signal in bucket[kind]:
+                    if id(signal) in seen:
+                        continue
+                    if (valid_from is not None and at < valid_from) or (valid_until is not None and at > valid_until):
+                        continue
+                    seen.add(id(signal))
+                    found[kind].append(signal)
+        return {'alerts': found['alerts']}, {'strikes': found['strikes']}
+
+    def lookup_fleet(self, shipments, at=None):
+        """
+        Per-shipment signals for a fleet, as lists aligned with shipments (the form score_fleet takes).
+        """
+        at = at if at is not None else time.time()
+        pairs = [self.lookup(shipment, at) for shipment in shipments]
+        return [weather for weather, _ in pairs], [strikes for _, strikes in pairs]
@@ -1,12 +1,24 @@
 import unittest
 import os
 import json
+import multiprocessing
+import shutil
 import sys
+import tempfile
+import threading
+import time
+from unittest.mock import MagicMock, patch
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from audit.audit import AuditLogger
+from audit.audit import AuditLogger, shared_audit_logger
+
+def _write_from_process(test_file, storage_mode, worker):
+    with patch.object(AuditLogger, 'call_nova', return_value=None):
+        audit = AuditLogger(test_file, storage_mode=storage_mode)
+        for i in range(5):
+            audit.log_decision(f"{worker}-{i}", "Route A", "proposed")
 
 class TestAuditLogger(unittest.TestCase):
 
@@ -15,8 +27,9 @@ class TestAuditLogger(unittest.TestCase):
         self.audit = AuditLogger(self.test_file)
 
     def tearDown(self):
-        if os.path.exists(self.test_file):
-            os.remove(self.test_file)
+        for path in (self.test_file, self.test_file + '.lock'):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_log_decision(self):
         hash_val = self.audit.log_decision("12345", "Route A", "approved", {"score": 95})
@@ -54,5 +67,507 @@ class TestAuditLogger(unittest.TestCase):
         self.audit.ledger[1]['data']['previous_hash'] = 'tampered'
         self.assertFalse(self.audit.verify_integrity())
 
+class TestSegmentedAuditLogger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.tmp_dir, 'audit_ledger.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _logger(self, **kwargs):
+        return AuditLogger(self.test_file, storage_mode='segmented', **kwargs)
+
+    def test_entries_survive_reload(self):
+        audit = self._logger()
+        audit.log_decision("12345", "Route A", "approved")
+        audit.log_decision("67890", "Route B", "rejected")
+        reloaded = self._logger()
+        self.assertEqual(reloaded.ledger, audit.ledger)
+        self.assertTrue(reloaded.verify_integrity())
+        self.assertFalse(os.path.exists(self.test_file))
+
+    def test_segments_roll(self):
+        audit = self._logger(segment_size=2)
+        for i in range(5):
+            audit.log_decision(str(i), "Route A", "approved")
+        self.assertEqual(len(audit.store.manifest['segments']), 3)
+        reloaded = self._logger()
+        self.assertEqual(len(reloaded.ledger), 5)
+        self.assertTrue(reloaded.verify_integrity())
+
+    def test_torn_record_is_truncated(self):
+        audit = self._logger()
+        audit.log_decision("12345", "Route A", "approved")
+        segment = os.path.join(audit.store.directory, audit.store.manifest['segments'][-1]['name'])
+        with open(segment, 'a') as f:
+            f.write('{"data": {"shipment_id"')
+        reloaded = self._logger()
+        self.assertEqual(len(reloaded.ledger), 1)
+        reloaded.log_decision("67890", "Route B", "rejected")
+        self.assertTrue(self._logger().verify_integrity())
+
+    def test_migrates_json_ledger_once(self):
+        legacy = AuditLogger(self.test_file)
+        legacy.log_decision("12345", "Route A", "approved")
+        audit = self._logger()
+        self.assertEqual(audit.ledger, legacy.ledger)
+        self.assertIsNotNone(audit.store.manifest['migrated_from'])
+        audit.log_decision("67890", "Route B", "rejected")
+        self.assertEqual(len(self._logger().ledger), 2)
+
+class TestLazyAuditLogger(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.tmp_dir, 'audit_ledger.json')
+        audit = AuditLogger(self.test_file, storage_mode='segmented', segment_size=4)
+        for i in range(10):
+            audit.log_decision(str(i % 2), f"Route {i}", "approved")
+        self.eager = audit
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _lazy(self):
+        return AuditLogger(self.test_file, storage_mode='segmented', lazy=True)
+
+    def test_requires_segmented_storage(self):
+        with self.assertRaises(ValueError):
+            AuditLogger(self.test_file, lazy=True)
+
+    def test_startup_reads_only_tail(self):
+        with patch('audit.segments.SegmentStore.iter_entries') as mock_iter:
+            audit = self._lazy()
+        mock_iter.assert_not_called()
+        self.assertEqual(len(audit.ledger), 10)
+        self.assertEqual(audit.ledger[-1], self.eager.ledger[-1])
+
+    def test_streaming_reads(self):
+        audit = self._lazy()
+        logs = audit.get_logs("1")
+        self.assertNotIsInstance(logs, list)
+        self.assertEqual(list(logs), self.eager.get_logs("1"))
+        self.assertEqual(audit.ledger[5], self.eager.ledger[5])
+        self.assertEqual(audit.ledger[2:7], self.eager.ledger[2:7])
+        page = audit.query_logs(shipment_id="0", limit=2, cursor="0")
+        self.assertEqual(page['entries'], self.eager.get_logs("0")[1:3])
+        self.assertTrue(audit.verify_integrity())
+
+    def test_appends_chain_onto_tail(self):
+        audit = self._lazy()
+        audit.log_decision("2", "Route X", "approved")
+        self.assertEqual(len(audit.ledger), 11)
+        self.assertEqual(audit.ledger[10]['data']['previous_hash'], self.eager.ledger[9]['hash'])
+        self.assertTrue(audit.verify_integrity())
+        self.assertEqual(len(AuditLogger(self.test_file, storage_mode='segmented').ledger), 11)
+
+    def test_reads_follow_segments_archived_by_another_logger(self):
+        audit = self._lazy()
+        self.assertEqual(self.eager.archive(keep_recent=5), 4)
+        self.assertEqual(list(audit.get_logs("1")), self.eager.get_logs("1"))
+        self.assertEqual(audit.ledger[0], self.eager.ledger[0])
+        self.assertTrue(audit.verify_integrity())
+
+    def test_missing_segment_raises(self):
+        audit = self._lazy()
+        os.remove(os.path.join(audit.store.directory, audit.store.manifest['segments'][0]['name']))
+        with self.assertRaises(FileNotFoundError):
+            list(audit.get_logs())
+
+    def test_short_read_fails_verification(self):
+        audit = self._lazy()
+        segment = os.path.join(audit.store.directory, audit.store.manifest['segments'][-1]['name'])
+        with open(segment, 'rb') as f:
+            lines = f.readlines()
+        with open(segment, 'wb') as f:
+            f.writelines(lines[:-1])
+        self.assertFalse(audit.verify_integrity())
+
+class TestLedgerArchival(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.tmp_dir, 'audit_ledger.json')
+        self.audit = AuditLogger(self.test_file, storage_mode='segmented', segment_size=4)
+        self.audit.log_decisions([{"shipment_id": str(i), "rerouting_option": "Route A", "approval_status": "proposed"}
+                                  for i in range(14)])
+        self.original = list(self.audit.ledger)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _reload(self):
+        return AuditLogger(self.test_file, storage_mode='segmented')
+
+    def test_archives_old_segments(self):
+        self.assertEqual(self.audit.archive(keep_recent=5), 8)
+        segments = self.audit.store.manifest['segments']
+        self.assertEqual([s.get('archived', False) for s in segments], [True, True, False, False])
+        archive_path = os.path.join(self.audit.store.directory, segments[0]['name'])
+        self.assertTrue(archive_path.endswith('.gz'))
+        self.assertEqual(os.stat(archive_path).st_mode & 0o777, 0o444)
+        self.assertFalse(os.path.exists(archive_path[:-3]))
+        self.assertEqual(segments[1]['anchor_hash'], segments[0]['last_hash'])
+        self.assertEqual(len(self.audit.ledger.hot), 6)
+
+    def test_archived_entries_reachable(self):
+        self.audit.archive(keep_recent=5)
+        reloaded = self._reload()
+        self.assertEqual(len(reloaded.ledger), 14)
+        self.assertEqual(reloaded.get_logs("2"), [self.original[2]])
+        self.assertEqual(reloaded.ledger[0:14], self.original)
+        self.assertTrue(reloaded.verify_integrity())
+        reloaded.log_decision("14", "Route B", "approved")
+        self.assertTrue(self._reload().verify_integrity())
+
+    def test_hot_only_verification_skips_archives(self):
+        self.audit.archive(keep_recent=5)
+        reloaded = self._reload()
+        with patch('audit.segments.gzip.open', side_effect=AssertionError("archive decompressed")):
+            self.assertTrue(reloaded.verify_integrity(hot_only=True))
+        archive_path = os.path.join(reloaded.store.directory, reloaded.store.manifest['segments'][0]['name'])
+        os.chmod(archive_path, 0o644)
+        with open(archive_path, 'ab') as f:
+            f.write(b'tampered')
+        self.assertFalse(reloaded.verify_integrity(hot_only=True))
+
+    def test_json_storage_cannot_archive(self):
+        with self.assertRaises(ValueError):
+            AuditLogger(os.path.join(self.tmp_dir, 'plain.json')).archive()
+
+class TestAuditQueries(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.tmp_dir, 'audit_ledger.json')
+        self.audit = AuditLogger(self.test_file, storage_mode='segmented')
+        for i in range(10):
+            self.audit.log_decision(str(i % 3), f"Route {i}", "approved" if i % 2 else "proposed")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_get_logs_uses_index(self):
+        logs = self.audit.get_logs("1")
+        self.assertEqual([log['data']['rerouting_option'] for log in logs], ["Route 1", "Route 4", "Route 7"])
+
+    def test_status_filter_with_pagination(self):
+        page = self.audit.query_logs(status="approved", limit=2)
+        routes = [log['data']['rerouting_option'] for log in page['entries']]
+        while page['next_cursor']:
+            page = self.audit.query_logs(status="approved", limit=2, cursor=page['next_cursor'])
+            routes += [log['data']['rerouting_option'] for log in page['entries']]
+        self.assertEqual(routes, ["Route 1", "Route 3", "Route 5", "Route 7", "Route 9"])
+
+    def test_combined_filters_descending(self):
+        page = self.audit.query_logs(shipment_id="0", status="proposed", descending=True)
+        self.assertEqual([log['data']['rerouting_option'] for log in page['entries']], ["Route 6", "Route 0"])
+        self.assertIsNone(page['next_cursor'])
+
+    def test_time_range(self):
+        timestamps = [entry['data']['timestamp'] for entry in self.audit.ledger]
+        page = self.audit.query_logs(start=timestamps[2], end=timestamps[5])
+        self.assertEqual(page['entries'], self.audit.ledger[2:5])
+
+    def test_index_persisted_and_caught_up(self):
+        index_file = self.audit.index.index_file
+        self.assertTrue(os.path.exists(index_file))
+        # Simulate an index that missed the last entries
+        with open(index_file, 'r') as f:
+            lines = f.readlines()
+        with open(index_file, 'w') as f:
+            f.writelines(lines[:7])
+        reloaded = AuditLogger(self.test_file, storage_mode='segmented')
+        self.assertEqual(reloaded.index.count, 10)
+        self.assertEqual(len(reloaded.get_logs("0")), 4)
+
+NOVA_SUMMARY = {'outputText': 'Compliant', 'stopReason': 'end_turn', 'usage': {}, 'modelId': 'amazon.nova-pro', 'region': 'us-east-1'}
+
+class TestGroupCommit(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.tmp_dir, 'audit_ledger.json')
+        self.audit = AuditLogger(self.test_file, storage_mode='segmented')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_log_decisions_single_write(self):
+        batch = [{"shipment_id": "12345", "rerouting_option": f"Route {i}", "approval_status": "proposed",
+                  "reasoning_trace": {"score": i}} for i in range(3)]
+        with patch.object(self.audit.store, 'append', wraps=self.audit.store.append) as mock_append:
+            hashes = self.audit.log_decisions(batch)
+        mock_append.assert_called_once()
+        self.assertEqual(hashes, [entry['hash'] for entry in self.audit.ledger])
+        self.assertEqual(self.audit.ledger[2]['data']['previous_hash'], hashes[1])
+        reloaded = AuditLogger(self.test_file, storage_mode='segmented')
+        self.assertEqual(len(reloaded.ledger), 3)
+        self.assertTrue(reloaded.verify_integrity())
+
+    def test_inline_summaries_run_concurrently(self):
+        def slow_invoke(prompt, **kwargs):
+            time.sleep(0.2)
+            return NOVA_SUMMARY
+        nova = MagicMock()
+        nova.invoke.side_effect = slow_invoke
+        audit = AuditLogger(os.path.join(self.tmp_dir, 'inline.json'), nova=nova)
+        started = time.monotonic()
+        audit.log_decisions([{"shipment_id": str(i), "rerouting_option": "Route A", "approval_status": "proposed"}
+                             for i in range(5)])
+        self.assertLess(time.monotonic() - started, 0.6)
+        self.assertEqual(nova.invoke.call_count, 5)
+        self.assertEqual([entry['data']['compliance_summary'] for entry in audit.ledger], ['Compliant'] * 5)
+        self.assertEqual(audit.executor.stats()['completed'], 5)
+
+    def test_concurrent_callers_keep_chain(self):
+        def worker(n):
+            for i in range(5):
+                self.audit.log_decisions([{"shipment_id": str(n), "rerouting_option": "Route A", "approval_status": "proposed"}] * 2)
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        reloaded = AuditLogger(self.test_file, storage_mode='segmented')
+        self.assertEqual(len(reloaded.ledger), 40)
+        self.assertTrue(reloaded.verify_integrity())
+
+class TestSharedWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.tmp_dir, 'audit_ledger.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_shared_logger_is_per_path(self):
+        first = shared_audit_logger(self.test_file)
+        self.assertIs(shared_audit_logger(self.test_file), first)
+        self.assertIsNot(shared_audit_logger(os.path.join(self.tmp_dir, 'other.json')), first)
+
+    def test_writers_do_not_overwrite_each_other(self):
+        for storage_mode in ('json', 'segmented'):
+            with self.subTest(storage_mode=storage_mode):
+                test_file = os.path.join(self.tmp_dir, f'{storage_mode}.json')
+                engine = AuditLogger(test_file, storage_mode=storage_mode)
+                callback = AuditLogger(test_file, storage_mode=storage_mode)
+                engine.log_decision("1", "Route A", "proposed")
+                callback.log_decision("1", "Route A", "approved")
+                engine.log_decision("2", "Route B", "proposed")
+                self.assertEqual(len(engine.ledger), 3)
+                self.assertEqual(len(engine.get_logs("1")), 2)
+                reloaded = AuditLogger(test_file, storage_mode=storage_mode)
+                self.assertEqual(len(reloaded.ledger), 3)
+                self.assertTrue(reloaded.verify_integrity())
+
+    def test_concurrent_processes(self):
+        context = multiprocessing.get_context('fork')
+        for storage_mode in ('json', 'segmented'):
+            with self.subTest(storage_mode=storage_mode):
+                test_file = os.path.join(self.tmp_dir, f'procs_{storage_mode}.json')
+                processes = [context.Process(target=_write_from_process, args=(test_file, storage_mode, n)) for n in range(3)]
+                for process in processes:
+                    process.start()
+                for process in processes:
+                    process.join()
+                reloaded = AuditLogger(test_file, storage_mode=storage_mode)
+                self.assertEqual(len(reloaded.ledger), 15)
+                self.assertTrue(reloaded.verify_integrity())
+
+class TestParallelVerification(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.tmp_dir, 'audit_ledger.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _fill(self, audit, count=30):
+        audit.log_decisions([{"shipment_id": str(i), "rerouting_option": "Route A", "approval_status": "proposed"}
+                             for i in range(count)])
+
+    def test_valid_ledger(self):
+        audit = AuditLogger(self.test_file, checkpoint_key='secret')
+        self._fill(audit)
+        audit.checkpoint()
+        report = audit.verify_report(workers=2, chunk_size=7)
+        self.assertTrue(report['valid'])
+        self.assertEqual(report['checked'], 30)
+        self.assertGreater(report['chunks'], 1)
+        self.assertTrue(audit.verify_integrity(parallel=True, workers=2))
+
+    def test_reports_every_broken_index(self):
+        audit = AuditLogger(self.test_file)
+        self._fill(audit)
+        audit.ledger[3]['hash'] = 'tampered'
+        audit.ledger[20]['data']['rerouting_option'] = 'Route Z'
+        # Re-link entry 14, which starts a chunk, with a valid hash so only the boundary link breaks
+        audit.ledger[14]['data']['previous_hash'] = '0' * 64
+        audit.ledger[14]['hash'] = audit._compute_hash(audit.ledger[14]['data'])
+        report = audit.verify_report(workers=2, chunk_size=7)
+        self.assertFalse(report['valid'])
+        self.assertEqual(report['hash_mismatches'], [3, 20])
+        self.assertEqual(report['chain_breaks'], [4, 14, 15])
+        self.assertEqual(report['broken_indices'], [3, 4, 14, 15, 20])
+
+    def test_segmented_workers_read_from_disk(self):
+        audit = AuditLogger(self.test_file, storage_mode='segmented', segment_size=8,
+                            checkpoint_interval=10, checkpoint_key='secret')
+        self._fill(audit)
+        segment = os.path.join(audit.store.directory, audit.store.manifest['segments'][1]['name'])
+        with open(segment, 'r') as f:
+            lines = f.readlines()
+        lines[2] = lines[2].replace('Route A', 'Route Z')
+        with open(segment, 'w') as f:
+            f.writelines(lines)
+        report = AuditLogger(self.test_file, storage_mode='segmented', lazy=True,
+                             checkpoint_key='secret').verify_report(workers=2, chunk_size=10)
+        self.assertEqual(report['hash_mismatches'], [10])
+        self.assertEqual(report['checkpoint_failures'], [])
+
+class TestAsyncSummaries(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.tmp_dir, 'audit_ledger.json')
+        self.audit = AuditLogger(self.test_file, summary_mode='async')
+
+    def tearDown(self):
+        self.audit.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_entry_committed_before_summary(self):
+        release = threading.Event()
+        def slow_nova(prompt):
+            release.wait(5)
+            return NOVA_SUMMARY
+        with patch.object(self.audit, 'call_nova', side_effect=slow_nova):
+            entry_hash = self.audit.log_decision("12345", "Route A", "approved")
+            self.assertEqual(len(self.audit.ledger), 1)
+            self.assertEqual(self.audit.get_summary(entry_hash), "Summary pending")
+            release.set()
+            self.assertTrue(self.audit.summaries.wait(5))
+        annotation = self.audit.ledger[1]['data']
+        self.assertEqual(annotation['annotates'], entry_hash)
+        self.assertEqual(annotation['approval_status'], 'annotation')
+        self.assertEqual(self.audit.get_summary(entry_hash), 'Compliant')
+        self.assertTrue(self.audit.verify_integrity())
+
+    def test_annotations_excluded_from_queries_by_default(self):
+        with patch.object(self.audit, 'call_nova', return_value=NOVA_SUMMARY):
+            entry_hash = self.audit.log_decision("12345", "Route A", "approved")
+            self.assertTrue(self.audit.summaries.wait(5))
+        self.assertEqual(len(self.audit.ledger), 2)
+        self.assertEqual([e['hash'] for e in self.audit.get_logs("12345")], [entry_hash])
+        self.assertEqual([e['hash'] for e in self.audit.get_logs()], [entry_hash])
+        self.assertEqual([e['hash'] for e in self.audit.query_logs(shipment_id="12345")['entries']], [entry_hash])
+        self.assertEqual(len(self.audit.get_logs("12345", include_annotations=True)), 2)
+        self.assertEqual(len(self.audit.query_logs(shipment_id="12345", include_annotations=True)['entries']), 2)
+        self.assertEqual(len(self.audit.query_logs(status="annotation")['entries']), 1)
+
+    def test_backfill_missing_summaries(self):
+        with patch.object(self.audit, 'call_nova', return_value=None):
+            entry_hash = self.audit.log_decision("12345", "Route A", "approved")
+            self.audit.summaries.wait(5)
+        self.assertEqual(len(self.audit.ledger), 1)
+        reloaded = AuditLogger(self.test_file, summary_mode='async')
+        try:
+            with patch.object(reloaded, 'call_nova', return_value=NOVA_SUMMARY):
+                self.assertEqual(reloaded.backfill_summaries(), 1)
+                reloaded.summaries.wait(5)
+            self.assertEqual(reloaded.get_summary(entry_hash), 'Compliant')
+            self.assertEqual(reloaded.backfill_summaries(), 0)
+        finally:
+            reloaded.close()
+
+class TestAuditCheckpoints(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.test_file = os.path.join(self.tmp_dir, 'audit_ledger.json')
+        self.audit = AuditLogger(self.test_file, checkpoint_interval=4, checkpoint_key='secret')
+        for i in range(10):
+            self.audit.log_decision(str(i), "Route A", "approved")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_checkpoints_sealed_periodically(self):
+        self.assertEqual([(c['start'], c['end']) for c in self.audit.checkpoints], [(0, 4), (4, 8)])
+        self.assertIsNotNone(self.audit.checkpoints[0]['signature'])
+        reloaded = AuditLogger(self.test_file, checkpoint_key='secret')
+        self.assertEqual(reloaded.checkpoints, self.audit.checkpoints)
+        self.assertTrue(reloaded.verify_integrity())
+
+    def test_inclusion_proof(self):
+        for entry in self.audit.ledger[:8]:
+            proof = self.audit.get_inclusion_proof(entry['hash'])
+            self.assertTrue(self.audit.verify_inclusion_proof(proof))
+        proof = self.audit.get_inclusion_proof(self.audit.ledger[5]['hash'])
+        proof['entry_hash'] = self.audit.ledger[6]['hash']
+        self.assertFalse(self.audit.verify_inclusion_proof(proof))
+
+    def test_inclusion_proof_requires_checkpoint(self):
+        with self.assertRaises(ValueError):
+            self.audit.get_inclusion_proof(self.audit.ledger[9]['hash'])
+        self.audit.checkpoint()
+        proof = self.audit.get_inclusion_proof(self.audit.ledger[9]['hash'])
+        self.assertTrue(self.audit.verify_inclusion_proof(proof))
+
+    def test_checkpoints_require_a_key(self):
+        with patch.dict(os.environ, {}, clear=True):
+            with self.assertRaises(ValueError):
+                AuditLogger(self.test_file, checkpoint_interval=4)
+            with self.assertRaises(ValueError):
+                AuditLogger(self.test_file).checkpoint()
+
+    def test_unsigned_checkpoint_reported(self):
+        with open(self.audit.checkpoint_file, 'r') as f:
+            checkpoints = [json.loads(line) for line in f]
+        checkpoints[1]['signature'] = None
+        with open(self.audit.checkpoint_file, 'w') as f:
+            f.writelines(json.dumps(c) + '\n' for c in checkpoints)
+        reloaded = AuditLogger(self.test_file, checkpoint_key='secret')
+        report = reloaded.verify_report()
+        self.assertFalse(report['valid'])
+        self.assertEqual(report['unsigned_checkpoints'], [1])
+        self.assertEqual(report['checkpoint_failures'], [])
+        self.assertFalse(reloaded.verify_integrity())
+
+    def test_wrong_key_fails_verification(self):
+        reloaded = AuditLogger(self.test_file, checkpoint_key='other')
+        self.assertFalse(reloaded.verify_integrity())
+
+    def test_incremental_verification(self):
+        self.assertTrue(self.audit.verify_integrity())
+        # Already verified entries are not re-checked incrementally
+        self.audit.ledger[0]['hash'] = 'tampered'
+        self.audit.log_decision("10", "Route B", "approved")
+        self.assertTrue(self.audit.verify_integrity(incremental=True))
+        self.assertFalse(self.audit.verify_integrity())
+
+    def test_incremental_verification_anchors_on_signed_checkpoint(self):
+        reloaded = AuditLogger(self.test_file, checkpoint_key='secret')
+        with patch.object(reloaded, '_compute_hash', wraps=reloaded._compute_hash) as compute_hash:
+            self.assertTrue(reloaded.verify_integrity(incremental=True))
+        # Only the two entries after the last checkpoint are re-hashed
+        self.assertEqual(compute_hash.call_count, 2)
+
+        reloaded = AuditLogger(self.test_file, checkpoint_key='secret')
+        reloaded.ledger[9]['data']['approval_status'] = 'rejected'
+        self.assertFalse(reloaded.verify_integrity(incremental=True))
+
+        reloaded = AuditLogger(self.test_file, checkpoint_key='secret')
+        reloaded.ledger[5]['hash'] = reloaded.ledger[6]['hash']
+        self.assertFalse(reloaded.verify_integrity(incremental=True))
+
+        reloaded = AuditLogger(self.test_file, checkpoint_key='other')
+        self.assertFalse(reloaded.verify_integrity(incremental=True))
+
 if __name__ == '__main__':
     unittest.main()
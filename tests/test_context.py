@@ -0,0 +1,82 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import subprocess
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from app.context import AppContext, get_context, set_context
+
+SRC = os.path.join(os.path.dirname(__file__), '..', 'src')
+
+class TestAppContext(unittest.TestCase):
+    def test_services_are_built_once(self):
+        context = AppContext(audit=MagicMock(), nova=MagicMock())
+        self.assertEqual(context.initialized(), ['audit', 'nova'])
+        engine = context.engine
+        self.assertIs(context.engine, engine)
+        self.assertIs(engine.audit, context.audit)
+        self.assertIs(engine.nova, context.nova)
+        self.assertIs(engine.notifications, context.notifications)
+        self.assertIs(context.notifications.audit, context.audit)
+        self.assertEqual(context.initialized(), ['audit', 'nova', 'notifications', 'engine'])
+
+    def test_engine_reuses_one_notification_manager(self):
+        notifications = MagicMock()
+        context = AppContext(audit=MagicMock(), nova=MagicMock(), notifications=notifications)
+        engine = context.engine
+        for shipment_id in ("1", "2"):
+            engine.generate_rerouting_proposals(shipment_id, "current_route", {"score": 0.9, "explanation": ""})
+        self.assertEqual(notifications.send_rerouting_proposal.call_count, 2)
+
+    def test_engine_executor_resolved_on_first_use(self):
+        context = AppContext(audit=MagicMock(), nova=MagicMock())
+        engine = context.engine
+        self.assertNotIn('executor', context.initialized())
+        self.assertIs(engine.executor, context.executor)
+        context.executor.shutdown()
+
+    def test_provide_and_unknown_services(self):
+        context = AppContext()
+        audit = MagicMock()
+        context.provide('audit', audit)
+        self.assertIs(context.audit, audit)
+        with self.assertRaises(ValueError):
+            context.provide('database', MagicMock())
+        with self.assertRaises(ValueError):
+            AppContext(database=MagicMock())
+
+    def test_shared_audit_logger_summarizes_in_background(self):
+        with patch('audit.audit.shared_audit_logger') as shared:
+            with patch.dict(os.environ, {}, clear=True):
+                AppContext().audit
+            shared.assert_called_once_with(summary_mode='async')
+            with patch.dict(os.environ, {'AUDIT_SUMMARY_MODE': 'inline'}):
+                AppContext().audit
+            shared.assert_called_with(summary_mode='inline')
+
+    def test_set_context(self):
+        context = AppContext(audit=MagicMock())
+        previous = set_context(context)
+        try:
+            self.assertIs(get_context(), context)
+        finally:
+            set_context(previous)
+
+    def test_engine_import_and_construction_defer_heavy_work(self):
+        code = (
+            "import sys; sys.path.insert(0, {src!r})\n"
+            "from reasoning.engine import ReasoningEngine\n"
+            "from app.context import get_context\n"
+            "engine = ReasoningEngine()\n"
+            "print(sorted(m for m in ('flask', 'boto3', 'numpy', 'audit.audit', 'notifications.notifications') if m in sys.modules))\n"
+            "print(get_context().initialized())\n"
+        ).format(src=os.path.abspath(SRC))
+        output = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split('\n')
+        self.assertEqual(output[0], '[]')
+        self.assertEqual(output[1], '[]')
+
+if __name__ == '__main__':
+    unittest.main()
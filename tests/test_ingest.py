@@ -1,12 +1,20 @@
 import unittest
+import json
 from unittest.mock import patch, MagicMock
 import sys
 import os
+import shutil
+import tempfile
+import threading
+import time
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
-from ingestion.ingest import fetch_shipment_data, fetch_weather_alerts, fetch_strike_news, main
+from ingestion.ingest import fetch_shipment_data, fetch_weather_alerts, fetch_strike_news, main, fetch_all, create_session, MAX_FETCH_WORKERS
+from ingestion.conditional import FeedCache, compute_delta
+from ingestion.streaming import iter_json_records, stream_records, BoundedBuffer
+from ingestion.resilience import ResilientSession, CircuitBreaker, CircuitOpenError
 
 class TestIngestion(unittest.TestCase):
 
@@ -52,5 +60,350 @@ class TestIngestion(unittest.TestCase):
         result = fetch_strike_news("http://news.com")
         self.assertEqual(result, {"strike": "news"})
 
+def _slow_session(delay=0.1, fail=()):
+    session = MagicMock()
+    lock = threading.Lock()
+    session.active = 0
+    session.peak = 0
+    def get(url, timeout):
+        with lock:
+            session.active += 1
+            session.peak = max(session.peak, session.active)
+        time.sleep(delay)
+        with lock:
+            session.active -= 1
+        if url in fail:
+            import requests
+            raise requests.ConnectionError("unreachable")
+        response = MagicMock()
+        response.json.return_value = {"url": url}
+        return response
+    session.get.side_effect = get
+    return session
+
+class TestConcurrentIngestion(unittest.TestCase):
+    def test_feeds_are_fetched_concurrently_over_one_session(self):
+        session = _slow_session()
+        started = time.monotonic()
+        result = fetch_all({
+            "shipments": {"maersk": "http://m/shipments", "msc": "http://msc/shipments"},
+            "weather": "http://w/alerts",
+            "strikes": "http://s/strikes",
+            "ports": "http://p/status"
+        }, session=session)
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(session.peak, 5)
+        self.assertEqual(result["shipments"], {"maersk": {"url": "http://m/shipments"}, "msc": {"url": "http://msc/shipments"}})
+        self.assertEqual(result["weather"], {"url": "http://w/alerts"})
+        self.assertEqual(result["ports"], {"url": "http://p/status"})
+        session.close.assert_not_called()
+
+    @patch('ingestion.ingest.create_session')
+    def test_workers_and_pool_are_capped(self, mock_create):
+        session = _slow_session(0.05)
+        mock_create.return_value = session
+        carriers = {f"carrier{i}": f"http://c{i}/shipments" for i in range(MAX_FETCH_WORKERS + 8)}
+        result = fetch_all({"shipments": carriers})
+        mock_create.assert_called_once_with(pool_size=MAX_FETCH_WORKERS)
+        self.assertLessEqual(session.peak, MAX_FETCH_WORKERS)
+        self.assertEqual(len(result["shipments"]), MAX_FETCH_WORKERS + 8)
+        fetch_all({"weather": "http://w/alerts", "strikes": "http://s/strikes"}, max_workers=8)
+        mock_create.assert_called_with(pool_size=2)
+
+    def test_failed_feed_is_none(self):
+        result = fetch_all({"weather": "http://w/alerts", "strikes": "http://s/strikes"},
+                           session=_slow_session(0, fail={"http://s/strikes"}))
+        self.assertEqual(result, {"weather": {"url": "http://w/alerts"}, "strikes": None})
+
+    @patch('ingestion.ingest.create_session')
+    def test_main_uses_pooled_session(self, mock_create):
+        mock_create.return_value = _slow_session(0)
+        result = main(carrier_urls={"maersk": "http://m/shipments"})
+        self.assertEqual(result["shipments"], {"maersk": {"url": "http://m/shipments"}})
+        mock_create.return_value.close.assert_called_once()
+
+    def test_create_session_pool_size(self):
+        session = create_session(pool_size=32)
+        self.assertEqual(session.get_adapter("https://api.example.com")._pool_maxsize, 32)
+        session.close()
+
+class _ConditionalServer:
+    """
+    Fake HTTP endpoint honouring If-None-Match.
+    """
+    def __init__(self, payload):
+        self.payload = payload
+        self.version = 1
+        self.requests = []
+
+    def get(self, url, timeout, headers):
+        self.requests.append(dict(headers))
+        response = MagicMock()
+        etag = f'"v{self.version}"'
+        response.headers = {"ETag": etag, "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT"}
+        if headers.get("If-None-Match") == etag:
+            response.status_code = 304
+        else:
+            response.status_code = 200
+            response.json.return_value = self.payload
+        return response
+
+    def update(self, payload):
+        self.payload = payload
+        self.version += 1
+
+class TestConditionalFetch(unittest.TestCase):
+    def setUp(self):
+        self.snapshot_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.snapshot_dir, ignore_errors=True)
+
+    def test_not_modified_served_from_snapshot(self):
+        server = _ConditionalServer({"alerts": [{"id": 1, "severity": 7}]})
+        cache = FeedCache()
+        self.assertEqual(fetch_weather_alerts("http://w", session=server, cache=cache), {"alerts": [{"id": 1, "severity": 7}]})
+        self.assertEqual(cache.delta("http://w")["added"], [{"id": 1, "severity": 7}])
+        self.assertEqual(fetch_weather_alerts("http://w", session=server, cache=cache), {"alerts": [{"id": 1, "severity": 7}]})
+        self.assertEqual(server.requests[1]["If-None-Match"], '"v1"')
+        self.assertIn("If-Modified-Since", server.requests[1])
+        self.assertEqual(cache.delta("http://w"), {"added": [], "changed": [], "removed": []})
+        self.assertEqual(cache.stats(), {"requests": 2, "not_modified": 1, "modified": 1})
+
+    def test_record_level_delta_between_cycles(self):
+        server = _ConditionalServer({"shipments": [{"shipment_id": "a", "location": "x"}, {"shipment_id": "b", "location": "y"}]})
+        cache = FeedCache()
+        fetch_shipment_data("http://s", session=server, cache=cache)
+        server.update({"shipments": [{"shipment_id": "a", "location": "z"}, {"shipment_id": "c", "location": "y"}]})
+        fetch_shipment_data("http://s", session=server, cache=cache)
+        self.assertEqual(cache.delta("http://s"), {
+            "added": [{"shipment_id": "c", "location": "y"}],
+            "changed": [{"shipment_id": "a", "location": "z"}],
+            "removed": [{"shipment_id": "b", "location": "y"}]
+        })
+
+    def test_snapshots_survive_restart(self):
+        server = _ConditionalServer({"strikes": [{"impact": "high"}]})
+        FeedCache(self.snapshot_dir).get(server, "http://s", kind="strikes")
+        result = FeedCache(self.snapshot_dir).get(server, "http://s", kind="strikes")
+        self.assertFalse(result["modified"])
+        self.assertEqual(result["data"], {"strikes": [{"impact": "high"}]})
+
+    def test_fetch_all_with_cache(self):
+        server = _ConditionalServer({"alerts": []})
+        cache = FeedCache()
+        fetch_all({"weather": "http://w"}, session=server, cache=cache)
+        fetch_all({"weather": "http://w"}, session=server, cache=cache)
+        self.assertEqual(cache.stats()["not_modified"], 1)
+
+    def test_delta_without_ids_uses_content(self):
+        delta = compute_delta([{"severity": 3}], [{"severity": 3}, {"severity": 8}])
+        self.assertEqual(delta, {"added": [{"severity": 8}], "changed": [], "removed": []})
+
+def _chunks(text, size):
+    data = text.encode('utf-8')
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+class _PagedServer:
+    """
+    Fake streaming endpoint serving one JSON page per URL.
+    """
+    def __init__(self, pages, links=None):
+        self.pages = pages
+        self.links = links or {}
+        self.requests = []
+
+    def get(self, url, timeout, stream):
+        self.requests.append((url, stream))
+        response = MagicMock()
+        response.iter_content.side_effect = lambda chunk_size: iter(_chunks(self.pages[url], chunk_size))
+        response.links = {'next': {'url': self.links[url]}} if url in self.links else {}
+        return response
+
+class TestStreamingIngestion(unittest.TestCase):
+    def test_records_parsed_across_tiny_chunks(self):
+        text = '{"count": 3, "shipments": [{"shipment_id": "a", "note": "caf\u00e9 ]"}, {"shipment_id": "b", "w": -12.5e1}, {"shipment_id": "ü"}], "next": null}'
+        for size in (1, 2, 7, 1024):
+            envelope = {}
+            records = list(iter_json_records(_chunks(text, size), 'shipments', envelope))
+            self.assertEqual([r["shipment_id"] for r in records], ["a", "b", "ü"])
+            self.assertEqual(records[1]["w"], -125.0)
+            self.assertEqual(envelope, {"count": 3, "shipments": [], "next": None})
+
+    def test_top_level_array(self):
+        self.assertEqual(list(iter_json_records(_chunks('[1, 23, {"a": [1]}]', 1))), [1, 23, {"a": [1]}])
+
+    def test_numbers_split_at_any_chunk_boundary(self):
+        values = [1.5, -0.25, 10, 3e5, -1.25e-3, 6.02E+23, 0, 123456, {"w": 7.5}, [2e2, -3], "1.5", True, None]
+        text = json.dumps({"shipments": values, "next": 4.75})
+        for size in range(1, len(text) + 1):
+            envelope = {}
+            self.assertEqual(list(iter_json_records(_chunks(text, size), 'shipments', envelope)), values, size)
+            self.assertEqual(envelope["next"], 4.75)
+        compact = json.dumps(values, separators=(',', ':'))
+        for size in range(1, 12):
+            self.assertEqual(list(iter_json_records(_chunks(compact, size))), values, size)
+
+    def test_truncated_feed_raises(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_records(_chunks('{"shipments": [{"id": 1}, {"id"', 4), 'shipments'))
+
+    def test_buffer_stays_bounded(self):
+        seen = []
+        def chunks():
+            yield b'{"shipments": ['
+            for i in range(20000):
+                seen.append(i)
+                yield f'{{"shipment_id": {i}, "location": "x"}},'.encode()
+            yield b'{"shipment_id": -1}]}'
+        count = 0
+        for record in iter_json_records(chunks(), 'shipments'):
+            # Records are produced as their chunks arrive, not after the whole feed
+            if record["shipment_id"] >= 0:
+                self.assertLessEqual(len(seen), record["shipment_id"] + 2)
+            count += 1
+        self.assertEqual(count, 20001)
+
+    def test_follows_link_header_and_next_field(self):
+        server = _PagedServer({
+            "http://s?p=1": '{"shipments": [{"id": 1}, {"id": 2}]}',
+            "http://s?p=2": '{"shipments": [{"id": 3}], "next": "http://s?p=3"}',
+            "http://s?p=3": '{"shipments": [{"id": 4}], "next": null}'
+        }, links={"http://s?p=1": "http://s?p=2"})
+        records = list(stream_records("http://s?p=1", session=server, chunk_size=5))
+        self.assertEqual([r["id"] for r in records], [1, 2, 3, 4])
+        self.assertEqual([stream for _, stream in server.requests], [True, True, True])
+        self.assertEqual(len(list(stream_records("http://s?p=1", session=server, max_pages=2))), 3)
+
+    def test_bounded_buffer_applies_backpressure(self):
+        produced = []
+        def records():
+            for i in range(50):
+                produced.append(i)
+                yield {"shipment_id": i}
+        buffer = BoundedBuffer(records(), maxsize=5)
+        time.sleep(0.1)
+        # At most maxsize queued plus one waiting to be put
+        self.assertLessEqual(len(produced), 6)
+        batches = list(buffer.batches(20))
+        self.assertEqual([len(b) for b in batches], [20, 20, 10])
+        buffer.close()
+
+    def test_bounded_buffer_reraises_producer_error(self):
+        def records():
+            yield {"shipment_id": 1}
+            raise ValueError("bad feed")
+        buffer = BoundedBuffer(records(), maxsize=2)
+        with self.assertRaises(ValueError):
+            list(buffer)
+        buffer.close()
+
+class _FlakyServer:
+    """
+    Fake endpoint whose calls follow a script of delays (seconds) and failures ('fail', 503).
+    """
+    def __init__(self, script=(), payload=None):
+        self.script = list(script)
+        self.payload = payload or {"alerts": [{"severity": 7}]}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def get(self, url, timeout=10, **kwargs):
+        with self._lock:
+            step = self.script.pop(0) if self.script else 0
+            self.calls += 1
+        if step == 'fail':
+            import requests
+            raise requests.ConnectionError("down")
+        response = MagicMock()
+        response.status_code = step if isinstance(step, int) and step >= 400 else 200
+        response.json.return_value = self.payload
+        if response.status_code >= 400:
+            import requests
+            response.raise_for_status.side_effect = requests.HTTPError(f"{response.status_code}")
+        if not isinstance(step, str) and step < 400:
+            time.sleep(step)
+        return response
+
+class TestResilientSession(unittest.TestCase):
+    def test_breaker_opens_and_serves_last_good_snapshot(self):
+        server = _FlakyServer([0, 'fail', 503])
+        session = ResilientSession(server, failure_threshold=2, reset_timeout=60)
+        self.assertEqual(fetch_weather_alerts("http://w", session=session), {"alerts": [{"severity": 7}]})
+        self.assertIsNone(fetch_weather_alerts("http://w", session=session))
+        self.assertIsNone(fetch_weather_alerts("http://w", session=session))
+        self.assertEqual(session.stats()["http://w"]["state"], "open")
+        # Open: answered from the snapshot without touching the endpoint
+        self.assertEqual(fetch_weather_alerts("http://w", session=session), {"alerts": [{"severity": 7}]})
+        self.assertEqual(server.calls, 3)
+        stats = session.stats()["http://w"]
+        self.assertEqual((stats["short_circuited"], stats["stale_served"], stats["failures"]), (1, 1, 2))
+
+    def test_open_breaker_without_snapshot_fails_fast(self):
+        server = _FlakyServer(['fail'])
+        session = ResilientSession(server, failure_threshold=1)
+        self.assertIsNone(fetch_strike_news("http://s", session=session))
+        with self.assertRaises(CircuitOpenError):
+            session.get("http://s", timeout=10)
+        self.assertEqual(server.calls, 1)
+
+    def test_half_open_trial_closes_breaker(self):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+        breaker.record_failure()
+        self.assertFalse(breaker.allow())
+        time.sleep(0.06)
+        self.assertTrue(breaker.allow())
+        # Only one trial call at a time
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state, "closed")
+        self.assertTrue(breaker.allow())
+
+    def test_slow_request_is_hedged(self):
+        server = _FlakyServer([0.01] * 5 + [1.0, 0.01])
+        session = ResilientSession(server, hedge_percentile=95, hedge_min_samples=5)
+        for _ in range(5):
+            session.get("http://w", timeout=10)
+        started = time.monotonic()
+        self.assertEqual(session.get("http://w", timeout=10).json(), {"alerts": [{"severity": 7}]})
+        self.assertLess(time.monotonic() - started, 0.5)
+        stats = session.stats()["http://w"]
+        self.assertEqual((stats["hedged"], stats["hedge_wins"]), (1, 1))
+        self.assertEqual(stats["latency"]["samples"], 6)
+        self.assertLess(stats["latency"]["p50"], 0.5)
+        session.close()
+
+    def test_in_flight_hedges_are_capped(self):
+        server = _FlakyServer()
+        delays = {'primary': 0.01, 'hedge': 0.01}
+        def get(url, timeout=10, **kwargs):
+            role = 'hedge' if threading.current_thread().name.startswith('hedge') else 'primary'
+            time.sleep(delays[role])
+            response = MagicMock()
+            response.status_code = 200
+            return response
+        server.get = get
+        session = ResilientSession(server, hedge_min_samples=3, max_hedges=1)
+        for _ in range(3):
+            session.get("http://w", timeout=10)
+        delays.update(primary=0.4, hedge=0.2)
+        threads = [threading.Thread(target=session.get, args=("http://w",), kwargs={"timeout": 10}) for _ in range(4)]
+        started = time.monotonic()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # Primaries never wait for a pool worker, so nobody takes much longer than one slow request
+        self.assertLess(time.monotonic() - started, 0.7)
+        stats = session.stats()["http://w"]
+        self.assertEqual((stats["hedged"], stats["hedges_skipped"], stats["hedge_wins"]), (1, 3, 1))
+        session.close()
+
+    def test_fetch_all_through_resilient_session(self):
+        session = ResilientSession(_FlakyServer())
+        result = fetch_all({"weather": "http://w", "strikes": "http://s"}, session=session)
+        self.assertEqual(result["weather"], {"alerts": [{"severity": 7}]})
+        self.assertEqual(sorted(session.stats()), ["http://s", "http://w"])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,160 @@
+import unittest
+from unittest.mock import MagicMock
+import sys
+import os
+import threading
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from monitoring.agent import MonitoringAgent, StubFeeds
+from reasoning.engine import ReasoningEngine
+
+class _Feeds:
+    """
+    Fixed feed payloads that tests can edit between polls.
+    """
+    def __init__(self, shipments, weather=None, strikes=None):
+        self.data = {
+            'shipments': {'shipments': shipments},
+            'weather': weather or {'alerts': []},
+            'strikes': strikes or {'strikes': []}
+        }
+
+    def __call__(self):
+        return {name: dict(payload) for name, payload in self.data.items()}
+
+def _engine():
+    return ReasoningEngine(risk_mode='tiered', audit=MagicMock(), nova=MagicMock(), notifications=MagicMock())
+
+class TestMonitoringAgent(unittest.TestCase):
+    def test_pipeline_evaluates_proposes_and_notifies(self):
+        engine = _engine()
+        feeds = _Feeds([{'shipment_id': 'a', 'location': 'risky_area1'}, {'shipment_id': 'b', 'location': 'SHA'}],
+                       weather={'alerts': [{'severity': 8}]}, strikes={'strikes': [{'impact': 'high'}]})
+        agent = MonitoringAgent(feeds, engine=engine)
+        for stage in agent.stages:
+            stage.start()
+        self.assertEqual(agent.poll_once(), 2)
+        agent.stop()
+        self.assertEqual(agent.results['a']['score'], 1.0)
+        self.assertEqual(engine.notifications.send_rerouting_proposal.call_count, 2)
+        self.assertEqual(engine.audit.log_decisions.call_count, 2)
+        self.assertEqual(agent.stats()['stages']['notify']['processed'], 2)
+
+    def test_only_changed_shipments_are_requeued(self):
+        feeds = _Feeds([{'shipment_id': 'a', 'location': 'SHA'}, {'shipment_id': 'b', 'location': 'SIN'}])
+        agent = MonitoringAgent(feeds, engine=_engine())
+        for stage in agent.stages:
+            stage.start()
+        self.assertEqual(agent.poll_once(), 2)
+        self.assertEqual(agent.poll_once(), 0)
+        feeds.data['shipments'] = {'shipments': [{'shipment_id': 'a', 'location': 'RTM'}]}
+        self.assertEqual(agent.poll_once(), 1)
+        feeds.data['weather'] = {'alerts': [{'severity': 9}]}
+        self.assertEqual(agent.poll_once(), 1)
+        agent.stop()
+        self.assertNotIn('b', agent.results)
+        self.assertEqual(agent.results['a']['score'], 0.3)
+
+    def test_regional_signals_requeue_only_nearby_shipments(self):
+        feeds = _Feeds([{'shipment_id': 'a', 'location': 'SHA'}, {'shipment_id': 'b', 'location': 'SIN', 'route': ['RTM']}])
+        agent = MonitoringAgent(feeds, engine=_engine())
+        for stage in agent.stages:
+            stage.start()
+        self.assertEqual(agent.poll_once(), 2)
+        feeds.data['weather'] = {'alerts': [{'id': 'w1', 'severity': 9, 'region': 'RTM'}]}
+        self.assertEqual(agent.poll_once(), 1)
+        feeds.data['weather'] = {'alerts': [{'id': 'w1', 'severity': 9, 'region': 'LAX'}]}
+        # Moving off b's route re-scores b alone; nothing sits at LAX
+        self.assertEqual(agent.poll_once(), 1)
+        feeds.data['weather'] = {'alerts': [{'id': 'w1', 'severity': 9, 'region': 'SHA'}]}
+        self.assertEqual(agent.poll_once(), 1)
+        agent.stop()
+        self.assertEqual(agent.results['a']['score'], 0.3)
+        self.assertEqual(agent.results['b']['score'], 0.0)
+
+    def test_stale_result_does_not_replace_newer_one(self):
+        engine = _engine()
+        release = threading.Event()
+        evaluate = engine.evaluate_shipment
+        def evaluate_shipment(shipment, signal_index, at=None):
+            if shipment['location'] == 'SHA':
+                release.wait(5)
+            return evaluate(shipment, signal_index, at)
+        engine.evaluate_shipment = evaluate_shipment
+        feeds = _Feeds([{'shipment_id': 'a', 'location': 'SHA'}])
+        agent = MonitoringAgent(feeds, engine=engine, workers={'risk': 2})
+        for stage in agent.stages:
+            stage.start()
+        agent.poll_once()
+        feeds.data['shipments'] = {'shipments': [{'shipment_id': 'a', 'location': 'risky_area1'}]}
+        agent.poll_once()
+        deadline = time.monotonic() + 5
+        while 'a' not in agent.results and time.monotonic() < deadline:
+            time.sleep(0.01)
+        # The first cycle's evaluation finishes last
+        release.set()
+        agent.stop()
+        self.assertEqual(agent.results['a']['score'], 0.3)
+        self.assertEqual(agent.stats()['stale_results'], 1)
+
+    def test_poll_interval_adapts_to_change(self):
+        feeds = _Feeds([{'shipment_id': 'a', 'location': 'SHA'}])
+        agent = MonitoringAgent(feeds, engine=_engine(), min_interval=1.0, max_interval=4.0, backoff=2.0)
+        for stage in agent.stages:
+            stage.start()
+        intervals = []
+        for _ in range(4):
+            agent.poll_once()
+            intervals.append(agent.interval)
+        feeds.data['shipments'] = {'shipments': [{'shipment_id': 'a', 'location': 'SIN'}]}
+        agent.poll_once()
+        intervals.append(agent.interval)
+        agent.stop()
+        self.assertEqual(intervals, [1.0, 2.0, 4.0, 4.0, 2.0])
+
+    def test_bounded_queue_backpressure(self):
+        engine = _engine()
+        depths = []
+        evaluate = engine.evaluate_risk
+        def slow_evaluate(*args):
+            depths.append(agent.risk_stage.queue.qsize())
+            time.sleep(0.01)
+            return evaluate(*args)
+        engine.evaluate_risk = slow_evaluate
+        agent = MonitoringAgent(_Feeds([{'shipment_id': str(i)} for i in range(20)]), engine=engine,
+                                workers={'risk': 1}, queue_size=2)
+        for stage in agent.stages:
+            stage.start()
+        started = time.monotonic()
+        agent.poll_once()
+        # Ingestion waited for the risk stage instead of queueing all 20 shipments
+        self.assertGreaterEqual(time.monotonic() - started, 0.15)
+        agent.stop()
+        self.assertLessEqual(max(depths), 2)
+        self.assertEqual(len(agent.results), 20)
+
+    def test_stage_errors_are_counted(self):
+        engine = _engine()
+        engine.evaluate_risk = MagicMock(side_effect=RuntimeError("boom"))
+        agent = MonitoringAgent(_Feeds([{'shipment_id': 'a'}]), engine=engine)
+        for stage in agent.stages:
+            stage.start()
+        agent.poll_once()
+        agent.stop()
+        self.assertEqual(agent.stats()['stages']['risk'], {'processed': 0, 'errors': 1, 'queued': 0})
+
+    def test_runs_against_stub_feeds_and_stops_gracefully(self):
+        engine = _engine()
+        with MonitoringAgent(StubFeeds(shipments=10, seed=1), engine=engine, min_interval=0.01, max_interval=0.05) as agent:
+            time.sleep(0.2)
+        stats = agent.stats()
+        self.assertGreater(stats['cycles'], 1)
+        self.assertEqual(stats['stages']['risk']['processed'], stats['enqueued'])
+        self.assertEqual(len(agent.results), 10)
+        self.assertFalse([t for t in threading.enumerate() if t.name.startswith(('risk-', 'monitor-'))])
+
+if __name__ == '__main__':
+    unittest.main()
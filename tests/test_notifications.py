@@ -47,7 +47,7 @@ class TestNotificationManager(unittest.TestCase):
             manager.send_rerouting_proposal("123", proposals)
             mock_logger.warning.assert_called_with("Slack webhook URL not set, skipping notification")
 
-    @patch('notifications.notifications.AuditLogger')
+    @patch('notifications.notifications.shared_audit_logger')
     def test_handle_approval_approve(self, mock_audit_class):
         mock_audit = MagicMock()
         mock_audit_class.return_value = mock_audit
@@ -58,7 +58,7 @@ class TestNotificationManager(unittest.TestCase):
 
         mock_audit.log_decision.assert_called_with("123", "Route A", "approved", {"source": "slack"})
 
-    @patch('notifications.notifications.AuditLogger')
+    @patch('notifications.notifications.shared_audit_logger')
     def test_handle_approval_reject(self, mock_audit_class):
         mock_audit = MagicMock()
         mock_audit_class.return_value = mock_audit
@@ -0,0 +1,262 @@
+import unittest
+from unittest.mock import patch, MagicMock
+import asyncio
+import io
+import json
+import shutil
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from nova.client import NovaClient, ResponseCache
+from nova.executor import NovaExecutor, TokenBucket, is_throttle
+from nova.prompts import (TOKEN_BUDGETS, audit_summary_prompt, compact, estimate_tokens,
+                          proposal_summary_prompt, relevant_signals, risk_prompt)
+
+def _bedrock_client(text="Low risk"):
+    client = MagicMock()
+    client.meta.region_name = "us-east-1"
+    client.invoke_model.side_effect = lambda **kwargs: {
+        'body': io.BytesIO(json.dumps({'outputText': text, 'stopReason': 'FINISH',
+                                       'usage': {'inputTokens': 120, 'outputTokens': 40}}).encode())
+    }
+    return client
+
+class TestResponseCache(unittest.TestCase):
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    def test_key_depends_on_model_prompt_and_parameters(self):
+        key = ResponseCache.make_key("amazon.nova-pro", "prompt", {"temperature": 0.7})
+        self.assertEqual(key, ResponseCache.make_key("amazon.nova-pro", "prompt", {"temperature": 0.7}))
+        self.assertNotEqual(key, ResponseCache.make_key("amazon.nova-lite", "prompt", {"temperature": 0.7}))
+        self.assertNotEqual(key, ResponseCache.make_key("amazon.nova-pro", "other", {"temperature": 0.7}))
+        self.assertNotEqual(key, ResponseCache.make_key("amazon.nova-pro", "prompt", {"temperature": 0.2}))
+
+    def test_memory_lru_eviction(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put('a', {'outputText': 'A'})
+        cache.put('b', {'outputText': 'B'})
+        cache.get('a')
+        cache.put('c', {'outputText': 'C'})
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), {'outputText': 'A'})
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_disk_tier_survives_restart(self):
+        ResponseCache(cache_dir=self.cache_dir).put('a', {'outputText': 'A'})
+        cache = ResponseCache(cache_dir=self.cache_dir)
+        self.assertEqual(cache.get('a'), {'outputText': 'A'})
+        self.assertEqual(cache.stats()['disk_hits'], 1)
+
+    def test_expired_entries_are_dropped(self):
+        cache = ResponseCache(cache_dir=self.cache_dir, ttl=60)
+        with patch('nova.client.time.time', return_value=1000):
+            cache.put('a', {'outputText': 'A'})
+        with patch('nova.client.time.time', return_value=1100):
+            self.assertIsNone(cache.get('a'))
+        self.assertEqual(os.listdir(self.cache_dir), [])
+        self.assertEqual(cache.stats()['disk_bytes'], 0)
+
+    def test_disk_size_limit(self):
+        cache = ResponseCache(cache_dir=self.cache_dir, max_disk_bytes=200)
+        for i in range(10):
+            cache.put(str(i), {'outputText': 'x' * 50})
+        self.assertLessEqual(cache.stats()['disk_bytes'], 200)
+        self.assertLess(len(os.listdir(self.cache_dir)), 10)
+
+class TestNovaClient(unittest.TestCase):
+    def test_identical_prompt_served_from_cache(self):
+        bedrock = _bedrock_client()
+        nova = NovaClient(client=bedrock)
+        first = nova.invoke("Assess risk")
+        second = nova.invoke("Assess risk")
+        self.assertEqual(bedrock.invoke_model.call_count, 1)
+        self.assertEqual(first['outputText'], "Low risk")
+        self.assertNotIn('cached', first)
+        self.assertTrue(second['cached'])
+        stats = nova.stats()
+        self.assertEqual(stats['hits'], 1)
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_different_parameters_are_not_shared(self):
+        bedrock = _bedrock_client()
+        nova = NovaClient(client=bedrock)
+        nova.invoke("Assess risk", temperature=0.7)
+        nova.invoke("Assess risk", temperature=0.1)
+        self.assertEqual(bedrock.invoke_model.call_count, 2)
+
+    def test_bypass_cache(self):
+        bedrock = _bedrock_client()
+        nova = NovaClient(client=bedrock)
+        nova.invoke("Assess risk", use_cache=False)
+        nova.invoke("Assess risk", use_cache=False)
+        self.assertEqual(bedrock.invoke_model.call_count, 2)
+
+    def test_failures_are_not_cached(self):
+        bedrock = _bedrock_client()
+        bedrock.invoke_model.side_effect = Exception("ThrottlingException")
+        nova = NovaClient(client=bedrock)
+        self.assertIsNone(nova.invoke("Assess risk"))
+        self.assertIsNone(nova.invoke("Assess risk"))
+        self.assertEqual(bedrock.invoke_model.call_count, 2)
+        self.assertEqual(nova.stats()['memory_entries'], 0)
+
+    def test_usage_recorded_per_call_type(self):
+        nova = NovaClient(client=_bedrock_client())
+        nova.invoke("Assess risk", call_type='risk')
+        nova.invoke("Assess risk", call_type='risk')
+        nova.invoke("Other risk", call_type='risk')
+        nova.invoke("Summarize", call_type='audit_summary')
+        usage = nova.usage_stats()
+        # The cache hit costs no tokens
+        self.assertEqual(usage['risk']['calls'], 2)
+        self.assertEqual(usage['risk']['input_tokens'], 240)
+        self.assertEqual(usage['risk']['avg_input_tokens'], 120)
+        self.assertEqual(usage['audit_summary']['output_tokens'], 40)
+
+    def test_botocore_retries_disabled(self):
+        with patch('boto3.client') as create:
+            NovaClient(max_pool_connections=4).client
+        config = create.call_args.kwargs['config']
+        self.assertEqual(config.retries, {'max_attempts': 1, 'mode': 'standard'})
+        self.assertEqual(config.max_pool_connections, 4)
+
+class TestPrompts(unittest.TestCase):
+    def test_relevant_signals_filtered_and_ranked(self):
+        shipment = {"location": "rotterdam", "route": ["hamburg"]}
+        weather = {"alerts": [{"severity": 3, "region": "rotterdam"}, {"severity": 9, "region": "singapore"},
+                              {"severity": 7, "id": "x", "raw": "a" * 500}]}
+        strikes = {"strikes": [{"impact": "high", "region": "hamburg", "description": "Port strike"}]}
+        signals = relevant_signals(shipment, weather, strikes)
+        self.assertEqual(signals, [
+            {"impact": "high", "region": "hamburg", "description": "Port strike", "kind": "strike"},
+            {"severity": 7, "kind": "weather"},
+            {"severity": 3, "region": "rotterdam", "kind": "weather"}
+        ])
+
+    def test_relevant_signals_match_signal_index(self):
+        shipment = {"location": "madrid", "route": [{"lat": 51.95, "lon": 4.2}]}
+        weather = {"alerts": [{"severity": 8, "lat": 51.9, "lon": 4.3, "radius_km": 30},
+                              {"severity": 9, "lat": 1.3, "lon": 103.8, "radius_km": 30},
+                              {"severity": 6, "region": "madrid", "valid_until": 50}]}
+        self.assertEqual(relevant_signals(shipment, weather, None, at=100), [{"severity": 8, "kind": "weather"}])
+        self.assertEqual([s["severity"] for s in relevant_signals(shipment, weather, None, at=10)], [8, 6])
+        prompt = risk_prompt(shipment, weather, None, at=100)
+        self.assertIn('"severity":8', prompt)
+        self.assertNotIn('"severity":9', prompt)
+
+    def test_large_feed_stays_within_budget(self):
+        weather = {"alerts": [{"severity": i % 10, "description": f"Alert {i}"} for i in range(10000)]}
+        prompt = risk_prompt({"location": "{rotterdam}"}, weather, {"strikes": [{"impact": "high"}]})
+        self.assertLessEqual(estimate_tokens(prompt), TOKEN_BUDGETS['risk'])
+        self.assertIn("more omitted", prompt)
+        self.assertIn('"impact":"high"', prompt)
+        self.assertIn("{rotterdam}", prompt)
+        self.assertIn("Provide a risk score from 0 to 1", prompt)
+
+    def test_proposal_and_audit_prompts_are_compact(self):
+        proposals = [{"route": "Route A", "cost": 1.1000001, "time": 1.05, "compliance": 0.9, "score": 1.23456, "path": ["A", "B"]}]
+        prompt = proposal_summary_prompt("123", proposals, "Storm")
+        self.assertIn('[{"route":"Route A","cost":1.1,"time":1.05,"compliance":0.9,"score":1.235}]', prompt)
+        data = {"shipment_id": "123", "approval_status": "proposed", "previous_hash": "f" * 64,
+                "reasoning_trace": {"risk_explanation": "x" * 5000, "note": None}}
+        prompt = audit_summary_prompt(data, budget=100)
+        self.assertNotIn("previous_hash", prompt)
+        self.assertNotIn("note", prompt)
+        self.assertLessEqual(len(prompt), 400)
+        self.assertEqual(compact({"a": [], "b": 1}), '{"b":1}')
+
+class ThrottlingException(Exception):
+    pass
+
+class TestNovaExecutor(unittest.TestCase):
+    def setUp(self):
+        self.nova = MagicMock()
+        self.executor = NovaExecutor(self.nova, max_concurrency=4, base_delay=0.001, max_delay=0.01)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_throttled_calls_are_retried(self):
+        self.nova.invoke.side_effect = [ThrottlingException(), ThrottlingException(), {'outputText': 'ok'}]
+        result = self.executor.submit("Assess risk").result()
+        self.assertEqual(result, {'outputText': 'ok'})
+        self.assertEqual(self.nova.invoke.call_count, 3)
+        self.nova.invoke.assert_called_with("Assess risk", raise_errors=True)
+        stats = self.executor.stats()
+        self.assertEqual(stats['throttled'], 2)
+        self.assertEqual(stats['retries'], 2)
+        self.assertEqual(stats['completed'], 1)
+
+    def test_gives_up_after_max_retries(self):
+        self.nova.invoke.side_effect = ThrottlingException()
+        self.assertIsNone(self.executor.submit("Assess risk").result())
+        self.assertEqual(self.nova.invoke.call_count, self.executor.max_retries + 1)
+        self.assertEqual(self.executor.stats()['failed'], 1)
+
+    def test_other_errors_are_not_retried(self):
+        self.nova.invoke.side_effect = ValueError("bad request")
+        self.assertIsNone(self.executor.submit("Assess risk").result())
+        self.assertEqual(self.nova.invoke.call_count, 1)
+
+    def test_throttle_detection_by_error_code(self):
+        error = Exception()
+        error.response = {'Error': {'Code': 'ThrottlingException'}}
+        self.assertTrue(is_throttle(error))
+        self.assertFalse(is_throttle(ValueError()))
+
+    def test_errors_without_response_are_failures(self):
+        from botocore.exceptions import ReadTimeoutError
+        self.assertFalse(is_throttle(ReadTimeoutError(endpoint_url="https://bedrock")))
+        error = Exception()
+        error.response = {'Error': None}
+        self.assertFalse(is_throttle(error))
+        self.nova.invoke.side_effect = ReadTimeoutError(endpoint_url="https://bedrock")
+        self.assertIsNone(self.executor.submit("Assess risk").result())
+        self.assertEqual(self.executor.stats()['failed'], 1)
+
+    def test_concurrency_limit(self):
+        active = []
+        peak = []
+        lock = threading.Lock()
+        def slow_invoke(prompt, **kwargs):
+            with lock:
+                active.append(prompt)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.remove(prompt)
+            return {'outputText': prompt}
+        self.nova.invoke.side_effect = slow_invoke
+        results = self.executor.map([str(i) for i in range(12)])
+        self.assertEqual([r['outputText'] for r in results], [str(i) for i in range(12)])
+        self.assertLessEqual(max(peak), 4)
+        self.assertGreater(max(peak), 1)
+
+    def test_invoke_async(self):
+        self.nova.invoke.return_value = {'outputText': 'ok'}
+        async def run():
+            return await asyncio.gather(*(self.executor.invoke_async(p) for p in ("a", "b")))
+        self.assertEqual(asyncio.run(run()), [{'outputText': 'ok'}, {'outputText': 'ok'}])
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_paced(self):
+        bucket = TokenBucket(rate=50, capacity=2)
+        started = time.monotonic()
+        for _ in range(4):
+            bucket.acquire()
+        # Two tokens from the burst, two more at 50/s
+        self.assertGreaterEqual(time.monotonic() - started, 0.03)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+from unittest.mock import MagicMock
+import os
+import sys
+import tempfile
+import threading
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from app.outbox import Outbox, PROPOSALS_GENERATED, proposal_consumers
+from audit.audit import AuditLogger
+from reasoning.engine import ReasoningEngine
+
+class TestOutbox(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmpdir.name, 'outbox.jsonl')
+        self.outboxes = []
+
+    def tearDown(self):
+        for outbox in self.outboxes:
+            outbox.close(wait=False)
+        self.tmpdir.cleanup()
+
+    def _outbox(self, **options):
+        options.setdefault('base_delay', 0.001)
+        outbox = Outbox(self.path, **options)
+        self.outboxes.append(outbox)
+        return outbox
+
+    def test_every_consumer_receives_each_event(self):
+        outbox = self._outbox()
+        received = {'a': [], 'b': []}
+        outbox.subscribe('a', lambda event: received['a'].append(event['payload']))
+        outbox.subscribe('b', lambda event: received['b'].append(event['payload']))
+        outbox.publish('ping', {'n': 1})
+        outbox.publish('ping', {'n': 2})
+        self.assertTrue(outbox.wait(timeout=5))
+        self.assertEqual(received, {'a': [{'n': 1}, {'n': 2}], 'b': [{'n': 1}, {'n': 2}]})
+        self.assertEqual(outbox.stats()['delivered'], 4)
+        self.assertEqual(outbox.pending(), [])
+
+    def test_failures_are_retried_then_dead_lettered(self):
+        outbox = self._outbox(max_attempts=3)
+        calls = []
+        def flaky(event):
+            calls.append(event['id'])
+            if len(calls) < 2:
+                raise RuntimeError("Slack unavailable")
+        outbox.subscribe('flaky', flaky)
+        outbox.subscribe('broken', MagicMock(side_effect=RuntimeError("down")))
+        outbox.publish('ping', {})
+        self.assertTrue(outbox.wait(timeout=5))
+        self.assertEqual(len(calls), 2)
+        stats = outbox.stats()
+        self.assertEqual(stats['dead'], 1)
+        self.assertEqual(stats['retried'], 3)
+        self.assertEqual(outbox.pending(), [])
+
+    def test_unacknowledged_events_are_redelivered_after_restart(self):
+        blocked = threading.Event()
+        first = self._outbox()
+        first.subscribe('slow', lambda event: blocked.wait())
+        event_id = first.publish('ping', {'n': 1})
+        self.assertEqual([event['id'] for event in first.pending()], [event_id])
+
+        received = []
+        second = self._outbox()
+        second.subscribe('slow', lambda event: received.append(event['id']))
+        self.assertTrue(second.wait(timeout=5))
+        self.assertEqual(received, [event_id])
+        blocked.set()
+
+    def test_compact_drops_finished_events(self):
+        outbox = self._outbox()
+        outbox.subscribe('a', lambda event: None)
+        outbox.publish('ping', {})
+        outbox.wait(timeout=5)
+        self.assertEqual(outbox.compact(), 0)
+        self.assertEqual(os.path.getsize(self.path), 0)
+
+    def test_log_compacted_automatically(self):
+        outbox = self._outbox(compact_bytes=512)
+        outbox.subscribe('a', lambda event: None)
+        for i in range(20):
+            outbox.publish('ping', {'n': i})
+            self.assertTrue(outbox.wait(timeout=5))
+        self.assertGreater(outbox.stats()['compactions'], 0)
+        self.assertLess(os.path.getsize(self.path), 1024)
+        self.assertEqual(outbox.pending(), [])
+
+    def test_engine_publishes_one_event(self):
+        audit = MagicMock()
+        notifications = MagicMock()
+        notifications.send_rerouting_proposal.side_effect = [False, True]
+        outbox = self._outbox()
+        for name, handler in proposal_consumers(audit, notifications).items():
+            outbox.subscribe(name, handler)
+        engine = ReasoningEngine(audit=audit, nova=MagicMock(), notifications=notifications, outbox=outbox)
+        proposals = engine.generate_rerouting_proposals("123", "current_route", {"score": 0.9, "explanation": "Storm"})
+        self.assertEqual(len(proposals), 3)
+        self.assertTrue(outbox.wait(timeout=5))
+        audit.log_decisions.assert_called_once()
+        entries = audit.log_decisions.call_args[0][0]
+        self.assertIsNotNone(audit.log_decisions.call_args[1]['event_id'])
+        self.assertEqual([e['rerouting_option'] for e in entries], [p['route'] for p in proposals])
+        self.assertEqual(entries[0]['reasoning_trace']['risk_explanation'], "Storm")
+        # Slack failed once and was retried
+        self.assertEqual(notifications.send_rerouting_proposal.call_count, 2)
+        self.assertEqual(outbox.stats()['published'], 1)
+        engine.executor.shutdown()
+
+    def test_redelivered_event_is_not_logged_twice(self):
+        nova = MagicMock()
+        nova.invoke.return_value = None
+        ledger = os.path.join(self.tmpdir.name, 'audit_ledger.json')
+        audit = AuditLogger(ledger, nova=nova)
+        event = {'id': 'evt-1', 'type': PROPOSALS_GENERATED, 'payload': {
+            'shipment_id': '123', 'explanation': 'Storm',
+            'proposals': [{'route': r, 'score': 1.0, 'cost': 1.0, 'time': 1.0, 'compliance': 1.0} for r in ('A', 'B')]}}
+        proposal_consumers(audit, MagicMock())['audit'](event)
+        # Redelivered to the same process, then again after a restart
+        proposal_consumers(audit, MagicMock())['audit'](event)
+        restarted = AuditLogger(ledger, nova=nova)
+        proposal_consumers(restarted, MagicMock())['audit'](event)
+        self.assertEqual(len(restarted.ledger), 2)
+        self.assertEqual({e['data']['reasoning_trace']['event_id'] for e in restarted.get_logs('123')}, {'evt-1'})
+
+    def test_concurrent_redeliveries_log_once(self):
+        ledger = os.path.join(self.tmpdir.name, 'audit_ledger.json')
+        nova = MagicMock()
+        nova.invoke.return_value = None
+        writers = [AuditLogger(ledger, nova=nova) for _ in range(4)]
+        batch = [{'shipment_id': '123', 'rerouting_option': r, 'approval_status': 'proposed'} for r in ('A', 'B')]
+        # Every writer passes the in-memory check before any of them commits
+        threads = [threading.Thread(target=writer.log_decisions, args=(batch,), kwargs={'event_id': 'evt-1'})
+                   for writer in writers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(AuditLogger(ledger).ledger), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,4 +1,7 @@
 import unittest
+from unittest.mock import MagicMock
+import itertools
+import numpy as np
 import sys
 import os
 
@@ -6,6 +9,11 @@ import os
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from reasoning.engine import ReasoningEngine
+from reasoning.batch import rule_features, score_fleet
+from reasoning.signals import SignalIndex
+from reasoning.routes import RouteGraph
+from reasoning.incremental import IncrementalEvaluator
+from reasoning.scenarios import sweep, top_k, weight_grid
 
 class TestReasoning(unittest.TestCase):
 
@@ -45,5 +53,247 @@ class TestReasoning(unittest.TestCase):
         self.assertEqual(engine.time_weight, 0.3)
         self.assertEqual(engine.compliance_weight, 0.2)
 
+    def test_evaluate_risks_batch(self):
+        nova = MagicMock()
+        nova.invoke.side_effect = lambda prompt, **kwargs: (
+            {'outputText': 'Risk score: 0.8. Explanation: Port strike'} if 'risky_area1' in prompt else None
+        )
+        engine = ReasoningEngine(audit=MagicMock(), nova=nova)
+        results = engine.evaluate_risks([
+            ({"location": "risky_area1"}, {"alerts": []}, {"strikes": []}),
+            ({"location": "safe_area"}, {"alerts": [{"severity": 7}]}, {"strikes": []})
+        ])
+        self.assertEqual(results[0], {'score': 0.8, 'explanation': 'Port strike', 'tier': 'nova'})
+        self.assertEqual(results[1], {'score': 0.3, 'explanation': 'High weather risk detected. ', 'tier': 'fallback'})
+        engine.executor.shutdown()
+
+    def test_tiered_risk_skips_nova_for_clear_cases(self):
+        nova = MagicMock()
+        nova.invoke.return_value = {'outputText': 'Risk score: 0.6. Explanation: Possible delay'}
+        engine = ReasoningEngine(audit=MagicMock(), nova=nova, risk_mode='tiered', uncertainty_band=(0.2, 0.8))
+
+        calm = engine.evaluate_risk({"location": "safe_area"}, {"alerts": []}, {"strikes": []})
+        severe = engine.evaluate_risk({"location": "risky_area1"}, {"alerts": [{"severity": 7}]}, {"strikes": [{"impact": "high"}]})
+        ambiguous = engine.evaluate_risk({"location": "safe_area"}, {"alerts": []}, {"strikes": [{"impact": "high"}]})
+
+        self.assertEqual((calm['score'], calm['tier']), (0.0, 'rules'))
+        self.assertEqual((severe['score'], severe['tier']), (1.0, 'rules'))
+        self.assertEqual((ambiguous['score'], ambiguous['tier']), (0.6, 'nova'))
+        nova.invoke.assert_called_once()
+        stats = engine.risk_stats()
+        self.assertEqual(stats['total'], 3)
+        self.assertAlmostEqual(stats['skip_rate'], 2 / 3)
+        engine.executor.shutdown()
+
+    def test_unknown_risk_mode(self):
+        with self.assertRaises(ValueError):
+            ReasoningEngine(audit=MagicMock(), nova=MagicMock(), risk_mode='sometimes')
+
+class TestFleetScoring(unittest.TestCase):
+    def setUp(self):
+        self.engine = ReasoningEngine(audit=MagicMock(), nova=MagicMock())
+
+    def tearDown(self):
+        self.engine.executor.shutdown()
+
+    def test_matches_single_shipment_rules(self):
+        weathers = [None, {"alerts": []}, {"alerts": [{"severity": 3}]}, {"alerts": [{"severity": 3}, {"severity": 7}]}]
+        strikes = [None, {"strikes": [{"impact": "low"}]}, {"strikes": [{"impact": "high"}]}]
+        locations = [{"location": "safe_area"}, {"location": "risky_area2"}, {}]
+        cases = list(itertools.product(locations, weathers, strikes))
+        results = score_fleet([c[0] for c in cases], [c[1] for c in cases], [c[2] for c in cases], threshold=0.0)
+        for case, result in zip(cases, results):
+            score, explanation = self.engine._rule_based_risk(*case)
+            self.assertAlmostEqual(result['score'], score)
+            self.assertEqual(result['explanation'], explanation)
+
+    def test_shared_signals_and_threshold(self):
+        shipments = [{"location": "risky_area1"}, {"location": "safe_area"}]
+        results = self.engine.score_fleet(shipments, {"alerts": [{"severity": 7}]}, {"strikes": []})
+        self.assertEqual(results[0], {'score': 0.6, 'explanation': 'High weather risk detected. Shipment in risky area. '})
+        # Below the threshold the explanation is not built
+        self.assertEqual(results[1], {'score': 0.3, 'explanation': ''})
+
+    def test_feature_matrix(self):
+        features = rule_features([{"location": "risky_area1"}, {}], [{"alerts": []}, {"alerts": [{"severity": 9}]}], None)
+        self.assertEqual(features.tolist(), [[False, False, True], [True, False, False]])
+        self.assertEqual(score_fleet([], None, None), [])
+
+class TestSignalIndex(unittest.TestCase):
+    def setUp(self):
+        weather = {"alerts": [
+            {"severity": 8, "lat": 51.9, "lon": 4.1, "radius_km": 30},
+            {"severity": 9, "region": "hamburg", "valid_from": 1000, "valid_until": 2000},
+            {"severity": 7, "region": "antwerp", "valid_until": "1970-01-01T00:00:50Z"}
+        ]}
+        strikes = {"strikes": [{"impact": "high", "region": "felixstowe"}, {"impact": "low"}]}
+        self.index = SignalIndex.build(weather, strikes, now=100)
+
+    def test_lookup_by_point_region_and_route(self):
+        weather, strikes = self.index.lookup({"lat": 51.95, "lon": 4.2}, at=100)
+        self.assertEqual([a["severity"] for a in weather["alerts"]], [8])
+        self.assertEqual([s["impact"] for s in strikes["strikes"]], ["low"])
+
+        weather, strikes = self.index.lookup({"location": "madrid", "route": ["felixstowe", {"lat": 40.0, "lon": -3.0}]}, at=100)
+        self.assertEqual(weather["alerts"], [])
+        self.assertEqual(sorted(s["impact"] for s in strikes["strikes"]), ["high", "low"])
+
+    def test_validity_windows(self):
+        self.assertEqual(self.index.lookup({"location": "hamburg"}, at=500)[0]["alerts"], [])
+        self.assertEqual(len(self.index.lookup({"location": "hamburg"}, at=1500)[0]["alerts"]), 1)
+        # Expired before the index was built
+        self.assertNotIn("antwerp", self.index.regions)
+
+    def test_engine_uses_only_nearby_signals(self):
+        engine = ReasoningEngine(audit=MagicMock(), nova=MagicMock(), risky_locations=["felixstowe"])
+        results = engine.score_fleet([{"location": "felixstowe"}, {"lat": 51.95, "lon": 4.2}, {"location": "madrid"}],
+                                     signal_index=self.index, at=100, threshold=0.0)
+        self.assertEqual([r["score"] for r in results], [0.7, 0.3, 0.0])
+        nova = engine.nova
+        nova.invoke.return_value = None
+        risk = engine.evaluate_shipment({"location": "madrid"}, self.index, at=100)
+        self.assertEqual(risk["score"], 0.0)
+        engine.executor.shutdown()
+
+NETWORK = {
+    "hubs": [{"name": "SIN", "region": "singapore"}],
+    "lanes": [
+        {"from": "SHA", "to": "RTM", "cost": 10, "time": 30, "compliance": 1.0},
+        {"from": "SHA", "to": "SIN", "cost": 3, "time": 5, "compliance": 0.95},
+        {"from": "SIN", "to": "RTM", "cost": 8, "time": 22, "compliance": 0.9},
+        {"from": "SIN", "to": "ANR", "cost": 7, "time": 24, "compliance": 1.0},
+        {"from": "ANR", "to": "RTM", "cost": 1, "time": 1, "compliance": 1.0},
+        {"from": "SHA", "to": "HAM", "cost": 12, "time": 28, "compliance": 0.8},
+        {"from": "HAM", "to": "RTM", "cost": 1, "time": 1, "compliance": 0.9}
+    ]
+}
+
+class TestRouteGraph(unittest.TestCase):
+    def setUp(self):
+        self.graph = RouteGraph.from_dict(NETWORK)
+
+    def test_k_best_relative_to_current_route(self):
+        proposals = self.graph.k_best("SHA", "RTM", k=3, weights=(0.4, 0.4, 0.2), baseline=["SHA", "RTM"])
+        self.assertEqual([p["route"] for p in proposals], ["SHA -> SIN -> RTM", "SHA -> SIN -> ANR -> RTM", "SHA -> HAM -> RTM"])
+        self.assertAlmostEqual(proposals[0]["cost"], 1.1)
+        self.assertAlmostEqual(proposals[0]["time"], 22 / 30 + 5 / 30)
+        self.assertEqual(proposals[0]["compliance"], 0.9)
+        self.assertTrue(proposals[0]["pareto"])
+        # Dominated by the direct route on every objective
+        self.assertFalse(proposals[1]["pareto"])
+
+    def test_skips_disrupted_hubs_and_lanes(self):
+        proposals = self.graph.k_best("SHA", "RTM", k=3, blocked_hubs={"SIN"}, blocked_lanes={("SHA", "RTM")})
+        self.assertEqual([p["path"] for p in proposals], [["SHA", "HAM", "RTM"]])
+        self.assertEqual(self.graph.k_best("SHA", "RTM", blocked_hubs={"RTM"}), [])
+
+    def test_searches_are_cached_until_graph_changes(self):
+        self.graph.k_best("SHA", "RTM", k=2)
+        self.graph.k_best("SHA", "RTM", k=2)
+        self.assertEqual(self.graph.stats()["hits"], 1)
+        self.graph.add_lane("SHA", "ANR", 1, 1, 1.0)
+        self.assertEqual(self.graph.stats()["cached_searches"], 0)
+        self.assertEqual(self.graph.k_best("SHA", "RTM", k=1)[0]["path"], ["SHA", "ANR", "RTM"])
+
+    def test_disruptions_from_signal_index(self):
+        index = SignalIndex.build({"alerts": [{"severity": 9, "region": "singapore"}]}, {"strikes": [{"impact": "low", "region": "HAM"}]})
+        self.assertEqual(self.graph.disruptions(index), frozenset({"SIN"}))
+
+    def test_engine_proposals_from_graph(self):
+        audit = MagicMock()
+        engine = ReasoningEngine(audit=audit, nova=MagicMock(), notifications=MagicMock(), route_graph=self.graph, max_proposals=2)
+        proposals = engine.generate_rerouting_proposals("123", ["SHA", "RTM"], {"score": 0.8, "explanation": "Storm"}, disruptions={"SIN"})
+        self.assertEqual([p["route"] for p in proposals], ["SHA -> HAM -> RTM"])
+        audit.log_decisions.assert_called_once()
+        self.assertEqual(len(engine.generate_rerouting_proposals("123", "current_route", {"score": 0.8, "explanation": ""})), 3)
+        engine.executor.shutdown()
+
+class TestIncrementalEvaluator(unittest.TestCase):
+    def setUp(self):
+        self.nova = MagicMock()
+        self.nova.invoke.return_value = None
+        self.engine = ReasoningEngine(audit=MagicMock(), nova=self.nova)
+        self.evaluator = IncrementalEvaluator(self.engine)
+        self.evaluator.upsert_shipment("a", {"location": "rotterdam"})
+        self.evaluator.upsert_shipment("b", {"location": "madrid", "route": ["hamburg"]})
+        self.evaluator.upsert_shipment("c", {"lat": 40.4, "lon": -3.7})
+        self.weather = {"alerts": [{"id": "w1", "severity": 8, "region": "rotterdam"}]}
+        self.evaluator.apply_signals(self.weather, {"strikes": []}, now=100)
+        first = self.evaluator.evaluate(at=100)
+        self.assertEqual(set(first["updated"]), {"a", "b", "c"})
+        self.nova.invoke.reset_mock()
+
+    def tearDown(self):
+        self.engine.executor.shutdown()
+
+    def test_only_affected_shipments_are_rescored(self):
+        self.evaluator.apply_signals(self.weather, {"strikes": [{"impact": "high", "region": "hamburg"}]}, now=200)
+        result = self.evaluator.evaluate(at=200)
+        self.assertEqual(list(result["updated"]), ["b"])
+        self.assertEqual(result["updated"]["b"]["score"], 0.4)
+        self.assertEqual(sorted(result["unchanged"]), ["a", "c"])
+        self.assertEqual(self.nova.invoke.call_count, 1)
+        self.assertEqual(self.evaluator.results["a"]["score"], 0.3)
+
+    def test_updated_signal_with_same_id(self):
+        self.evaluator.apply_signals({"alerts": [{"id": "w1", "severity": 3, "region": "hamburg"}]}, None, now=200)
+        self.assertEqual(sorted(self.evaluator.evaluate(at=200)["updated"]), ["a", "b"])
+        self.assertEqual(self.evaluator.results["b"]["score"], 0.0)
+        self.assertEqual(self.evaluator.apply_signals({"alerts": [{"id": "w1", "severity": 9, "region": "hamburg"}]}, None, now=300), (1, 1))
+        result = self.evaluator.evaluate(at=300)
+        self.assertEqual(list(result["updated"]), ["b"])
+        self.assertEqual(result["updated"]["b"]["score"], 0.3)
+
+    def test_removed_signal_and_point_signals(self):
+        self.evaluator.apply_signals({"alerts": [{"id": "w2", "severity": 9, "lat": 40.5, "lon": -3.6}]}, None, now=200)
+        result = self.evaluator.evaluate(at=200)
+        self.assertEqual(sorted(result["updated"]), ["a", "c"])
+        self.assertEqual(result["updated"]["a"]["score"], 0.0)
+        self.assertEqual(result["updated"]["c"]["score"], 0.3)
+
+    def test_shipment_update_and_validity_window(self):
+        self.evaluator.upsert_shipment("c", {"location": "rotterdam"})
+        self.assertEqual(list(self.evaluator.evaluate(at=100)["updated"]), ["c"])
+        self.evaluator.apply_signals({"alerts": [{"id": "w1", "severity": 8, "region": "rotterdam", "valid_until": 500}]}, None, now=100)
+        self.evaluator.evaluate(at=100)
+        self.assertEqual(self.evaluator.evaluate(at=300)["updated"], {})
+        expired = self.evaluator.evaluate(at=600)
+        self.assertEqual(sorted(expired["updated"]), ["a", "c"])
+        self.assertEqual(expired["updated"]["a"]["score"], 0.0)
+        self.assertGreater(self.evaluator.stats()["reuse_rate"], 0)
+
+FIXED_PROPOSALS = [
+    {"route": "Alternative Route A", "cost": 1.1, "time": 1.05, "compliance": 0.9},
+    {"route": "Alternative Route B", "cost": 1.2, "time": 0.95, "compliance": 1.0},
+    {"route": "Alternative Route C", "cost": 0.9, "time": 1.2, "compliance": 0.8}
+]
+
+class TestScenarioSweep(unittest.TestCase):
+    def test_weight_grid_on_simplex(self):
+        grid = weight_grid(steps=5)
+        self.assertEqual(grid.shape, (15, 3))
+        np.testing.assert_allclose(grid.sum(axis=1), 1.0)
+
+    def test_top_k_matches_full_sort(self):
+        scores = np.random.default_rng(0).random((4, 7, 20))
+        np.testing.assert_array_equal(top_k(scores, 3), np.argsort(scores, axis=-1)[..., :3])
+
+    def test_sweep_agrees_with_engine_ranking(self):
+        engine = ReasoningEngine(audit=MagicMock(), nova=MagicMock(), notifications=MagicMock())
+        ranked = engine.generate_rerouting_proposals("1", "current", {"score": 0.9, "explanation": ""})
+        results = engine.sweep_weights([FIXED_PROPOSALS, FIXED_PROPOSALS[:1], []], weights=[[0.4, 0.4, 0.2], [1.0, 0.0, 0.0]])
+        expected = [[p["route"] for p in FIXED_PROPOSALS].index(r["route"]) for r in ranked]
+        self.assertEqual(results[0]["top_k"][0].tolist(), expected)
+        self.assertEqual(results[0]["baseline_ranking"], expected)
+        # Cost-only weights pick the cheapest route C
+        self.assertEqual(results[0]["top_k"][1, 0], 2)
+        self.assertEqual(results[0]["distinct_winners"], 2)
+        self.assertEqual(results[0]["stability"], 0.5)
+        self.assertEqual(results[0]["baseline_agreement"], 0.5)
+        self.assertEqual(results[0]["top_k_overlap"], 1.0)
+        self.assertEqual(results[1]["stability"], 1.0)
+        self.assertEqual(results[2]["distinct_winners"], 0)
+        engine.executor.shutdown()
+
 if __name__ == '__main__':
     unittest.main()